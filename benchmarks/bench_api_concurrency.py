@@ -0,0 +1,118 @@
+"""
+Benchmark : latence de /status et /predict/* pendant des requêtes /forecast/all.
+
+Les appels Supabase de /forecast/all sont simulés par un appel bloquant
+(time.sleep). Si les handlers bloquaient la boucle d'événements, la latence
+p99 des endpoints rapides exploserait dès qu'une prévision est en cours.
+
+Utilisation :
+    python -m benchmarks.bench_api_concurrency
+    python -m benchmarks.bench_api_concurrency --forecast-clients 16 --supabase-delay 1.0
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import warnings
+from unittest.mock import patch
+
+import httpx
+import numpy as np
+
+from src.api.main import app
+
+SOLAR_FEATURES = {
+    "temperature_2m_mean": 18.5,
+    "shortwave_radiation_sum_kwh_m2": 4.8,
+    "sunshine_duration": 45000,
+    "cloud_cover_mean": 25.0,
+    "relative_humidity_2m_mean": 65.0,
+}
+
+
+class SlowForecastPredictor:
+    """ForecastPredictor simulé dont les appels Supabase sont bloquants."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def predict_all_forecasts(self):
+        time.sleep(self.delay)
+        return {"solar": [], "wind": [], "hydro": [], "summary": {}}
+
+
+async def measure(client: httpx.AsyncClient, method: str, path: str, n: int, **kwargs):
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        response = await client.request(method, path, **kwargs)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+
+async def forecast_load(client: httpx.AsyncClient, stop: asyncio.Event):
+    while not stop.is_set():
+        await client.get("/forecast/all")
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Préchauffage (chargement des modèles dans le registre)
+        await client.post("/predict/solar", json=SOLAR_FEATURES)
+
+        targets = [
+            ("GET", "/status", {}),
+            ("POST", "/predict/solar", {"json": SOLAR_FEATURES}),
+        ]
+
+        print(f"{'endpoint':<16} {'charge':<22} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+        for method, path, kwargs in targets:
+            idle = await measure(client, method, path, args.requests, **kwargs)
+
+            stop = asyncio.Event()
+            load = [
+                asyncio.create_task(forecast_load(client, stop))
+                for _ in range(args.forecast_clients)
+            ]
+            await asyncio.sleep(0.05)
+            loaded = await measure(client, method, path, args.requests, **kwargs)
+            stop.set()
+            await asyncio.gather(*load)
+
+            for label, values in [
+                ("aucune", idle),
+                (f"{args.forecast_clients} /forecast/all", loaded),
+            ]:
+                print(
+                    f"{path:<16} {label:<22} "
+                    f"{np.percentile(values, 50):>9.2f} {np.percentile(values, 99):>9.2f}"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--forecast-clients", type=int, default=8)
+    parser.add_argument(
+        "--supabase-delay",
+        type=float,
+        default=0.5,
+        help="Durée simulée d'un appel bloquant /forecast/all (s)",
+    )
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    with patch(
+        "src.api.main.get_forecast_predictor",
+        return_value=SlowForecastPredictor(args.supabase_delay),
+    ):
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
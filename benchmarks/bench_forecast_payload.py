@@ -0,0 +1,132 @@
+"""
+Benchmark : taille et temps d'encodage des réponses de prévision.
+
+Génère des payloads du type /forecast/all (prédiction + features par jour
+et par producteur) pour plusieurs sites et horizons, puis compare :
+- l'encodage FastAPI par défaut (jsonable_encoder + json.dumps)
+- FastJSONResponse (orjson s'il est installé, sinon encodeur préconstruit)
+- la taille et le temps de compression gzip / deflate
+
+Utilisation :
+    python -m benchmarks.bench_forecast_payload
+    python -m benchmarks.bench_forecast_payload --sites 1 10 --days 16 365
+"""
+
+import argparse
+import json
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+from src.api.compression import compress
+from src.api.utils import FastJSONResponse, orjson
+from benchmarks.bench_forecast_scoring import FEATURE_RANGES
+
+PRODUCER_FEATURES = {
+    "solar": [
+        "temperature_2m_mean",
+        "shortwave_radiation_sum_kwh_m2",
+        "sunshine_duration",
+        "cloud_cover_mean",
+        "relative_humidity_2m_mean",
+    ],
+    "wind": [
+        "wind_speed_10m_max",
+        "wind_gusts_10m_max",
+        "wind_direction_10m_dominant",
+        "temperature_2m_mean",
+    ],
+    "hydro": ["debit_l_s"],
+}
+
+
+def make_payload(n_sites: int, n_days: int) -> dict:
+    """Payload /forecast/all avec un jeu de prédictions par site et producteur."""
+    rng = np.random.default_rng(42)
+    timestamp = datetime.now().isoformat()
+    start = date.today()
+    payload = {}
+    for producer, features in PRODUCER_FEATURES.items():
+        payload[producer] = [
+            {
+                "date": (start + timedelta(days=day)).isoformat(),
+                "site": site,
+                "prediction_kwh": round(float(rng.uniform(0, 1500)), 2),
+                "producer_type": producer,
+                "features": {
+                    feature: float(rng.uniform(*FEATURE_RANGES[feature]))
+                    for feature in features
+                },
+                "model_type": "XGBRegressor",
+                "timestamp": timestamp,
+            }
+            for site in range(n_sites)
+            for day in range(n_days)
+        ]
+    payload["summary"] = {
+        f"{producer}_days": len(payload[producer]) for producer in PRODUCER_FEATURES
+    }
+    return payload
+
+
+def timed(func, repeat: int):
+    """Meilleur temps sur `repeat` exécutions et dernier résultat."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def default_encode(payload: dict) -> bytes:
+    # Chemin FastAPI par défaut pour un dict retourné par un endpoint
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sites", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--days", type=int, nargs="+", default=[16, 90, 365])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--level", type=int, default=6, help="Niveau de compression")
+    args = parser.parse_args()
+
+    fast_name = "orjson" if orjson is not None else "json préconstruit"
+    print(f"Encodeur rapide: {fast_name}")
+    print(
+        f"{'sites':>6} {'jours':>6} {'brut (Ko)':>10} {'défaut (ms)':>12} "
+        f"{'rapide (ms)':>12} {'gain':>6} {'gzip (Ko)':>10} {'gzip (ms)':>10} "
+        f"{'deflate (Ko)':>13} {'deflate (ms)':>13}"
+    )
+
+    for n_sites in args.sites:
+        for n_days in args.days:
+            payload = make_payload(n_sites, n_days)
+            default_time, body = timed(lambda: default_encode(payload), args.repeat)
+            fast_time, _ = timed(lambda: FastJSONResponse(payload).body, args.repeat)
+            gzip_time, gzipped = timed(
+                lambda: compress(body, "gzip", args.level), args.repeat
+            )
+            deflate_time, deflated = timed(
+                lambda: compress(body, "deflate", args.level), args.repeat
+            )
+            print(
+                f"{n_sites:>6} {n_days:>6} {len(body) / 1024:>10.1f} "
+                f"{default_time * 1000:>12.2f} {fast_time * 1000:>12.2f} "
+                f"{default_time / fast_time:>5.1f}x {len(gzipped) / 1024:>10.1f} "
+                f"{gzip_time * 1000:>10.2f} {len(deflated) / 1024:>13.1f} "
+                f"{deflate_time * 1000:>13.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
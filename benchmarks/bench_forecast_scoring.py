@@ -0,0 +1,94 @@
+"""
+Benchmark : prédiction ligne par ligne vs prédiction par lot.
+
+Compare `ModelPredictor.predict` appelé pour chaque jour et
+`ModelPredictor.predict_frame` appelé une seule fois sur tout l'horizon.
+
+Utilisation :
+    python -m benchmarks.bench_forecast_scoring
+    python -m benchmarks.bench_forecast_scoring --producer wind --sizes 16 1000
+"""
+
+import argparse
+import logging
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.prediction.model_predictor import ModelPredictor
+
+# Plages de valeurs réalistes pour générer des features synthétiques
+FEATURE_RANGES = {
+    "temperature_2m_mean": (-5, 35),
+    "shortwave_radiation_sum_kwh_m2": (0, 9),
+    "sunshine_duration": (0, 50000),
+    "cloud_cover_mean": (0, 100),
+    "relative_humidity_2m_mean": (20, 100),
+    "wind_speed_10m_max": (0, 80),
+    "wind_gusts_10m_max": (0, 120),
+    "wind_direction_10m_dominant": (0, 360),
+    "debit_l_s": (0, 50000),
+}
+
+
+def make_features(predictor: ModelPredictor, n_rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    return pd.DataFrame(
+        {
+            feature: rng.uniform(*FEATURE_RANGES[feature], n_rows)
+            for feature in predictor._get_expected_features()
+        }
+    )
+
+
+def bench_per_row(predictor: ModelPredictor, df: pd.DataFrame, max_rows: int):
+    """Temps ligne par ligne, extrapolé au-delà de max_rows."""
+    rows = df.head(max_rows).to_dict(orient="records")
+    start = time.perf_counter()
+    for row in rows:
+        predictor.predict(row)
+    elapsed = time.perf_counter() - start
+    return elapsed * len(df) / len(rows), len(rows) < len(df)
+
+
+def bench_batch(predictor: ModelPredictor, df: pd.DataFrame):
+    start = time.perf_counter()
+    predictor.predict_frame(df)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--producer", default="solar", choices=["solar", "wind", "hydro"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 1_000, 100_000])
+    parser.add_argument(
+        "--max-per-row",
+        type=int,
+        default=2_000,
+        help="Nombre max de lignes mesurées en mode unitaire (le reste est extrapolé)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    predictor = ModelPredictor(args.producer)
+    print(f"Producteur: {args.producer} ({type(predictor.model).__name__})")
+    print(f"{'lignes':>10} {'unitaire (s)':>14} {'lot (s)':>10} {'accélération':>13}")
+
+    for n_rows in args.sizes:
+        df = make_features(predictor, n_rows)
+        per_row, extrapolated = bench_per_row(predictor, df, args.max_per_row)
+        batch = bench_batch(predictor, df)
+        marker = "*" if extrapolated else " "
+        print(
+            f"{n_rows:>10} {per_row:>13.4f}{marker} {batch:>10.4f} {per_row / batch:>12.1f}x"
+        )
+
+    print("* extrapolé à partir des premières lignes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark : préparation des lignes envoyées par SupabaseHandler.upsert_dataframe.
+
+Compare, sur des tables du type clean_solar_history :
+- l'ancien chemin : copie, strftime colonne par colonne, to_dict(orient="records")
+  puis json.dumps(default=str) par lot pour compter les octets
+- le chemin vectorisé : frame_to_json_columns + iter_record_batches + encode_json
+
+Utilisation :
+    python -m benchmarks.bench_upsert_serialization
+    python -m benchmarks.bench_upsert_serialization --rows 100000 1000000 --batch-size 1000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_ingestion.handlers.etl_supabase import (
+    encode_json,
+    frame_to_json_columns,
+    iter_record_batches,
+    orjson,
+)
+
+
+def make_frame(n_rows: int) -> pd.DataFrame:
+    """Table météo journalière avec 1 % de valeurs manquantes."""
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame(
+        {
+            "date": pd.date_range("1900-01-01", periods=n_rows, freq="D"),
+            "temperature_2m_max": rng.uniform(-10, 40, n_rows),
+            "temperature_2m_min": rng.uniform(-20, 30, n_rows),
+            "shortwave_radiation_sum_kwh_m2": rng.uniform(0, 9, n_rows),
+            "sunshine_duration": rng.uniform(0, 50000, n_rows),
+            "cloud_cover_mean": rng.integers(0, 100, n_rows),
+            "precipitation_sum": rng.uniform(0, 50, n_rows),
+        }
+    )
+    missing = rng.random(n_rows) < 0.01
+    df.loc[missing, "temperature_2m_max"] = np.nan
+    return df
+
+
+def legacy_batches(df: pd.DataFrame, batch_size: int) -> list:
+    # Chemin d'origine de upsert_dataframe (NaN laissés tels quels)
+    df = df.copy()
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime("%Y-%m-%d %H:%M:%S")
+    data = df.to_dict(orient="records")
+    return [data[i : i + batch_size] for i in range(0, len(data), batch_size)]
+
+
+def vectorized_batches(df: pd.DataFrame, batch_size: int) -> list:
+    columns = frame_to_json_columns(df)
+    return list(iter_record_batches(columns, len(df), batch_size))
+
+
+def timed(func, repeat: int):
+    """Meilleur temps sur `repeat` exécutions et dernier résultat."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Encodeur JSON: {'orjson' if orjson is not None else 'json'}")
+    print(
+        f"{'lignes':>9} {'prép. ancien (s)':>17} {'prép. vect. (s)':>16} {'gain':>6} "
+        f"{'encod. ancien (s)':>18} {'encod. vect. (s)':>17} {'total gain':>11} "
+        f"{'Mo':>7}"
+    )
+    for n_rows in args.rows:
+        df = make_frame(n_rows)
+        legacy_prep, legacy = timed(
+            lambda: legacy_batches(df, args.batch_size), args.repeat
+        )
+        fast_prep, fast = timed(
+            lambda: vectorized_batches(df, args.batch_size), args.repeat
+        )
+        # Encodage par lot (comptage des octets envoyés)
+        legacy_enc, _ = timed(
+            lambda: [json.dumps(batch, default=str) for batch in legacy], args.repeat
+        )
+        fast_enc, encoded = timed(
+            lambda: [encode_json(batch) for batch in fast], args.repeat
+        )
+        size = sum(len(chunk) for chunk in encoded)
+        print(
+            f"{n_rows:>9} {legacy_prep:>17.2f} {fast_prep:>16.2f} "
+            f"{legacy_prep / fast_prep:>5.1f}x {legacy_enc:>18.2f} {fast_enc:>17.2f} "
+            f"{(legacy_prep + legacy_enc) / (fast_prep + fast_enc):>10.1f}x "
+            f"{size / 1024 / 1024:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -13,12 +13,12 @@ logging.basicConfig(
 )
 
 
-def run_data_pipeline():
+def run_data_pipeline(full_backfill: bool = False):
     logging.info("Démarrage du pipeline de données")
 
     try:
-        # Récupération de toutes les données
-        results = fetch_all()
+        # Récupération de toutes les données (incrémentale par défaut)
+        results = fetch_all(full_backfill=full_backfill)
 
         # Log des résultats
         for key, df in results.items():
@@ -27,6 +27,9 @@ def run_data_pipeline():
             else:
                 logging.info(f"{key}: Données récupérées")
 
+        # Matérialisation des prédictions sur les nouvelles données
+        run_materialization()
+
         logging.info("Pipeline terminé avec succès !")
         return True
 
@@ -35,14 +38,32 @@ def run_data_pipeline():
         return False
 
 
-def run_model_training():
+def run_materialization():
+    """Précalcule les prédictions servies par l'API après chaque ingestion"""
+    try:
+        from src.prediction.forecast_store import materialize_forecasts
+
+        records = materialize_forecasts()
+        logging.info(f"Prédictions matérialisées: {', '.join(records) or 'aucune'}")
+        return True
+
+    except Exception as e:
+        logging.warning(f"Matérialisation des prédictions impossible: {e}")
+        return False
+
+
+def run_model_training(
+    search: bool = None, incremental: bool = None, full_refresh: bool = False
+):
     """Lance l'entrainement des modèles"""
     logging.info("Démarrage de l'entrainement des modèles")
 
     try:
         from scripts.train_models import main as train_models_main
 
-        train_models_main()
+        train_models_main(
+            search=search, incremental=incremental, full_refresh=full_refresh
+        )
         logging.info("Entrainement des modèles terminés avec succès !")
         return True
 
@@ -262,7 +283,11 @@ def main():
 Exemples d'utilisation:
   python main.py all                    # Lance tous les composants
   python main.py data                   # Lance seulement le pipeline de données
+  python main.py data --full-backfill   # Recharge tout l'historique depuis 2016
   python main.py train                  # Lance seulement l'entraînement des modèles
+  python main.py train --search         # Entraînement avec recherche d'hyperparamètres
+  python main.py train --incremental    # Mise à jour quotidienne des modèles sauvegardés
+  python main.py train --full-refresh   # Entraînement sur les tables relues entièrement
   python main.py api                    # Lance seulement l'API FastAPI
   python main.py streamlit              # Lance seulement Streamlit
   python main.py status                 # Vérifie le statut des services
@@ -298,6 +323,32 @@ Exemples d'utilisation:
         help="Port de Streamlit (défaut: 8500)",
     )
 
+    parser.add_argument(
+        "--full-backfill",
+        action="store_true",
+        help="Recharge tout l'historique au lieu du seul intervalle manquant",
+    )
+
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        default=None,
+        help="Recherche les hyperparamètres avant l'entraînement (SEARCH_TIME_BUDGET)",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=None,
+        help="Met à jour les modèles sauvegardés au lieu de les reconstruire",
+    )
+
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Relit les tables d'entraînement entières au lieu des instantanés locaux",
+    )
+
     args = parser.parse_args()
 
     # Créer le dossier logs
@@ -315,9 +366,16 @@ Exemples d'utilisation:
         if command == "all":
             success = run_all() and success
         elif command == "data":
-            success = run_data_pipeline() and success
+            success = run_data_pipeline(full_backfill=args.full_backfill) and success
         elif command == "train":
-            success = run_model_training() and success
+            success = (
+                run_model_training(
+                    search=args.search,
+                    incremental=args.incremental,
+                    full_refresh=args.full_refresh,
+                )
+                and success
+            )
         elif command == "api":
             success = run_api() and success
         elif command == "streamlit":
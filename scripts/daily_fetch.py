@@ -1,3 +1,4 @@
+import argparse
 import logging
 import sys
 import os
@@ -7,6 +8,7 @@ from datetime import datetime, date
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 
 from src.data_ingestion.fetchers.fetch_all import fetch_all
+from src.prediction.forecast_store import materialize_forecasts
 from src.config.settings import settings
 
 # Configuration du logging
@@ -24,11 +26,19 @@ logging.basicConfig(
 
 def main():
     """Fonction principale du script quotidien."""
+    parser = argparse.ArgumentParser(description="Récupération quotidienne des données")
+    parser.add_argument(
+        "--full-backfill",
+        action="store_true",
+        help="Recharge tout l'historique au lieu du seul intervalle manquant",
+    )
+    args = parser.parse_args()
+
     logging.info("Démarrage de la récupération quotidienne des données")
 
     try:
-        # Récupération de toutes les données
-        results = fetch_all()
+        # Récupération des données manquantes (ou de tout l'historique)
+        results = fetch_all(full_backfill=args.full_backfill)
 
         # Log des résultats
         for key, df in results.items():
@@ -37,8 +47,16 @@ def main():
             else:
                 logging.info(f"{key}: Données récupérées")
 
+        # Précalcul des prédictions servies par l'API
+        records = materialize_forecasts()
+        logging.info(f"Prédictions matérialisées: {', '.join(records) or 'aucune'}")
+
         logging.info("Récupération quotidienne terminée avec succès")
 
     except Exception as e:
         logging.error(f"Erreur lors de la récupération: {e}")
         sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
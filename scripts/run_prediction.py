@@ -18,6 +18,7 @@ def main():
 
     try:
         from src.prediction.forecast_predictor import ForecastPredictor
+        from src.prediction.forecast_store import materialize_forecasts
 
         # Initialiser le prédicteur
         predictor = ForecastPredictor()
@@ -43,9 +44,13 @@ def main():
             logger.info("2. Entraîner les modèles: python main.py train")
             sys.exit(1)
 
-        # Lancer les prédictions
+        # Lancer les prédictions et les stocker pour l'API
         logger.info("Lancement des prédictions...")
-        results = predictor.predict_all_forecasts()
+        records = materialize_forecasts(predictor)
+        results = {
+            producer: records[producer]["predictions"] if producer in records else []
+            for producer in ["solar", "wind", "hydro"]
+        }
 
         # Afficher les résultats
         logger.info("PRÉDICTIONS TERMINÉES AVEC SUCCÈS")
@@ -54,7 +59,7 @@ def main():
         logger.info(f"Prédictions solaires: {len(results['solar'])} jours")
         logger.info(f"Prédictions éoliennes: {len(results['wind'])} jours")
         logger.info(f"Prédictions hydrauliques: {len(results['hydro'])} jours")
-        logger.info(f"Total: {results['summary']['total_predictions']} prédictions")
+        logger.info(f"Total: {sum(map(len, results.values()))} prédictions")
 
         # Afficher un exemple pour chaque type
         if results["solar"]:
@@ -1,38 +1,136 @@
+import argparse
 import logging
 import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.config.settings import settings
 from src.models.model_trainer import RenewableModelTrainer
+from src.models.training_orchestrator import PRODUCERS, TrainingOrchestrator
 
 
-def main():
+def run_incremental_updates() -> dict:
     """
-    Entraine les modèles pour les 3 types de producteurs.
+    Met à jour chaque modèle sauvegardé avec les nouvelles données.
+    Returns:
+        Rapport par producteur (voir RenewableModelTrainer.train_incremental)
     """
+    updates = {}
+    for producer in PRODUCERS:
+        try:
+            updates[producer] = RenewableModelTrainer(producer).train_incremental(
+                rebuild=False
+            )
+        except Exception as e:
+            logging.error(f"Mise à jour incrémentale {producer} en échec: {e}.")
+            updates[producer] = {"mode": "full_required", "reason": str(e)}
+    return updates
 
-    producers = ["solar", "wind", "hydro"]
 
-    for producer in producers:
-        try:
-            logging.info(f"*entrainement du modèle {producer}...")
+def main(
+    search: bool = None,
+    time_budget: float = None,
+    incremental: bool = None,
+    full_refresh: bool = False,
+):
+    """
+    Entraine les modèles pour les 3 types de producteurs
+    (producteurs × familles de modèles en parallèle, voir TrainingOrchestrator).
+    Args:
+        search: Recherche d'hyperparamètres (par défaut SEARCH_ENABLED)
+        time_budget: Budget de temps de la recherche en secondes
+        incremental: Mise à jour des modèles sauvegardés, reconstruction
+            complète des seuls producteurs qui le nécessitent
+            (par défaut TRAINING_INCREMENTAL)
+        full_refresh: Relit les tables entières et réécrit les instantanés
+            locaux ; toujours le cas des reconstructions complètes du mode
+            incrémental
+    """
+    incremental = settings.training_incremental if incremental is None else incremental
 
-            trainer = RenewableModelTrainer(producer)
-            results = trainer.train_models()
+    producers, updates = None, {}
+    if incremental:
+        updates = run_incremental_updates()
+        producers = [
+            producer
+            for producer, update in updates.items()
+            if update["mode"] == "full_required"
+        ]
+        if not producers:
+            return {"incremental": updates}
+        full_refresh = True
 
-            logging.info(f"Résultats {producer}.")
-            for model_name, metrics in results.items():
+    report = TrainingOrchestrator(
+        producers=producers,
+        search=search,
+        time_budget=time_budget,
+        full_refresh=full_refresh,
+    ).run()
+    report["incremental"] = updates
+
+    for producer, error in report["errors"].items():
+        logging.error(f"Erreur lors de l'entrainement {producer}: {error}.")
+
+    for producer, results in report["results"].items():
+        logging.info(f"Résultats {producer}.")
+        for model_name, metrics in results.items():
+            logging.info(
+                f"{model_name}: MAE={metrics['mae']:.3f}, R²={metrics['r2']:.3f}."
+            )
+
+    logging.info(
+        f"Durée totale {report['wall_seconds']:.2f}s "
+        f"({report['workers']} processus × {report['threads_per_job']} threads)."
+    )
+    for job in sorted(report["jobs"], key=lambda job: -job.get("seconds", 0)):
+        if "error" not in job:
+            logging.info(
+                f"{job['producer']}/{job['family']}: {job['seconds']:.2f}s, "
+                f"pic mémoire {job['peak_memory_mb']} Mo."
+            )
+            if job.get("search"):
                 logging.info(
-                    f"{model_name}: MAE={metrics['mae']:.3f}, R²={metrics['r2']:.3f}."
+                    f"Recherche {job['producer']}/{job['family']}: "
+                    f"{job['search']['trials']} essais, "
+                    f"paramètres retenus {job['params']}."
                 )
 
-        except Exception as e:
-            logging.error(f"Erreur lors de l'entrainement {producer}: {e}.")
-            continue
+    return report
 
 
 if __name__ == "__main__":
     #  créer le dossier models s'il n'existe pas.
     os.makedirs("src/models/saved", exist_ok=True)
-    main()
+
+    parser = argparse.ArgumentParser(description="Entrainement des modèles")
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        default=None,
+        help="Recherche les hyperparamètres avant l'entrainement",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=None,
+        help="Budget de temps de la recherche en secondes (SEARCH_TIME_BUDGET)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=None,
+        help="Met à jour les modèles sauvegardés avec les nouvelles données",
+    )
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Relit les tables entières au lieu des instantanés locaux",
+    )
+    args = parser.parse_args()
+    main(
+        search=args.search,
+        time_budget=args.time_budget,
+        incremental=args.incremental,
+        full_refresh=args.full_refresh,
+    )
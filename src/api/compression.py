@@ -0,0 +1,120 @@
+"""
+Compression gzip/deflate des réponses selon l'en-tête Accept-Encoding
+"""
+
+import gzip
+import zlib
+from typing import Dict, Optional
+
+# Encodages supportés, par ordre de préférence à qualité égale
+SUPPORTED_ENCODINGS = ("gzip", "deflate")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Choisit l'encodage à utiliser d'après Accept-Encoding (valeurs q comprises).
+    Returns:
+        "gzip", "deflate" ou None si aucun encodage supporté n'est accepté
+    """
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding] = quality
+
+    best, best_quality = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, level: int = 6) -> bytes:
+    if encoding == "gzip":
+        # mtime fixe : même contenu, mêmes octets (ETag/caches stables)
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    # "deflate" au sens HTTP : flux zlib (RFC 1950)
+    return zlib.compress(body, level)
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI qui compresse les réponses d'au moins `minimum_size` octets
+    en gzip ou deflate selon ce qu'accepte le client. Les réponses déjà encodées
+    et les réponses en streaming (plusieurs morceaux) sont transmises telles quelles.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, level: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.minimum_size <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = negotiate_encoding(headers.get(b"accept-encoding", b"").decode())
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_compressed(message):
+            nonlocal start_message
+
+            if message["type"] == "http.response.start":
+                # Attendre le premier morceau du corps pour décider de compresser
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or start_message is None:
+                # Décision déjà prise (morceaux suivants) ou autre message
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            response_headers = list(start_message.get("headers", []))
+            already_encoded = any(
+                name.lower() == b"content-encoding" for name, _ in response_headers
+            )
+
+            if (
+                message.get("more_body", False)
+                or already_encoded
+                or len(body) < self.minimum_size
+            ):
+                # Streaming, déjà encodé ou trop petit : pas de compression
+                await send(start_message)
+                start_message = None
+                await send(message)
+                return
+
+            compressed = compress(body, encoding, self.level)
+            response_headers = [
+                (name, value)
+                for name, value in response_headers
+                if name.lower() != b"content-length"
+            ]
+            response_headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            await send({**start_message, "headers": response_headers})
+            start_message = None
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,10 +1,32 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional
 import logging
+import math
+import time
+import pandas as pd
 from src.prediction.model_predictor import ModelPredictor
+from src.prediction.model_registry import model_registry
 from src.prediction.forecast_predictor import ForecastPredictor
-import datetime
+from src.prediction.forecast_cache import ForecastCache
+from src.prediction.forecast_store import ForecastStore
+from src.api.compression import CompressionMiddleware
+from src.api.utils import (
+    TimedJSONResponse,
+    json_response,
+    run_cpu_bound,
+    run_io_bound,
+)
+from src.api.single_flight import SingleFlight
+from src.config.settings import settings
+from src.monitoring.metrics import (
+    http_request_duration_seconds,
+    http_requests_total,
+    metrics,
+)
+from datetime import datetime
+from functools import lru_cache
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -14,8 +36,41 @@ app = FastAPI(
     title="API de Prévision de Production d'Energie Renouvelable",
     description="API pour prédire la production solaire, éolienne et hydraulique",
     version="1.0.0",
+    default_response_class=TimedJSONResponse,
 )
 
+# Compression gzip/deflate des réponses volumineuses (prévisions)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.api_compression_min_size,
+    level=settings.api_compression_level,
+)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Compte les requêtes et mesure leur durée par route."""
+    if not settings.metrics_enabled:
+        return await call_next(request)
+
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Gabarit de la route (/predict/{producer_type}/batch) pour borner
+        # le nombre de séries ; les chemins inconnus sont regroupés
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        http_request_duration_seconds.observe(
+            time.perf_counter() - start, method=request.method, route=route_path
+        )
+        http_requests_total.inc(
+            method=request.method, route=route_path, status=str(status)
+        )
+
 
 # modèles Pydantic pour les features d'entrée
 class SolarFeatures(BaseModel):
@@ -43,6 +98,76 @@ class PredictionResponse(BaseModel):
     status: str
 
 
+class BatchPredictionRequest(BaseModel):
+    """
+    Lot de features à prédire, soit ligne par ligne (rows),
+    soit en colonnes (columns: {feature: [valeurs]}).
+    """
+
+    rows: Optional[List[Dict[str, Any]]] = None
+    columns: Optional[Dict[str, List[Any]]] = None
+
+
+class BatchPredictionError(BaseModel):
+    index: int
+    error: str
+
+
+class BatchPredictionResponse(BaseModel):
+    producer_type: str
+    count: int
+    success_count: int
+    error_count: int
+    predictions: List[Optional[float]]
+    errors: List[BatchPredictionError]
+    status: str
+
+
+# Cache des prévisions partagé par toutes les requêtes du processus
+forecast_cache = ForecastCache() if settings.forecast_cache_enabled else None
+
+
+@lru_cache(maxsize=None)
+def get_forecast_predictor() -> ForecastPredictor:
+    """
+    Retourne le ForecastPredictor partagé (un seul client Supabase par processus).
+    Les prédictions matérialisées après l'ingestion sont servies en priorité.
+    """
+    return ForecastPredictor(cache=forecast_cache, store=ForecastStore())
+
+
+# Regroupement des requêtes de prévision identiques simultanées
+single_flight = SingleFlight()
+
+
+async def _run_forecast(method_name: str):
+    """
+    Appelle une méthode du ForecastPredictor partagé hors de la boucle d'événements.
+    Les requêtes identiques simultanées partagent le même calcul.
+    """
+
+    async def compute():
+        predictor = await run_io_bound(get_forecast_predictor)
+        return await run_io_bound(getattr(predictor, method_name))
+
+    return await single_flight.do(method_name, compute)
+
+
+# Les fonctions suivantes sont bloquantes (chargement de modèle, inférence)
+# et sont exécutées dans le pool de threads CPU par les handlers async.
+def _predict(producer_type: str, features: dict) -> float:
+    return ModelPredictor(producer_type).predict(features)
+
+
+def _predict_batch(
+    producer_type: str, request: BatchPredictionRequest, count: int
+) -> tuple:
+    predictor = ModelPredictor(producer_type)
+    if request.rows is not None:
+        return predictor.predict_batch(request.rows)
+    return predictor.predict_frame(pd.DataFrame(request.columns, index=range(count)))
+
+
 @app.get("/")
 async def root():
     return {
@@ -51,7 +176,9 @@ async def root():
             "solar": "/predict/solar",
             "wind": "/predict/wind",
             "hydro": "/predict/hydro",
+            "batch": "/predict/{producer_type}/batch",
             "status": "/status",
+            "metrics": "/metrics",
         },
     }
 
@@ -62,14 +189,23 @@ async def status_check():
     return {"status": "Ok", "message": "API opérationnelle"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Expose les compteurs et histogrammes de latence au format texte Prometheus
+    """
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.post("/predict/solar", response_model=PredictionResponse)
 async def predict_solar(features: SolarFeatures):
     """Prédit la production solaire de la journée en kWh"""
     try:
         logger.info(f"Prédiction solaire avec features: {features.dict()}")
 
-        predictor = ModelPredictor("solar")
-        prediction = predictor.predict(features.dict())
+        prediction = await run_cpu_bound(_predict, "solar", features.dict())
 
         return PredictionResponse(
             producer_type="solar", prediction_kwh=round(prediction, 2), status="success"
@@ -86,8 +222,7 @@ async def predict_wind(features: WindFeatures):
     try:
         logger.info(f"Prédiction éolienne avec features: {features.dict()}")
 
-        predictor = ModelPredictor("wind")
-        prediction = predictor.predict(features.dict())
+        prediction = await run_cpu_bound(_predict, "wind", features.dict())
 
         return PredictionResponse(
             producer_type="wind", prediction_kwh=round(prediction, 2), status="success"
@@ -104,8 +239,7 @@ async def predict_hydro(features: HydroFeatures):
     try:
         logger.info(f"Prédiction hydraulique avec features: {features.dict()}")
 
-        predictor = ModelPredictor("hydro")
-        prediction = predictor.predict(features.dict())
+        prediction = await run_cpu_bound(_predict, "hydro", features.dict())
 
         return PredictionResponse(
             producer_type="hydro", prediction_kwh=round(prediction, 2), status="success"
@@ -116,23 +250,65 @@ async def predict_hydro(features: HydroFeatures):
         raise HTTPException(status_code=500, detail=f"Erreur de prédiction: {str(e)}")
 
 
+@app.post("/predict/{producer_type}/batch", response_model=BatchPredictionResponse)
+async def predict_batch(
+    producer_type: Literal["solar", "wind", "hydro"], request: BatchPredictionRequest
+):
+    """
+    Prédit la production d'un lot de journées en un seul appel au modèle.
+    Les lignes invalides sont signalées individuellement dans `errors`.
+    """
+    if (request.rows is None) == (request.columns is None):
+        raise HTTPException(
+            status_code=422, detail="Fournir exactement un champ parmi rows et columns"
+        )
+
+    if request.rows is not None:
+        count = len(request.rows)
+    else:
+        lengths = {len(values) for values in request.columns.values()}
+        if len(lengths) > 1:
+            raise HTTPException(
+                status_code=422, detail="Les colonnes doivent avoir la même longueur"
+            )
+        count = lengths.pop() if lengths else 0
+
+    if count > settings.batch_max_rows:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lot trop volumineux: {count} lignes (max {settings.batch_max_rows})",
+        )
+
+    try:
+        predictions, errors = await run_cpu_bound(
+            _predict_batch, producer_type, request, count
+        )
+
+        return BatchPredictionResponse(
+            producer_type=producer_type,
+            count=count,
+            success_count=count - len(errors),
+            error_count=len(errors),
+            predictions=[
+                None if math.isnan(p) else round(p, 2) for p in predictions.tolist()
+            ],
+            errors=[
+                BatchPredictionError(index=index, error=error)
+                for index, error in errors.items()
+            ],
+            status="success" if not errors else "partial",
+        )
+
+    except Exception as e:
+        logger.error(f"Erreur prédiction par lot {producer_type}: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur de prédiction: {str(e)}")
+
+
 @app.get("/models/status")
 async def models_status():
     """Retourne l'état des modèles chargés"""
     try:
-        status = {}
-        for producer_type in ["solar", "wind", "hydro"]:
-            try:
-                predictor = ModelPredictor(producer_type)
-                status[producer_type] = {
-                    "loaded": True,
-                    "model_type": type(predictor.model).__name__,
-                    "has_scaler": predictor.scaler is not None,
-                }
-            except Exception as e:
-                status[producer_type] = {"loaded": False, "error": str(e)}
-
-        return {"models_status": status}
+        return {"models_status": await run_cpu_bound(model_registry.status)}
 
     except Exception as e:
         raise HTTPException(
@@ -148,15 +324,16 @@ async def get_solar_forecast_predictions():
     try:
         logger.info("Demande de prévisions solaires...")
 
-        predictor = ForecastPredictor()
-        predictions = predictor.predict_solar_forecast()
+        predictions = await _run_forecast("predict_solar_forecast")
 
-        return {
-            "producer_type": "solar",
-            "forecast_days": len(predictions),
-            "predictions": predictions,
-            "timestamp": datetime.now().isoformat(),
-        }
+        return json_response(
+            {
+                "producer_type": "solar",
+                "forecast_days": len(predictions),
+                "predictions": predictions,
+                "timestamp": datetime.now().isoformat(),
+            }
+        )
 
     except Exception as e:
         logger.error(f"Erreur prévisions solaires: {e}")
@@ -171,15 +348,16 @@ async def get_wind_forecast_predictions():
     try:
         logger.info("Demande de prévisions éoliennes...")
 
-        predictor = ForecastPredictor()
-        predictions = predictor.predict_wind_forecast()
+        predictions = await _run_forecast("predict_wind_forecast")
 
-        return {
-            "producer_type": "wind",
-            "forecast_days": len(predictions),
-            "predictions": predictions,
-            "timestamp": datetime.now().isoformat(),
-        }
+        return json_response(
+            {
+                "producer_type": "wind",
+                "forecast_days": len(predictions),
+                "predictions": predictions,
+                "timestamp": datetime.now().isoformat(),
+            }
+        )
 
     except Exception as e:
         logger.error(f"Erreur prévisions éoliennes: {e}")
@@ -194,15 +372,16 @@ async def get_hydro_forecast_predictions():
     try:
         logger.info("Demande de prévisions hydrauliques...")
 
-        predictor = ForecastPredictor()
-        predictions = predictor.predict_hydro_forecast()
+        predictions = await _run_forecast("predict_hydro_forecast")
 
-        return {
-            "producer_type": "hydro",
-            "forecast_days": len(predictions),
-            "predictions": predictions,
-            "timestamp": datetime.now().isoformat(),
-        }
+        return json_response(
+            {
+                "producer_type": "hydro",
+                "forecast_days": len(predictions),
+                "predictions": predictions,
+                "timestamp": datetime.now().isoformat(),
+            }
+        )
 
     except Exception as e:
         logger.error(f"Erreur prévisions hydrauliques: {e}")
@@ -217,24 +396,40 @@ async def get_all_forecast_predictions():
     try:
         logger.info("Demande de toutes les prévisions...")
 
-        predictor = ForecastPredictor()
-        all_predictions = predictor.predict_all_forecasts()
+        all_predictions = await _run_forecast("predict_all_forecasts")
 
-        return all_predictions
+        return json_response(all_predictions)
 
     except Exception as e:
         logger.error(f"Erreur toutes les prévisions: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/forecast/cache")
+async def get_forecast_cache_stats():
+    """
+    Retourne les compteurs du cache des prévisions (hits, misses, revalidations)
+    """
+    if forecast_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **forecast_cache.get_stats()}
+
+
+@app.get("/forecast/coalescing")
+async def get_forecast_coalescing_stats():
+    """
+    Retourne le nombre de requêtes de prévision regroupées sur un calcul en cours
+    """
+    return single_flight.get_stats()
+
+
 @app.get("/forecast/status")
 async def get_forecast_status():
     """
     Retourne le statut des prévisions et modèles
     """
     try:
-        predictor = ForecastPredictor()
-        stats = predictor.get_prediction_stats()
+        stats = await _run_forecast("get_prediction_stats")
 
         return {
             "status": "operational" if stats["ready_for_prediction"] else "degraded",
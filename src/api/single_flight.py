@@ -0,0 +1,56 @@
+"""
+Regroupement des requêtes identiques simultanées (single-flight)
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Les appels concurrents avec la même clé partagent un seul calcul en cours :
+    le premier lance le calcul, les suivants attendent son résultat.
+    Le calcul n'est pas annulé si le client qui l'a lancé se déconnecte.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Exécute `func` pour `key`, ou attend le calcul déjà en cours pour cette clé.
+        """
+        key_stats = self.stats.setdefault(
+            str(key), {"requests": 0, "executions": 0, "coalesced": 0}
+        )
+        key_stats["requests"] += 1
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+            key_stats["executions"] += 1
+        else:
+            key_stats["coalesced"] += 1
+
+        return await asyncio.shield(task)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retourne les compteurs par clé et les totaux."""
+        totals = {"requests": 0, "executions": 0, "coalesced": 0}
+        for key_stats in self.stats.values():
+            for counter, value in key_stats.items():
+                totals[counter] += value
+        return {
+            "in_flight": len(self._in_flight),
+            "totals": totals,
+            "by_key": {key: dict(value) for key, value in self.stats.items()},
+        }
+
+    def _done(self, key: Hashable, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        # Marque l'exception comme récupérée si tous les appelants sont partis
+        if not task.cancelled():
+            task.exception()
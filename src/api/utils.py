@@ -2,8 +2,23 @@
 Utilitaires pour l'API FastAPI
 """
 
+import functools
+import json
+import anyio
 import pandas as pd
-from typing import Dict, Any
+from fastapi.responses import JSONResponse
+from typing import Any, Callable, Dict
+from src.config.settings import settings
+from src.monitoring.metrics import time_stage
+
+try:
+    import orjson
+except ImportError:  # Dépendance optionnelle
+    orjson = None
+
+# Pools de threads bornés : les appels Supabase (I/O) et l'inférence (CPU)
+# ont chacun leur limite pour qu'une rafale de l'un n'affame pas l'autre
+_limiters: Dict[str, anyio.CapacityLimiter] = {}
 
 
 def validate_features(features: Dict[str, Any], expected_features: list) -> bool:
@@ -18,3 +33,78 @@ def prepare_features_df(features: Dict[str, Any]) -> pd.DataFrame:
     Prépare un DataFrame à partir des features
     """
     return pd.DataFrame([features])
+
+
+def _get_limiter(pool: str) -> anyio.CapacityLimiter:
+    if pool not in _limiters:
+        size = settings.api_io_threads if pool == "io" else settings.api_cpu_threads
+        _limiters[pool] = anyio.CapacityLimiter(size)
+    return _limiters[pool]
+
+
+async def run_io_bound(func: Callable, *args, **kwargs) -> Any:
+    """
+    Exécute un appel bloquant d'entrée/sortie (Supabase, disque)
+    dans le pool de threads I/O sans bloquer la boucle d'événements.
+    """
+    return await anyio.to_thread.run_sync(
+        functools.partial(func, *args, **kwargs), limiter=_get_limiter("io")
+    )
+
+
+async def run_cpu_bound(func: Callable, *args, **kwargs) -> Any:
+    """
+    Exécute un calcul (chargement de modèle, inférence) dans le pool
+    de threads dédié au calcul sans bloquer la boucle d'événements.
+    """
+    return await anyio.to_thread.run_sync(
+        functools.partial(func, *args, **kwargs), limiter=_get_limiter("cpu")
+    )
+
+
+class TimedJSONResponse(JSONResponse):
+    """
+    Réponse JSON dont l'encodage est mesuré dans l'étape « serialization »
+    des métriques.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with time_stage("serialization"):
+            return super().render(content)
+
+
+# Encodeur préconstruit pour le repli sans orjson : pas de vérification
+# des références circulaires (les réponses sont des dicts/listes simples)
+_json_encoder = json.JSONEncoder(
+    ensure_ascii=False,
+    allow_nan=False,
+    check_circular=False,
+    separators=(",", ":"),
+)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Réponse JSON rapide pour les gros payloads de prévision : orjson s'il est
+    installé, sinon l'encodeur json préconstruit. Renvoyée directement par
+    un endpoint, elle évite aussi le passage par jsonable_encoder de FastAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with time_stage("serialization"):
+            if orjson is not None:
+                return orjson.dumps(
+                    content,
+                    option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+                )
+            return _json_encoder.encode(content).encode("utf-8")
+
+
+def json_response(content: Any) -> Any:
+    """
+    Retourne le contenu tel quel (encodage FastAPI par défaut) ou, si
+    API_FAST_JSON est activé, une FastJSONResponse déjà encodée.
+    """
+    if settings.api_fast_json:
+        return FastJSONResponse(content)
+    return content
@@ -20,11 +20,92 @@ class Settings(BaseSettings):
     # API
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+    batch_max_rows: int = 100_000
+    api_io_threads: int = 16  # Appels Supabase
+    api_cpu_threads: int = 4  # Inférence des modèles
+    forecast_producer_timeout: float = 30.0  # Délai par producteur (s)
+    metrics_enabled: bool = True  # Endpoint /metrics et mesures par route
+    api_fast_json: bool = False  # Encodage orjson (si installé) des prévisions
+    api_compression_min_size: int = 1024  # Octets, 0 pour désactiver gzip/deflate
+    api_compression_level: int = 6
+
+    # Cache des prévisions (secondes)
+    forecast_cache_enabled: bool = True
+    forecast_cache_ttl: float = 300.0
+    forecast_cache_stale_ttl: float = 3600.0
+
+    # Prédictions matérialisées après chaque ingestion
+    predictions_store_path: str = "data/predictions/forecast_predictions.json"
+    predictions_max_age: float = 93600.0  # 26 h en secondes
+    predictions_supabase_table: str = ""  # Vide : stockage local uniquement
+
+    # Ingestion (fetch_all)
+    ingestion_max_workers: int = 5  # Téléchargements simultanés
+    ingestion_source_timeout: float = 900.0  # Délai global des sources (s)
+    history_start_date: str = "2016-09-01"  # Début des historiques Open-Meteo
+    hubeau_start_date: str = "2022-07-01"  # Début des débits Hub'Eau
+    ingestion_overlap_days: int = 7  # Jours rechargés pour les révisions
+    hubeau_page_size: int = 5000  # Lignes par page (max API : 20 000)
+    hubeau_window_days: int = 365  # Fenêtres de dates téléchargées en parallèle
+    hubeau_max_workers: int = 4
+    archive_chunk: str = "year"  # Découpage de l'archive Open-Meteo : year ou month
+    archive_max_workers: int = 4
+    archive_checkpoint_dir: str = "data/cache/archive_chunks"
+    archive_final_lag_days: int = 10  # Jours récents encore révisés (non repris)
+
+    # Upserts Supabase par lots
+    upsert_batch_size: int = 1000  # Lignes par requête
+    upsert_max_workers: int = 4  # Lots envoyés en parallèle
+    upsert_retries: int = 3
+    upsert_backoff: float = 1.0  # Délai initial (s), doublé à chaque tentative
+    upload_skip_unchanged: bool = True  # N'envoyer que les lignes modifiées
+    upload_hash_index_dir: str = "data/cache/upload_hashes"
+
+    # Chargement des données d'entraînement depuis Supabase
+    training_page_size: int = 1000  # Lignes par page (max-rows PostgREST)
+    training_max_workers: int = 4  # Pages téléchargées en parallèle
+    training_snapshot_enabled: bool = True  # Instantanés locaux incrémentaux
+    training_snapshot_dir: str = "data/cache/training_snapshots"
+
+    # Entraînement parallèle des modèles (producteurs × familles)
+    training_cpu_budget: int = 0  # Cœurs utilisés au total (0 : tous)
+    training_max_processes: int = 0  # Processus simultanés (0 : selon le budget)
+
+    # Recherche d'hyperparamètres (halving successif)
+    search_enabled: bool = False  # Recherche activée par défaut à l'entraînement
+    search_time_budget: float = 600.0  # Durée maximale de la recherche (s)
+    search_n_configs: int = 27  # Configurations tirées par famille
+    search_eta: int = 3  # Facteur d'élimination entre deux paliers
+    search_min_fraction: float = 0.11  # Part des données au premier palier
+    search_max_workers: int = 0  # Évaluations en parallèle (0 : tous les cœurs)
+    search_xgb_max_estimators: int = 2000  # Borne haute avant arrêt anticipé
+    search_early_stopping_rounds: int = 30
+
+    # Ré-entraînement incrémental (reprise du modèle sauvegardé)
+    training_incremental: bool = False  # Mode incrémental par défaut
+    training_full_rebuild_days: int = 7  # Reconstruction complète au-delà (jours)
+    incremental_min_rows: int = 7  # Nouvelles lignes minimales pour une mise à jour
+    incremental_xgb_rounds: int = 50  # Arbres XGBoost ajoutés par mise à jour
+    incremental_rf_trees: int = 10  # Arbres Random Forest ajoutés par mise à jour
+
+    # Session HTTP des fetchers (cache des réponses en secondes)
+    http_cache_enabled: bool = True
+    http_cache_path: str = "data/cache/http_cache.sqlite"
+    http_archive_cache_ttl: float = 86400.0  # Archive Open-Meteo récente (révisée)
+    http_forecast_cache_ttl: float = 3600.0  # Prévisions Open-Meteo
+    http_hubeau_cache_ttl: float = 3600.0  # Débits Hub'Eau (révisés)
+    http_timeout: float = 60.0
+    http_retries: int = 3
+    http_backoff_factor: float = 0.5
+    http_pool_size: int = 10
 
     # Chemins
     models_path: str = "models/saved"
     data_raw_path: str = "data/raw"
 
+    # Registre des modèles (intervalle de vérification des fichiers, en secondes)
+    model_registry_check_interval: float = 2.0
+
     # Configuration des producteurs
     solar_nominal_power: float = 150.0  # kWc
     wind_nominal_power: float = 100.0  # kW
@@ -0,0 +1,158 @@
+"""
+Téléchargement par morceaux de l'archive Open-Meteo, avec reprise.
+
+Une longue période (2016 à aujourd'hui) est découpée en années ou en mois
+téléchargés en parallèle. Chaque morceau terminé et définitif est enregistré
+sur disque : un rechargement interrompu reprend là où il s'était arrêté.
+"""
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import Callable, List, Tuple
+
+import pandas as pd
+
+from src.config.settings import settings
+
+
+def archive_key(
+    data_type: str, latitude: float, longitude: float, variables: str
+) -> str:
+    """
+    Identifiant d'une série d'archive : un changement de coordonnées ou de
+    variables demandées n'utilise pas les anciens points de reprise.
+    """
+    digest = hashlib.sha256(variables.encode()).hexdigest()[:8]
+    return f"{data_type}_{latitude}_{longitude}_{digest}"
+
+
+def split_calendar_chunks(
+    start_date: str, end_date: str, chunk: str = "year"
+) -> List[Tuple[str, str]]:
+    """
+    Découpe [start_date, end_date] (bornes incluses) aux limites d'année
+    ou de mois calendaire.
+    """
+    if chunk not in ("year", "month"):
+        raise ValueError("chunk doit être 'year' ou 'month'")
+
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    chunks = []
+    while start <= end:
+        if chunk == "year":
+            next_start = date(start.year + 1, 1, 1)
+        else:
+            next_start = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+        chunk_end = min(next_start - timedelta(days=1), end)
+        chunks.append((start.isoformat(), chunk_end.isoformat()))
+        start = next_start
+    return chunks
+
+
+def fetch_archive_chunked(
+    fetch_chunk: Callable[[str, str], pd.DataFrame],
+    key: str,
+    start_date: str,
+    end_date: str,
+    chunk: str = None,
+    max_workers: int = None,
+    checkpoint_dir: str = None,
+) -> pd.DataFrame:
+    """
+    Télécharge une période d'archive par morceaux en parallèle et les fusionne
+    dans l'ordre des dates.
+    Args:
+        fetch_chunk: Fonction (start_date, end_date) -> DataFrame d'un morceau
+        key: Identifiant de la série (producteur, coordonnées, variables),
+            utilisé pour le dossier des points de reprise
+        chunk: Découpage 'year' ou 'month'
+        max_workers: Nombre maximal de morceaux téléchargés simultanément
+        checkpoint_dir: Dossier des points de reprise
+    Returns:
+        DataFrame de toute la période, trié par date (colonne time)
+    Raises:
+        Exception: La première erreur d'un morceau, une fois les autres terminés
+            (les morceaux réussis restent enregistrés pour la reprise)
+    """
+    chunk = chunk or settings.archive_chunk
+    max_workers = max_workers or settings.archive_max_workers
+    checkpoint_dir = os.path.join(
+        checkpoint_dir or settings.archive_checkpoint_dir, key
+    )
+
+    chunks = split_calendar_chunks(start_date, end_date, chunk)
+    if len(chunks) <= 1:
+        # Période courte (ingestion incrémentale) : un seul appel, sans reprise
+        return fetch_chunk(start_date, end_date)
+
+    # Les derniers jours de l'archive sont encore révisés : pas de point de reprise
+    final_before = date.today() - timedelta(days=settings.archive_final_lag_days)
+
+    frames = {}
+    to_fetch = []
+    for index, (chunk_start, chunk_end) in enumerate(chunks):
+        path = os.path.join(checkpoint_dir, f"{chunk_start}_{chunk_end}.pkl")
+        if os.path.exists(path):
+            frames[index] = pd.read_pickle(path)
+        else:
+            to_fetch.append((index, chunk_start, chunk_end, path))
+
+    logging.info(
+        f"Archive {key}: {len(chunks)} morceaux, {len(frames)} repris sur disque, "
+        f"{len(to_fetch)} à télécharger"
+    )
+
+    first_error = None
+    if to_fetch:
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(to_fetch)), thread_name_prefix="archive"
+        ) as executor:
+            futures = {
+                executor.submit(fetch_chunk, chunk_start, chunk_end): (
+                    index,
+                    chunk_end,
+                    path,
+                )
+                for index, chunk_start, chunk_end, path in to_fetch
+            }
+            for future in as_completed(futures):
+                index, chunk_end, path = futures[future]
+                try:
+                    df = future.result()
+                except Exception as e:
+                    logging.error(
+                        f"Archive {key}: morceau {os.path.basename(path)} en échec: {e}"
+                    )
+                    first_error = first_error or e
+                    continue
+
+                frames[index] = df
+                if not df.empty and date.fromisoformat(chunk_end) < final_before:
+                    _save_checkpoint(df, path)
+
+    if first_error is not None:
+        raise first_error
+
+    non_empty = [frames[index] for index in sorted(frames) if not frames[index].empty]
+    if not non_empty:
+        return pd.DataFrame()
+
+    merged = pd.concat(non_empty, ignore_index=True)
+    if "time" in merged.columns:
+        merged = (
+            merged.drop_duplicates(subset="time", keep="last")
+            .sort_values("time")
+            .reset_index(drop=True)
+        )
+    return merged
+
+
+def _save_checkpoint(df: pd.DataFrame, path: str):
+    """Écriture atomique d'un morceau terminé."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
@@ -1,51 +1,189 @@
 import logging
 import os
+import time
 import pandas as pd
+from datetime import date, timedelta
+from functools import partial
+from typing import Callable, Dict, Optional
 from src.data_ingestion.handlers.handler_meteo import WeatherDataHandler
 from src.data_ingestion.handlers.handler_hubeau import HubeauDataHandler
 from src.data_ingestion.handlers.etl_supabase import SupabaseHandler, DataUploader
 from src.data_ingestion.utils.data_cleaner import DataCleaner
 from src.config.settings import settings
+from src.utils.concurrency import run_concurrently
 
 
-def manage_forecast_tables(supabase_handler):
+# Tables forecast remplacées à chaque exécution par la nouvelle fenêtre de prévision
+FORECAST_TABLES = [
+    "raw_solar_forecast",
+    "clean_solar_forecast",
+    "raw_wind_forecast",
+    "clean_wind_forecast",
+]
+
+
+def upload_succeeded(summary) -> bool:
     """
-    Nettoie COMPLÈTEMENT les tables forecast pour ne garder que les 16 nouveaux jours.
-    Les tables history restent intactes pour l'accumulation historique.
+    Vrai si un envoi DataUploader a écrit toutes ses lignes : aucun lot en
+    échec et rows_sent égal à rows (0/0 quand toutes les lignes sont inchangées).
     """
-    forecast_tables = [
-        "raw_solar_forecast",
-        "clean_solar_forecast",
-        "raw_wind_forecast",
-        "clean_wind_forecast",
-    ]
-
-    for table in forecast_tables:
-        try:
-            # Compter le nombre de lignes avant suppression
-            count_before = (
-                supabase_handler.supabase.table(table)
-                .select("date", count="exact")
-                .execute()
-            )
+    return (
+        isinstance(summary, dict)
+        and not summary.get("failed_batches")
+        and summary.get("rows_sent") == summary.get("rows")
+    )
+
+
+def prune_forecast_table(supabase_handler, table: str, df: pd.DataFrame) -> bool:
+    """
+    Supprime d'une table forecast les dates hors de la nouvelle fenêtre de
+    prévision (une seule requête). À appeler APRÈS l'upsert réussi de cette
+    fenêtre : la table n'est jamais vide pour les lecteurs, et un échec du
+    téléchargement ou de l'envoi laisse l'ancienne prévision en place.
+    Returns:
+        True si l'élagage a réussi
+    """
+    if df.empty or "date" not in df.columns:
+        return False
+
+    dates = pd.to_datetime(df["date"])
+    start = dates.min().strftime("%Y-%m-%d")
+    end = dates.max().strftime("%Y-%m-%d")
+
+    try:
+        supabase_handler.supabase.table(table).delete().or_(
+            f"date.lt.{start},date.gt.{end}"
+        ).execute()
+        logging.info(f"Table {table}: dates hors de [{start}, {end}] supprimées")
+        return True
+
+    except Exception as e:
+        logging.error(f"Erreur lors de l'élagage de {table}: {e}.")
+        return False
 
-            # Supprimer TOUTES les données
-            supabase_handler.supabase.table(table).delete().gte(
-                "date", "1900-01-01"
-            ).execute()
 
+def get_high_water_mark(supabase_handler, table: str) -> Optional[date]:
+    """
+    Retourne la date la plus récente déjà présente dans une table clean_*
+    (None si la table est vide ou inaccessible).
+    """
+    try:
+        response = (
+            supabase_handler.supabase.table(table)
+            .select("date")
+            .order("date", desc=True)
+            .limit(1)
+            .execute()
+        )
+        if not response.data:
+            return None
+        return pd.to_datetime(response.data[0]["date"]).date()
+
+    except Exception as e:
+        logging.warning(f"Dernière date de {table} indisponible: {e}")
+        return None
+
+
+def incremental_start_date(
+    supabase_handler,
+    table: str,
+    default_start: str,
+    full_backfill: bool = False,
+    overlap_days: int = None,
+) -> str:
+    """
+    Date de début du téléchargement d'un historique : la dernière date déjà
+    en base moins une fenêtre de recouvrement (révisions des API), ou la date
+    de début complète si la table est vide ou si full_backfill est demandé.
+    """
+    if full_backfill:
+        logging.info(f"{table}: rechargement complet depuis {default_start}")
+        return default_start
+
+    overlap_days = (
+        settings.ingestion_overlap_days if overlap_days is None else overlap_days
+    )
+    high_water_mark = get_high_water_mark(supabase_handler, table)
+    if high_water_mark is None:
+        logging.info(f"{table}: aucune donnée, chargement complet depuis {default_start}")
+        return default_start
+
+    start = max(
+        high_water_mark - timedelta(days=overlap_days),
+        date.fromisoformat(default_start),
+    )
+    logging.info(
+        f"{table}: dernière date {high_water_mark}, "
+        f"chargement incrémental depuis {start} ({overlap_days} jours de recouvrement)"
+    )
+    return start.strftime("%Y-%m-%d")
+
+
+def fetch_sources(
+    tasks: Dict[str, Callable[[], pd.DataFrame]],
+    max_workers: int = None,
+    timeout: float = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Télécharge plusieurs sources externes en parallèle.
+    Une source en échec ou hors délai donne un DataFrame vide sans bloquer
+    les autres. La durée de chaque source est journalisée.
+    Args:
+        tasks: Dictionnaire {source: fonction sans argument retournant un DataFrame}
+        max_workers: Nombre maximal de téléchargements simultanés
+        timeout: Délai maximal global en secondes
+    Returns:
+        Dictionnaire {source: DataFrame}
+    """
+    max_workers = max_workers or settings.ingestion_max_workers
+    timeout = settings.ingestion_source_timeout if timeout is None else timeout
+
+    def timed(source: str, task: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        start = time.perf_counter()
+        try:
+            df = task()
             logging.info(
-                f"Table {table} vidée ({count_before.count} lignes supprimées.)"
+                f"Source {source}: {len(df)} lignes en {time.perf_counter() - start:.2f}s"
             )
-
+            return df
         except Exception as e:
-            logging.error(f"Erreur lors du vidage de {table}: {e}.")
+            logging.error(
+                f"Source {source} en échec après {time.perf_counter() - start:.2f}s: {e}"
+            )
+            return pd.DataFrame()
+
+    start = time.perf_counter()
+    results, errors = run_concurrently(
+        {source: partial(timed, source, task) for source, task in tasks.items()},
+        timeout,
+        pool="fetch",
+        max_workers=max_workers,
+    )
+    # timed absorbe les erreurs : il ne reste que les sources hors délai
+    for source in errors:
+        logging.error(f"Source {source} hors délai ({timeout}s), ignorée")
+    results = {source: results.get(source, pd.DataFrame()) for source in tasks}
+
+    logging.info(
+        f"{len(tasks)} sources récupérées en {time.perf_counter() - start:.2f}s "
+        f"({max_workers} téléchargements simultanés max)"
+    )
+    return results
 
 
 def fetch_all(
-    latitude: float = None, longitude: float = None, hubeau_station: str = None
+    latitude: float = None,
+    longitude: float = None,
+    hubeau_station: str = None,
+    full_backfill: bool = False,
 ):
-    """Charge toutes les données, nettoie et les pousse dans Supabase."""
+    """
+    Charge toutes les données, nettoie et les pousse dans Supabase.
+    Les historiques ne sont téléchargés qu'à partir de la dernière date déjà
+    en base (moins le recouvrement), sauf si full_backfill est demandé.
+    Les tables forecast ne sont remplacées qu'après l'upsert réussi de la
+    nouvelle prévision (voir prune_forecast_table).
+    """
 
     latitude = latitude or settings.montpellier_latitude
     longitude = longitude or settings.montpellier_longitude
@@ -55,11 +193,10 @@ def fetch_all(
 
     # Initialiser SupabaseHandler et DataUploader
     supabase_handler = SupabaseHandler()
-    data_uploader = DataUploader(supabase_handler)
-
-    # Nettoyage des tables forecast
-    logging.info("Nettoyage des tables forecast...")
-    manage_forecast_tables(supabase_handler)
+    # Rechargement complet : toutes les lignes sont renvoyées, même inchangées
+    data_uploader = DataUploader(
+        supabase_handler, skip_unchanged=False if full_backfill else None
+    )
 
     # Données API météo
     solar_handler = WeatherDataHandler(
@@ -69,27 +206,50 @@ def fetch_all(
         latitude=latitude, longitude=longitude, data_type="wind"
     )
 
-    # Charger les données avec des dates par défaut
+    # Plages de dates : incrémentales à partir des tables clean_*
     today = pd.Timestamp.today().date()
-
-    solar_forecast = solar_handler.load(forecast=True)
-    solar_history = solar_handler.load(
-        start_date="2016-09-01", end_date=today.strftime("%Y-%m-%d"), forecast=False
+    solar_start = incremental_start_date(
+        supabase_handler,
+        "clean_solar_history",
+        settings.history_start_date,
+        full_backfill,
     )
-    wind_forecast = wind_handler.load(forecast=True)
-    wind_history = wind_handler.load(
-        start_date="2016-09-01", end_date=today.strftime("%Y-%m-%d"), forecast=False
+    wind_start = incremental_start_date(
+        supabase_handler,
+        "clean_wind_history",
+        settings.history_start_date,
+        full_backfill,
+    )
+    hubeau_start = incremental_start_date(
+        supabase_handler, "clean_hubeau", settings.hubeau_start_date, full_backfill
     )
 
     # Données API Hub'Eau
     hubeau_handler = HubeauDataHandler(
         code_station=hubeau_station,
-        start_date="2022-07-01",
+        start_date=hubeau_start,
         end_date=today.strftime("%Y-%m-%d"),
     )
-    df_hydro = hubeau_handler.load()
-    if not df_hydro.empty:
-        hubeau_handler.clean()
+
+    # Les appels Open-Meteo sont indépendants : téléchargement en parallèle.
+    # Les réponses sont gardées brutes : raw et clean en sont dérivés une seule fois.
+    # Hub'Eau (historique le plus long) est traité page par page à l'envoi
+    sources = fetch_sources(
+        {
+            "solar_forecast": lambda: solar_handler.fetch(forecast=True),
+            "solar_history": lambda: solar_handler.fetch(
+                start_date=solar_start,
+                end_date=today.strftime("%Y-%m-%d"),
+                forecast=False,
+            ),
+            "wind_forecast": lambda: wind_handler.fetch(forecast=True),
+            "wind_history": lambda: wind_handler.fetch(
+                start_date=wind_start,
+                end_date=today.strftime("%Y-%m-%d"),
+                forecast=False,
+            ),
+        }
+    )
 
     # Données CSV locales
     data_raw_path = settings.data_raw_path
@@ -111,42 +271,51 @@ def fetch_all(
         else pd.DataFrame()
     )
 
+    # Dérivation raw/clean en une passe par source
+    derivations = {
+        "solar_forecast": DataCleaner.derive_solar_data,
+        "solar_history": DataCleaner.derive_solar_data,
+        "wind_forecast": DataCleaner.derive_wind_data,
+        "wind_history": DataCleaner.derive_wind_data,
+    }
+    datasets = {}
+    for source, derive in derivations.items():
+        try:
+            datasets[source] = derive(sources[source])
+        except Exception as e:
+            logging.error(f"Erreur lors du nettoyage de {source}: {e}")
+            datasets[source] = (pd.DataFrame(), pd.DataFrame())
+
     # UPLOAD VERS SUPABASE - AVEC SÉPARATION STRICTE RAW/CLEAN
+    df_hubeau = pd.DataFrame()
     try:
-        # Données météo SOLAIRES
-        if not solar_forecast.empty:
-            # Données brutes SANS AUCUNE conversion
-            solar_forecast_raw = DataCleaner.prepare_solar_data_raw(solar_forecast)
-            data_uploader.upload_raw_dataset(solar_forecast_raw, "solar_forecast")
-            # Données clean AVEC conversions
-            solar_forecast_clean = DataCleaner.clean_solar_data(solar_forecast)
-            data_uploader.upload_clean_dataset(solar_forecast_clean, "solar_forecast")
-
-        if not solar_history.empty:
-            solar_history_raw = DataCleaner.prepare_solar_data_raw(solar_history)
-            data_uploader.upload_raw_dataset(solar_history_raw, "solar_history")
-            solar_history_clean = DataCleaner.clean_solar_data(solar_history)
-            data_uploader.upload_clean_dataset(solar_history_clean, "solar_history")
-
-        # Données météo ÉOLIENNES
-        if not wind_forecast.empty:
-            wind_forecast_raw = DataCleaner.prepare_wind_data_raw(wind_forecast)
-            data_uploader.upload_raw_dataset(wind_forecast_raw, "wind_forecast")
-            wind_forecast_clean = DataCleaner.clean_wind_data(wind_forecast)
-            data_uploader.upload_clean_dataset(wind_forecast_clean, "wind_forecast")
-
-        if not wind_history.empty:
-            wind_history_raw = DataCleaner.prepare_wind_data_raw(wind_history)
-            data_uploader.upload_raw_dataset(wind_history_raw, "wind_history")
-            wind_history_clean = DataCleaner.clean_wind_data(wind_history)
-            data_uploader.upload_clean_dataset(wind_history_clean, "wind_history")
-
-        # Données Hub'Eau
-        if not df_hydro.empty:
-            hubeau_raw = DataCleaner.prepare_hydro_data_raw(df_hydro)
-            data_uploader.upload_raw_dataset(hubeau_raw, "hubeau")
-            hubeau_clean = DataCleaner.clean_hydro_data(df_hydro)
-            data_uploader.upload_clean_dataset(hubeau_clean, "hubeau")
+        # Données météo et Hub'Eau : raw SANS conversion, clean AVEC conversions.
+        # Tables forecast : upsert de la nouvelle fenêtre, puis élagage des
+        # dates hors fenêtre seulement si l'upsert a réussi
+        for source, (df_raw, df_clean) in datasets.items():
+            for kind, df, upload in (
+                ("raw", df_raw, data_uploader.upload_raw_dataset),
+                ("clean", df_clean, data_uploader.upload_clean_dataset),
+            ):
+                if df.empty:
+                    continue
+                summary = upload(df, source)
+                table = f"{kind}_{source}"
+                if table in FORECAST_TABLES:
+                    if not upload_succeeded(summary):
+                        logging.warning(
+                            f"Upsert de {table} incomplet : ancienne prévision conservée"
+                        )
+                    elif prune_forecast_table(supabase_handler, table, df):
+                        data_uploader.hash_index.retain(table, df)
+
+        # Hub'Eau : chaque page est dérivée et envoyée avant la suivante, les
+        # fenêtres suivantes se téléchargeant pendant l'envoi
+        def upload_hubeau_page(df_raw: pd.DataFrame, df_clean: pd.DataFrame):
+            data_uploader.upload_raw_dataset(df_raw, "hubeau")
+            data_uploader.upload_clean_dataset(df_clean, "hubeau")
+
+        df_hubeau = hubeau_handler.stream(upload_hubeau_page)
 
         # Données de production
         if not df_solar_prod.empty:
@@ -177,12 +346,10 @@ def fetch_all(
         logging.error(f"Erreur lors de l'upload Supabase: {e}")
 
     # Préparer les données pour le retour
+    # (versions clean des sources API)
     results = {
-        "hubeau": df_hydro,
-        "solar_forecast": solar_forecast,
-        "solar_history": solar_history,
-        "wind_forecast": wind_forecast,
-        "wind_history": wind_history,
+        **{source: df_clean for source, (_, df_clean) in datasets.items()},
+        "hubeau": df_hubeau,
         "prod_solaire": df_solar_prod,
         "prod_eolienne": df_wind_prod,
         "prod_hydro": df_hydro_prod,
@@ -1,14 +1,24 @@
-import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Iterator, List, Optional, Tuple
+from src.config.settings import settings
+from .http_session import get_session
+
+HUBEAU_OBS_ELAB_URL = "https://hubeau.eaufrance.fr/api/v2/hydrometrie/obs_elab"
 
 
 def get_hubeau_data(code_station: str, start_date: str, end_date: str):
     """
     Récupère les données hydrométriques (débit moyen journalier) à partir de l'API
     Hubeau pour une station hydrométrique donnée et une période spécifiée.
+    Toutes les pages de résultats sont récupérées et concaténées (voir
+    iter_hubeau_data) ; l'ingestion passe par HubeauDataHandler.stream pour
+    traiter les pages une à une sans garder tout l'historique en mémoire.
 
     Args:
-        code_station (str): Code de la station hydrométrique (ex. 'Y321002101').
+        code_station (str): Code de la station hydrométrique (ex. 'Y321002101'),
+            ou plusieurs codes séparés par des virgules.
         start_date (str): Date de début au format 'YYYY-MM-DD'.
         end_date (str): Date de fin au format 'YYYY-MM-DD'.
 
@@ -27,17 +37,102 @@ def get_hubeau_data(code_station: str, start_date: str, end_date: str):
         >>> df = get_hubeau_data("Y321002101", "2024-01-01", "2024-12-31")
         >>> df.head()
     """
-    url = "https://hubeau.eaufrance.fr/api/v2/hydrometrie/obs_elab"
+    chunks = list(iter_hubeau_data(code_station, start_date, end_date))
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
+
+
+def iter_hubeau_data(
+    code_station: str,
+    start_date: str,
+    end_date: str,
+    window_days: int = None,
+    max_workers: int = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Générateur de DataFrames (une page de résultats par morceau), dans l'ordre
+    des dates. La période est découpée en fenêtres de `window_days` jours
+    téléchargées en parallèle ; les pages d'une même fenêtre suivent les liens
+    `next` de l'API. Au plus `max_workers` fenêtres sont en mémoire à la fois.
+    """
+    window_days = window_days or settings.hubeau_window_days
+    max_workers = max_workers or settings.hubeau_max_workers
+    windows = split_date_range(start_date, end_date, window_days)
+
+    if len(windows) == 1:
+        yield from iter_hubeau_pages(code_station, *windows[0])
+        return
+
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(windows)), thread_name_prefix="hubeau"
+    ) as executor:
+        # Fenêtres soumises au fil de l'eau pour borner la mémoire
+        pending = [
+            executor.submit(_fetch_window, code_station, *window)
+            for window in windows[:max_workers]
+        ]
+        next_window = len(pending)
+
+        while pending:
+            chunks = pending.pop(0).result()
+            if next_window < len(windows):
+                pending.append(
+                    executor.submit(_fetch_window, code_station, *windows[next_window])
+                )
+                next_window += 1
+            yield from chunks
+
+
+def iter_hubeau_pages(
+    code_station: str, start_date: Optional[str], end_date: Optional[str]
+) -> Iterator[pd.DataFrame]:
+    """
+    Générateur des pages de résultats d'une requête Hub'Eau, en suivant
+    le lien `next` tant que l'API en renvoie un (statut 206).
+    """
     params = {
         "code_entite": code_station,
         "date_debut_obs_elab": start_date,
         "date_fin_obs_elab": end_date,
         "grandeur_hydro_elab": "QmnJ",
-        "size": 20000,
+        "size": settings.hubeau_page_size,
     }
+    url = HUBEAU_OBS_ELAB_URL
+
+    while url:
+        response = get_session().get(url, params=params, timeout=settings.http_timeout)
+        response.raise_for_status()
+        data = response.json()
+
+        chunk = pd.DataFrame(data.get("data", []))
+        if not chunk.empty:
+            yield chunk
+
+        # Le lien next contient déjà tous les paramètres de la requête
+        url, params = data.get("next"), None
+
+
+def split_date_range(
+    start_date: Optional[str], end_date: Optional[str], window_days: int
+) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Découpe [start_date, end_date] (bornes incluses) en fenêtres consécutives
+    de `window_days` jours. Une période ouverte reste une seule fenêtre.
+    """
+    if not start_date or not end_date:
+        return [(start_date, end_date)]
+
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    windows = []
+    while start <= end:
+        window_end = min(start + timedelta(days=window_days - 1), end)
+        windows.append((start.isoformat(), window_end.isoformat()))
+        start = window_end + timedelta(days=1)
+    return windows or [(start_date, end_date)]
 
-    response = requests.get(url, params=params)
-    response.raise_for_status()
-    data = response.json()
 
-    return pd.DataFrame(data.get("data", []))
+def _fetch_window(
+    code_station: str, start_date: str, end_date: str
+) -> List[pd.DataFrame]:
+    return list(iter_hubeau_pages(code_station, start_date, end_date))
@@ -1,5 +1,10 @@
 import pandas as pd
-import requests
+from functools import partial
+from src.config.settings import settings
+from .archive_backfill import archive_key, fetch_archive_chunked
+from .http_session import get_archive, get_session
+
+WIND_HISTORY_DAILY = "wind_speed_10m_max,wind_gusts_10m_max,wind_direction_10m_dominant,wind_gusts_10m_mean,temperature_2m_mean,surface_pressure_mean,cloud_cover_mean"
 
 
 def get_wind_forecast(
@@ -17,7 +22,7 @@ def get_wind_forecast(
         "forecast_days": 16,
     }
 
-    response = requests.get(url, params=params)
+    response = get_session().get(url, params=params, timeout=settings.http_timeout)
     response.raise_for_status()
     data = response.json()
 
@@ -33,18 +38,33 @@ def get_wind_history(
 ) -> pd.DataFrame:
     """
     Données historiques éoliennes journalières via Open-Meteo archive API.
+    Les longues périodes sont téléchargées par morceaux en parallèle,
+    avec reprise (voir fetch_archive_chunked).
     """
+    key = archive_key("wind", latitude, longitude, WIND_HISTORY_DAILY)
+    return fetch_archive_chunked(
+        partial(_get_wind_history_chunk, latitude, longitude),
+        key,
+        start_date,
+        end_date,
+    )
+
+
+def _get_wind_history_chunk(
+    latitude: float, longitude: float, start_date: str, end_date: str
+) -> pd.DataFrame:
+    """Télécharge un morceau de l'archive (un seul appel API)."""
     url = "https://archive-api.open-meteo.com/v1/archive"
     params = {
         "latitude": latitude,
         "longitude": longitude,
         "start_date": start_date,
         "end_date": end_date,
-        "daily": "wind_speed_10m_max,wind_gusts_10m_max,wind_direction_10m_dominant,wind_gusts_10m_mean,temperature_2m_mean,surface_pressure_mean,cloud_cover_mean",
+        "daily": WIND_HISTORY_DAILY,
         "timezone": "Europe/Paris",
     }
 
-    response = requests.get(url, params=params)
+    response = get_archive(url, params)
     response.raise_for_status()
     data = response.json()
 
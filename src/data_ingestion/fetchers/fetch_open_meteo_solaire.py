@@ -1,5 +1,10 @@
 import pandas as pd
-import requests
+from functools import partial
+from src.config.settings import settings
+from .archive_backfill import archive_key, fetch_archive_chunked
+from .http_session import get_archive, get_session
+
+SOLAR_HISTORY_DAILY = "temperature_2m_max,temperature_2m_min,temperature_2m_mean,shortwave_radiation_sum,sunshine_duration,daylight_duration,cloud_cover_mean,relative_humidity_2m_mean,precipitation_sum,wind_speed_10m_mean"
 
 
 def get_solar_forecast(
@@ -17,7 +22,7 @@ def get_solar_forecast(
         "forecast_days": 16,
     }
 
-    response = requests.get(url, params=params)
+    response = get_session().get(url, params=params, timeout=settings.http_timeout)
     response.raise_for_status()
     data = response.json()
 
@@ -33,18 +38,33 @@ def get_solar_history(
 ) -> pd.DataFrame:
     """
     Données historiques solaires optimisées pour l'entraînement des modèles.
+    Les longues périodes sont téléchargées par morceaux en parallèle,
+    avec reprise (voir fetch_archive_chunked).
     """
+    key = archive_key("solar", latitude, longitude, SOLAR_HISTORY_DAILY)
+    return fetch_archive_chunked(
+        partial(_get_solar_history_chunk, latitude, longitude),
+        key,
+        start_date,
+        end_date,
+    )
+
+
+def _get_solar_history_chunk(
+    latitude: float, longitude: float, start_date: str, end_date: str
+) -> pd.DataFrame:
+    """Télécharge un morceau de l'archive (un seul appel API)."""
     url = "https://archive-api.open-meteo.com/v1/archive"
     params = {
         "latitude": latitude,
         "longitude": longitude,
         "start_date": start_date,
         "end_date": end_date,
-        "daily": "temperature_2m_max,temperature_2m_min,temperature_2m_mean,shortwave_radiation_sum,sunshine_duration,daylight_duration,cloud_cover_mean,relative_humidity_2m_mean,precipitation_sum,wind_speed_10m_mean",
+        "daily": SOLAR_HISTORY_DAILY,
         "timezone": "Europe/Paris",
     }
 
-    response = requests.get(url, params=params)
+    response = get_archive(url, params)
     response.raise_for_status()
     data = response.json()
 
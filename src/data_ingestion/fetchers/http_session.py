@@ -0,0 +1,120 @@
+"""
+Session HTTP partagée par les fetchers Open-Meteo et Hub'Eau.
+
+- pool de connexions keep-alive réutilisé par tous les appels (et tous les threads)
+- nouvelles tentatives avec backoff exponentiel (retry-requests)
+- cache des réponses sur disque (requests-cache, SQLite) avec une durée
+  de vie par endpoint : une plage d'archive définitive ne change plus, les
+  derniers jours de l'archive et les prévisions si
+"""
+
+import logging
+import threading
+from datetime import date, timedelta
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests_cache import DO_NOT_CACHE, NEVER_EXPIRE, CachedSession
+from retry_requests import retry
+
+from src.config.settings import settings
+
+# Codes HTTP à retenter (limite de débit et erreurs serveur transitoires)
+STATUS_TO_RETRY = (429, 500, 502, 503, 504)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def cache_policy() -> dict:
+    """
+    Durée de vie du cache par endpoint (secondes, ou NEVER_EXPIRE).
+    L'archive a une durée finie par défaut : une plage qui couvre les
+    derniers jours est encore révisée (voir archive_expire_after).
+    """
+    return {
+        "archive-api.open-meteo.com/*": settings.http_archive_cache_ttl,
+        "api.open-meteo.com/*": settings.http_forecast_cache_ttl,
+        "hubeau.eaufrance.fr/*": settings.http_hubeau_cache_ttl,
+    }
+
+
+def archive_expire_after(end_date: str):
+    """
+    Durée de vie d'une réponse d'archive selon la fin de sa plage : une plage
+    antérieure à archive_final_lag_days jours ne sera plus révisée et
+    n'expire jamais ; sinon la durée de l'archive récente s'applique.
+    """
+    final_before = date.today() - timedelta(days=settings.archive_final_lag_days)
+    if date.fromisoformat(str(end_date)[:10]) < final_before:
+        return NEVER_EXPIRE
+    return settings.http_archive_cache_ttl
+
+
+def get_archive(url: str, params: dict) -> requests.Response:
+    """GET sur l'archive Open-Meteo, mis en cache selon la fin de la plage."""
+    session = get_session()
+    kwargs = {}
+    if isinstance(session, CachedSession):
+        kwargs["expire_after"] = archive_expire_after(params["end_date"])
+    return session.get(url, params=params, timeout=settings.http_timeout, **kwargs)
+
+
+def create_session(cache: bool = None) -> requests.Session:
+    """
+    Crée une session HTTP avec pool de connexions, nouvelles tentatives
+    et, si activé, cache SQLite des réponses.
+    """
+    cache = settings.http_cache_enabled if cache is None else cache
+
+    if cache:
+        session = CachedSession(
+            settings.http_cache_path,
+            backend="sqlite",
+            urls_expire_after=cache_policy(),
+            # Les endpoints absents de la politique ne sont pas mis en cache
+            expire_after=DO_NOT_CACHE,
+            allowable_codes=(200,),
+            stale_if_error=True,
+        )
+        try:
+            # Les réponses expirées (archive récente, prévisions) sont purgées
+            session.cache.delete(expired=True)
+        except Exception as e:
+            logging.warning(f"Purge du cache HTTP impossible: {e}")
+    else:
+        session = requests.Session()
+
+    session = retry(
+        session,
+        retries=settings.http_retries,
+        backoff_factor=settings.http_backoff_factor,
+        status_to_retry=STATUS_TO_RETRY,
+    )
+
+    # Même politique de nouvelles tentatives, avec un pool dimensionné pour
+    # les téléchargements parallèles
+    max_retries = session.get_adapter("https://").max_retries
+    adapter = HTTPAdapter(
+        pool_connections=settings.http_pool_size,
+        pool_maxsize=settings.http_pool_size,
+        max_retries=max_retries,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Retourne la session partagée par tous les fetchers (créée au premier appel)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+                logging.info(
+                    f"Session HTTP initialisée (cache: "
+                    f"{settings.http_cache_path if settings.http_cache_enabled else 'désactivé'})"
+                )
+    return _session
@@ -1,12 +1,35 @@
+import json
 import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 from supabase import create_client, Client
 from src.config.settings import settings
 
+try:
+    import orjson
+except ImportError:  # Dépendance optionnelle
+    orjson = None
+
 # CONFIGURATION SUPABASE
 SUPABASE_URL = settings.supabase_url
 SUPABASE_KEY = settings.supabase_key
 
+# Encodeur JSON compact préconstruit (repli si orjson n'est pas installé)
+_json_encoder = json.JSONEncoder(
+    ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=str
+)
+
+# Lignes encodées pour estimer la taille des lots envoyés
+SIZE_SAMPLE_ROWS = 100
+
+# Colonnes de date servant de clé aux hashs de lignes, par ordre de priorité
+DATE_KEY_COLUMNS = ["date", "time", "date_obs_elab", "date_prod"]
+
 
 class SupabaseHandler:
     """Gestionnaire principal de connexion à Supabase via REST API."""
@@ -18,58 +41,307 @@ class SupabaseHandler:
         self.supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
         logging.info("Connexion Supabase initialisée avec succès.")
 
-    def upsert_dataframe(self, df: pd.DataFrame, table_name: str):
-        """Insère ou met à jour les données dans une table Supabase."""
+    def upsert_dataframe(
+        self,
+        df: pd.DataFrame,
+        table_name: str,
+        batch_size: int = None,
+        max_workers: int = None,
+    ) -> Dict[str, Any]:
+        """
+        Insère ou met à jour les données dans une table Supabase, par lots
+        envoyés en parallèle. Chaque lot est retenté avec un backoff exponentiel ;
+        un lot en échec n'empêche pas l'envoi des autres.
+        Returns:
+            Résumé de l'envoi (lignes, lots, octets estimés, durée) ; en cas
+            d'échec de la conversion, failed_batches vaut 1 et error le détaille
+        """
+        summary = {
+            "table": table_name,
+            "rows": len(df),
+            "rows_sent": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "bytes": 0,
+            "seconds": 0.0,
+        }
         if df.empty:
             logging.warning(f"Le DataFrame pour {table_name} est vide, rien à insérer.")
-            return
+            return summary
 
         try:
             # DEBUG: Afficher les colonnes envoyées
             logging.info(f"Colonnes envoyées à {table_name}: {list(df.columns)}")
 
-            # Conversion des dates pour éviter les erreurs JSON
-            df = df.copy()
-            for col in df.columns:
-                if pd.api.types.is_datetime64_any_dtype(df[col]):
-                    df[col] = df[col].dt.strftime("%Y-%m-%d %H:%M:%S")
-                elif (
-                    col in ["date", "time", "date_obs_elab", "date_prod"]
-                    and df[col].dtype == "object"
-                ):
-                    try:
-                        df[col] = pd.to_datetime(df[col]).dt.strftime("%Y-%m-%d")
-                    except:
-                        pass
-
-            data = df.to_dict(orient="records")
-
-            # Utilisation de upsert directement
-            result = self.supabase.table(table_name).upsert(data).execute()
-            logging.info(f"{len(df)} lignes upsertées dans {table_name}.")
+            # Conversion colonne par colonne (dates en texte, NaN en null)
+            columns = frame_to_json_columns(df)
+            # Le client Supabase encode lui-même les lots : taille estimée
+            # sur un échantillon plutôt qu'en encodant chaque lot une 2e fois
+            bytes_per_row = estimate_row_bytes(columns, len(df))
 
         except Exception as e:
-            logging.error(f"Erreur lors de l'insertion dans {table_name} : {e}")
+            # Aucune ligne envoyée : l'envoi entier compte comme un lot en échec
+            summary["failed_batches"] = 1
+            summary["error"] = str(e)
+            logging.error(
+                f"Échec de l'envoi vers {table_name}: 0/{summary['rows']} lignes "
+                f"upsertées, conversion des données impossible : {e}"
+            )
+            return summary
+
+        batch_size = batch_size or settings.upsert_batch_size
+        max_workers = max_workers or settings.upsert_max_workers
+        summary["batches"] = -(-len(df) // batch_size)
+        workers = min(max_workers, summary["batches"])
+
+        def collect(batch_rows: int, future):
+            if future.result():
+                summary["rows_sent"] += batch_rows
+                summary["bytes"] += round(bytes_per_row * batch_rows)
+            else:
+                summary["failed_batches"] += 1
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="upsert"
+        ) as executor:
+            # Lots construits au fil de l'eau : au plus 2 lots par thread en mémoire
+            pending = deque()
+            for batch in iter_record_batches(columns, len(df), batch_size):
+                if len(pending) >= 2 * workers:
+                    collect(*pending.popleft())
+                pending.append(
+                    (len(batch), executor.submit(self._upsert_batch, batch, table_name))
+                )
+            while pending:
+                collect(*pending.popleft())
+        summary["seconds"] = round(time.perf_counter() - start, 3)
+
+        log = logging.info if not summary["failed_batches"] else logging.error
+        log(
+            f"{summary['rows_sent']}/{summary['rows']} lignes upsertées dans "
+            f"{table_name} ({summary['batches']} lots, "
+            f"{summary['failed_batches']} en échec, "
+            f"{summary['bytes'] / 1024:.1f} Ko, {summary['seconds']:.2f}s)."
+        )
+        return summary
+
+    def _upsert_batch(self, batch: List[Dict[str, Any]], table_name: str) -> bool:
+        """
+        Envoie un lot avec nouvelles tentatives (backoff exponentiel).
+        Returns:
+            False si toutes les tentatives ont échoué
+        """
+        for attempt in range(settings.upsert_retries + 1):
+            try:
+                self.supabase.table(table_name).upsert(batch).execute()
+                return True
+            except Exception as e:
+                if attempt == settings.upsert_retries:
+                    logging.error(
+                        f"Lot de {len(batch)} lignes en échec pour {table_name} "
+                        f"après {attempt + 1} tentatives : {e}"
+                    )
+                    return False
+                delay = settings.upsert_backoff * 2**attempt
+                logging.warning(
+                    f"Lot {table_name} en échec ({e}), nouvelle tentative dans {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+
+def frame_to_json_columns(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Convertit un DataFrame colonne par colonne en valeurs prêtes pour JSON
+    (tableaux d'objets Python) :
+    - colonnes datetime -> 'YYYY-MM-DD HH:MM:SS'
+    - colonnes de date texte (DATE_KEY_COLUMNS) -> 'YYYY-MM-DD'
+    - NaN / NaT / None -> None (null en JSON)
+    """
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.dt.strftime("%Y-%m-%d %H:%M:%S")
+        elif col in DATE_KEY_COLUMNS and (
+            pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+        ):
+            try:
+                series = pd.to_datetime(series).dt.strftime("%Y-%m-%d")
+            except (ValueError, TypeError):
+                # Dates non reconnues : envoyées telles quelles
+                pass
+
+        # astype(object) donne des scalaires Python (int, float, bool, str)
+        values = series.to_numpy(dtype=object)
+        missing = series.isna().to_numpy()
+        if missing.any():
+            values[missing] = None
+        columns[col] = values
+    return columns
+
+
+def iter_record_batches(
+    columns: Dict[str, np.ndarray], n_rows: int, batch_size: int
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Générateur de lots de lignes (listes de dicts) construits à la demande
+    à partir des colonnes converties par frame_to_json_columns.
+    """
+    names = list(columns)
+    for start in range(0, n_rows, batch_size):
+        rows = zip(*(values[start : start + batch_size] for values in columns.values()))
+        yield [dict(zip(names, row)) for row in rows]
+
+
+def encode_json(records: List[Dict[str, Any]]) -> bytes:
+    """
+    Encode des lignes en JSON compact (orjson s'il est installé).
+    Une valeur NaN restante lève une erreur au lieu d'envoyer un JSON invalide.
+    """
+    if orjson is not None:
+        return orjson.dumps(records)
+    return _json_encoder.encode(records).encode("utf-8")
+
+
+def estimate_row_bytes(
+    columns: Dict[str, np.ndarray], n_rows: int, sample_rows: int = SIZE_SAMPLE_ROWS
+) -> float:
+    """
+    Taille JSON moyenne d'une ligne, mesurée sur un échantillon de lignes
+    réparties dans toute la table.
+    """
+    if not n_rows or not columns:
+        return 0.0
+    step = max(1, n_rows // sample_rows)
+    sample = {name: values[::step][:sample_rows] for name, values in columns.items()}
+    size = len(next(iter(sample.values())))
+    batch = next(iter_record_batches(sample, size, size))
+    # Séparateurs et crochets du tableau négligés
+    return len(encode_json(batch)) / size
+
+
+class RowHashIndex:
+    """
+    Index local des hashs de lignes déjà envoyées, un fichier JSON par table
+    ({clé de date: hash du contenu}). Permet de n'envoyer que les lignes
+    nouvelles ou modifiées.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or settings.upload_hash_index_dir
+        self._tables: Dict[str, Dict[str, str]] = {}
+
+    def get(self, table_name: str) -> Dict[str, str]:
+        if table_name not in self._tables:
+            self._tables[table_name] = self._read(table_name)
+        return self._tables[table_name]
+
+    def update(self, table_name: str, hashes: Dict[str, str]):
+        """Enregistre les hashs des lignes envoyées avec succès."""
+        self._write(table_name, {**self.get(table_name), **hashes})
+
+    def retain(self, table_name: str, df: pd.DataFrame):
+        """
+        Ne garde que les hashs des lignes de `df` (à appeler quand les autres
+        lignes ont été supprimées de la table).
+        """
+        hashes = compute_row_hashes(df)
+        if hashes is None:
+            self.clear(table_name)
+            return
+        known = self.get(table_name)
+        self._write(
+            table_name, {key: value for key, value in known.items() if key in hashes}
+        )
+
+    def clear(self, table_name: str):
+        """Oublie une table (à appeler quand son contenu est supprimé)."""
+        self._tables[table_name] = {}
+        try:
+            os.remove(self._path(table_name))
+        except FileNotFoundError:
+            pass
+
+    def _write(self, table_name: str, index: Dict[str, str]):
+        """Écriture atomique de l'index d'une table."""
+        path = self._path(table_name)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, path)
+        self._tables[table_name] = index
+
+    def _path(self, table_name: str) -> str:
+        return os.path.join(self.directory, f"{table_name}.json")
+
+    def _read(self, table_name: str) -> Dict[str, str]:
+        try:
+            with open(self._path(table_name), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Index des hashs de {table_name} illisible, ignoré: {e}")
+            return {}
+
+
+def compute_row_hashes(df: pd.DataFrame) -> Optional[Dict[str, str]]:
+    """
+    Calcule un hash stable du contenu de chaque ligne, indexé par sa date.
+    Returns:
+        Dictionnaire {date: hash}, ou None si le DataFrame n'a pas de colonne
+        de date à valeurs uniques (toutes les lignes sont alors envoyées)
+    """
+    key_column = next((col for col in DATE_KEY_COLUMNS if col in df.columns), None)
+    if key_column is None:
+        return None
+
+    keys = df[key_column].astype(str)
+    if keys.duplicated().any():
+        return None
+
+    # hash_pandas_object utilise une clé fixe : même contenu, même hash d'un run à l'autre
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    return dict(zip(keys, (format(h, "016x") for h in hashes.to_numpy())))
 
 
 class DataUploader:
-    """Classe dédiée uniquement à l'upload des données vers Supabase."""
+    """
+    Classe dédiée uniquement à l'upload des données vers Supabase.
+    Seules les lignes nouvelles ou modifiées depuis le dernier envoi réussi
+    sont envoyées (hash du contenu par date, index local).
+    """
 
-    def __init__(self, supabase_handler: SupabaseHandler):
+    def __init__(
+        self,
+        supabase_handler: SupabaseHandler,
+        skip_unchanged: bool = None,
+        hash_index: RowHashIndex = None,
+    ):
         self.supabase_handler = supabase_handler
+        self.skip_unchanged = (
+            settings.upload_skip_unchanged if skip_unchanged is None else skip_unchanged
+        )
+        self.hash_index = hash_index or RowHashIndex()
+        self.stats: Dict[str, Dict[str, int]] = {}
 
     def upload_raw_dataset(self, df: pd.DataFrame, dataset_name: str):
         """
         Upload UNIQUEMENT les données brutes vers les tables raw_*
+        Returns:
+            Résumé de l'envoi (voir SupabaseHandler.upsert_dataframe)
         """
         if df.empty:
             logging.warning(f"Dataset {dataset_name} vide, rien à uploader.")
-            return
+            return None
 
         try:
             raw_table = f"raw_{dataset_name}"
-            self.supabase_handler.upsert_dataframe(df, raw_table)
+            summary = self._upload(df, raw_table)
             logging.info(f"Données brutes uploadées: {raw_table}")
+            return summary
 
         except Exception as e:
             logging.error(
@@ -79,17 +351,78 @@ class DataUploader:
     def upload_clean_dataset(self, df: pd.DataFrame, dataset_name: str):
         """
         Upload UNIQUEMENT les données nettoyées vers les tables clean_*
+        Returns:
+            Résumé de l'envoi (voir SupabaseHandler.upsert_dataframe)
         """
         if df.empty:
             logging.warning(f"Dataset {dataset_name} vide, rien à uploader.")
-            return
+            return None
 
         try:
             clean_table = f"clean_{dataset_name}"
-            self.supabase_handler.upsert_dataframe(df, clean_table)
+            summary = self._upload(df, clean_table)
             logging.info(f"Données nettoyées uploadées: {clean_table}")
+            return summary
 
         except Exception as e:
             logging.error(
                 f"Erreur lors de l'upload des données nettoyées {dataset_name}: {e}"
             )
+
+    def _upload(self, df: pd.DataFrame, table_name: str):
+        changed, hashes = self._changed_rows(df, table_name)
+        skipped = len(df) - len(changed)
+        self.stats[table_name] = {
+            "rows": len(df),
+            "sent_rows": len(changed),
+            "skipped_rows": skipped,
+        }
+
+        if changed.empty:
+            logging.info(
+                f"{table_name}: {skipped} lignes inchangées, aucune ligne à envoyer."
+            )
+            return {
+                "table": table_name,
+                "rows": 0,
+                "rows_sent": 0,
+                "failed_batches": 0,
+                "skipped_rows": skipped,
+            }
+
+        if skipped:
+            logging.info(
+                f"{table_name}: {len(changed)} lignes nouvelles ou modifiées, "
+                f"{skipped} inchangées ignorées."
+            )
+
+        summary = self.supabase_handler.upsert_dataframe(changed, table_name)
+        if isinstance(summary, dict):
+            summary["skipped_rows"] = skipped
+            # Index mis à jour seulement si toutes les lignes sont passées :
+            # sinon elles seront renvoyées à la prochaine exécution
+            if (
+                hashes is not None
+                and not summary.get("failed_batches")
+                and summary.get("rows_sent") == len(changed)
+            ):
+                self.hash_index.update(table_name, hashes)
+        return summary
+
+    def _changed_rows(
+        self, df: pd.DataFrame, table_name: str
+    ) -> Tuple[pd.DataFrame, Optional[Dict[str, str]]]:
+        """Retourne les lignes à envoyer et les hashs de toutes les lignes."""
+        if not self.skip_unchanged:
+            return df, None
+
+        hashes = compute_row_hashes(df)
+        if hashes is None:
+            return df, None
+
+        known = self.hash_index.get(table_name)
+        if not known:
+            return df, hashes
+
+        changed_mask = [known.get(key) != value for key, value in hashes.items()]
+        return df[changed_mask], hashes
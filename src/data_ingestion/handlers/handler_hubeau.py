@@ -1,7 +1,8 @@
 import logging
 import pandas as pd
+from typing import Callable
 from src.data_ingestion.utils.data_cleaner import DataCleaner
-from src.data_ingestion.fetchers.fetch_hubeau import get_hubeau_data
+from src.data_ingestion.fetchers.fetch_hubeau import get_hubeau_data, iter_hubeau_data
 
 
 class HubeauDataHandler:
@@ -21,6 +22,36 @@ class HubeauDataHandler:
             logging.error(f"Erreur Hub'Eau: {e}")
         return self.df
 
+    def stream(
+        self, process: Callable[[pd.DataFrame, pd.DataFrame], None]
+    ) -> pd.DataFrame:
+        """
+        Télécharge les observations page par page (voir iter_hubeau_data) :
+        chaque page est dérivée en raw/clean puis passée à `process` (envoi
+        Supabase) avant la suivante. Seules les fenêtres en cours de
+        téléchargement restent en mémoire, quelle que soit la période.
+        Returns:
+            Table clean de toute la période (date et débit uniquement)
+        """
+        clean_chunks, raw_rows = [], 0
+        try:
+            for chunk in iter_hubeau_data(
+                self.code_station, self.start_date, self.end_date
+            ):
+                df_raw, df_clean = DataCleaner.derive_hydro_data(chunk)
+                process(df_raw, df_clean)
+                raw_rows += len(df_raw)
+                clean_chunks.append(df_clean)
+        except Exception as e:
+            logging.error(f"Erreur Hub'Eau: {e}")
+
+        logging.info(
+            f"{raw_rows} enregistrements Hub'Eau traités en {len(clean_chunks)} pages"
+        )
+        if not clean_chunks:
+            return pd.DataFrame()
+        return pd.concat(clean_chunks, ignore_index=True)
+
     def clean(self):
         if self.df.empty:
             return
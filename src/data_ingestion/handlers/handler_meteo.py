@@ -23,37 +23,44 @@ class WeatherDataHandler:
         self.data_type = data_type
         self.df = pd.DataFrame()
 
+    def fetch(
+        self, start_date: str = None, end_date: str = None, forecast: bool = False
+    ) -> pd.DataFrame:
+        """
+        Télécharge la réponse brute d'Open-Meteo (colonne time, unités de l'API),
+        sans nettoyage. Les erreurs sont propagées à l'appelant.
+        """
+        if self.data_type == "solar":
+            if forecast:
+                return get_solar_forecast(self.latitude, self.longitude)
+            return get_solar_history(self.latitude, self.longitude, start_date, end_date)
+
+        # wind
+        if forecast:
+            return get_wind_forecast(self.latitude, self.longitude)
+        return get_wind_history(self.latitude, self.longitude, start_date, end_date)
+
     def load(
         self, start_date: str = None, end_date: str = None, forecast: bool = False
     ) -> pd.DataFrame:
-        """Charge les données météo depuis Open-Meteo."""
+        """
+        Charge les données météo depuis Open-Meteo.
+        Le résultat est construit dans une variable locale : la prévision et
+        l'historique peuvent être chargés en parallèle avec le même handler.
+        """
         try:
-            if self.data_type == "solar":
-                if forecast:
-                    self.df = get_solar_forecast(self.latitude, self.longitude)
-                else:
-                    self.df = get_solar_history(
-                        self.latitude, self.longitude, start_date, end_date
-                    )
-            else:  # wind
-                if forecast:
-                    self.df = get_wind_forecast(self.latitude, self.longitude)
-                else:
-                    self.df = get_wind_history(
-                        self.latitude, self.longitude, start_date, end_date
-                    )
+            df = self.fetch(start_date, end_date, forecast)
 
             # Nettoyage
-            if not self.df.empty:
+            if not df.empty:
                 if self.data_type == "solar":
-                    self.df = DataCleaner.clean_solar_data(self.df)
+                    df = DataCleaner.clean_solar_data(df)
                 else:
-                    self.df = DataCleaner.clean_wind_data(self.df)
+                    df = DataCleaner.clean_wind_data(df)
 
-            logging.info(
-                f"Données {self.data_type} chargées: {len(self.df)} enregistrements"
-            )
-            return self.df
+            logging.info(f"Données {self.data_type} chargées: {len(df)} enregistrements")
+            self.df = df
+            return df
 
         except Exception as e:
             logging.warning(f"Erreur météo {self.data_type}: {e}")
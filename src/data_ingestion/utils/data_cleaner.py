@@ -5,6 +5,21 @@ import logging
 class DataCleaner:
     """Classe pour centraliser toutes les opérations de nettoyage des données."""
 
+    # Colonnes des tables raw solaires (noms ORIGINAUX de l'API)
+    SOLAR_RAW_COLUMNS = [
+        "date",
+        "temperature_2m_max",
+        "temperature_2m_min",
+        "temperature_2m_mean",
+        "shortwave_radiation_sum",  # Nom ORIGINAL pour tables raw
+        "sunshine_duration",
+        "daylight_duration",
+        "cloud_cover_mean",
+        "relative_humidity_2m_mean",
+        "precipitation_sum",
+        "wind_speed_10m_mean",
+    ]
+
     @staticmethod
     def clean_solar_data(df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -13,16 +28,30 @@ class DataCleaner:
         if df.empty:
             return df
 
-        df_clean = df.copy()
+        # Renommage et conversion datetime
+        df_clean = DataCleaner._parse_dates(df, "time")
+        return DataCleaner._clean_parsed_solar_data(df_clean)
 
-        # Renommage
-        if "time" in df_clean.columns:
-            df_clean = df_clean.rename(columns={"time": "date"})
+    @staticmethod
+    def derive_solar_data(df: pd.DataFrame):
+        """
+        Dérive en une seule passe les tables raw ET clean d'une réponse API solaire.
+        La date est analysée une fois ; la version clean part de la sélection raw.
+        Returns:
+            Tuple (df_raw, df_clean)
+        """
+        if df.empty:
+            return df, df
 
-        # Conversion datetime
-        if "date" in df_clean.columns:
-            df_clean["date"] = pd.to_datetime(df_clean["date"])
+        df_raw = DataCleaner._parse_dates(df, "time")
+        df_raw = df_raw[
+            [col for col in DataCleaner.SOLAR_RAW_COLUMNS if col in df_raw.columns]
+        ]
+        return df_raw, DataCleaner._clean_parsed_solar_data(df_raw)
 
+    @staticmethod
+    def _clean_parsed_solar_data(df_clean: pd.DataFrame) -> pd.DataFrame:
+        """Nettoyage solaire d'un DataFrame dont la colonne date est déjà convertie."""
         # CORRECTION : Appliquer les conversions UNIQUEMENT pour les données clean
         df_clean = DataCleaner._convert_solar_units_for_clean_tables(df_clean)
 
@@ -80,22 +109,10 @@ class DataCleaner:
         # Les tables raw attendent shortwave_radiation_sum (pas kwh_m2)
 
         # Sélection des colonnes POUR TABLES RAW (noms originaux)
-        relevant_cols_raw = [
-            "date",
-            "temperature_2m_max",
-            "temperature_2m_min",
-            "temperature_2m_mean",
-            "shortwave_radiation_sum",  # Nom ORIGINAL pour tables raw
-            "sunshine_duration",
-            "daylight_duration",
-            "cloud_cover_mean",
-            "relative_humidity_2m_mean",
-            "precipitation_sum",
-            "wind_speed_10m_mean",
-        ]
-
         # Garder uniquement les colonnes disponibles
-        available_cols = [col for col in relevant_cols_raw if col in df_raw.columns]
+        available_cols = [
+            col for col in DataCleaner.SOLAR_RAW_COLUMNS if col in df_raw.columns
+        ]
         df_raw = df_raw[available_cols]
 
         return df_raw
@@ -106,18 +123,18 @@ class DataCleaner:
         if df.empty:
             return df
 
-        df_clean = df.copy()
-
         # CORRECTION : Pour clean_hubeau, utiliser 'date' et 'debit_l_s'
-        if "date_obs_elab" in df_clean.columns:
-            df_clean = df_clean.rename(columns={"date_obs_elab": "date"})
+        columns = {"date_obs_elab": "date"}
 
         # CORRECTION : Utiliser 'debit_l_s' pour clean_hubeau (nom de la table)
-        if "result_obs_elab" in df_clean.columns:
-            df_clean = df_clean.rename(columns={"result_obs_elab": "debit_l_s"})
+        if "result_obs_elab" in df.columns:
+            columns["result_obs_elab"] = "debit_l_s"
         # CORRECTION : Gérer aussi le nom 'resultat_obs_elab' venant de l'API
-        elif "resultat_obs_elab" in df_clean.columns:
-            df_clean = df_clean.rename(columns={"resultat_obs_elab": "debit_l_s"})
+        elif "resultat_obs_elab" in df.columns:
+            columns["resultat_obs_elab"] = "debit_l_s"
+
+        # rename retourne un nouveau DataFrame : pas de copie explicite
+        df_clean = df.rename(columns=columns)
 
         # Conversion des types
         if "date" in df_clean.columns:
@@ -177,19 +194,48 @@ class DataCleaner:
 
         return df_raw
 
+    @staticmethod
+    def derive_hydro_data(df: pd.DataFrame):
+        """
+        Dérive en une seule passe les tables raw ET clean d'une réponse Hub'Eau.
+        Returns:
+            Tuple (df_raw, df_clean)
+        """
+        if df.empty:
+            return df, df
+
+        df_raw = df
+        if "date_obs_elab" in df.columns:
+            df_raw = df.assign(date_obs_elab=pd.to_datetime(df["date_obs_elab"]))
+        return df_raw, DataCleaner.clean_hydro_data(df_raw)
+
     @staticmethod
     def clean_wind_data(df: pd.DataFrame) -> pd.DataFrame:
         """Nettoie les données éoliennes."""
         if df.empty:
             return df
 
-        df_clean = df.copy()
-
         # Renommage et conversion de la date
-        if "time" in df_clean.columns:
-            df_clean = df_clean.rename(columns={"time": "date"})
+        df_clean = DataCleaner._parse_dates(df, "time", errors="coerce")
+        return DataCleaner._clean_parsed_wind_data(df_clean)
+
+    @staticmethod
+    def derive_wind_data(df: pd.DataFrame):
+        """
+        Dérive en une seule passe les tables raw ET clean d'une réponse API éolienne.
+        Returns:
+            Tuple (df_raw, df_clean)
+        """
+        if df.empty:
+            return df, df
+
+        df_raw = DataCleaner._parse_dates(df, "time", errors="coerce")
+        return df_raw, DataCleaner._clean_parsed_wind_data(df_raw)
+
+    @staticmethod
+    def _clean_parsed_wind_data(df_clean: pd.DataFrame) -> pd.DataFrame:
+        """Nettoyage éolien d'un DataFrame dont la colonne date est déjà convertie."""
         if "date" in df_clean.columns:
-            df_clean["date"] = pd.to_datetime(df_clean["date"], errors="coerce")
             df_clean = df_clean.dropna(subset=["date"]).reset_index(drop=True)
 
         relevant_cols = [
@@ -346,16 +392,30 @@ class DataCleaner:
     @staticmethod
     def _convert_solar_units_for_clean_tables(df: pd.DataFrame) -> pd.DataFrame:
         """Convertit les unités SPÉCIALEMENT pour les tables clean."""
-        # Conversion MJ/m² -> kWh/m² UNIQUEMENT
+        # Conversion MJ/m² -> kWh/m² UNIQUEMENT (assign : le DataFrame reçu,
+        # éventuellement la version raw, n'est pas modifié)
         if "shortwave_radiation_sum" in df.columns:
-            df["shortwave_radiation_sum_kwh_m2"] = (
-                df["shortwave_radiation_sum"] * 0.27778
+            df = df.assign(
+                shortwave_radiation_sum_kwh_m2=df["shortwave_radiation_sum"] * 0.27778
             )
             # Supprimer la colonne originale pour ne garder que la convertie
             df = df.drop(columns=["shortwave_radiation_sum"])
 
         return df
 
+    @staticmethod
+    def _parse_dates(
+        df: pd.DataFrame, date_column: str, errors: str = "raise"
+    ) -> pd.DataFrame:
+        """
+        Renomme la colonne de date en 'date' et la convertit en datetime.
+        rename retourne un nouveau DataFrame : le DataFrame reçu n'est pas modifié.
+        """
+        df = df.rename(columns={date_column: "date"})
+        if "date" in df.columns:
+            df["date"] = pd.to_datetime(df["date"], errors=errors)
+        return df
+
     @staticmethod
     def _remove_duplicates(df: pd.DataFrame, subset: str) -> pd.DataFrame:
         """Supprime les doublons basés sur une colonne."""
@@ -1,47 +1,62 @@
+import logging
+import time
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
 from supabase import create_client
 from src.config.settings import settings
+from .model_config import MODEL_CONFIG
+from .training_snapshot import TrainingSnapshotStore
+
+# Tables (météo, production) jointes pour l'entrainement de chaque producteur
+TRAINING_TABLES: Dict[str, Tuple[str, str]] = {
+    "solar": ("clean_solar_history", "clean_prod_solaire"),
+    "wind": ("clean_wind_history", "clean_prod_eolienne"),
+    "hydro": ("clean_hubeau", "clean_prod_hydro"),
+}
 
 
 class SupabaseDataLoader:
-    def __init__(self):
+    def __init__(
+        self,
+        page_size: int = None,
+        max_workers: int = None,
+        snapshots: TrainingSnapshotStore = None,
+        use_snapshots: bool = None,
+    ):
         self.supabase = create_client(settings.supabase_url, settings.supabase_key)
+        self.page_size = page_size or settings.training_page_size
+        self.max_workers = max_workers or settings.training_max_workers
+        self.use_snapshots = (
+            settings.training_snapshot_enabled
+            if use_snapshots is None
+            else use_snapshots
+        )
+        self.snapshots = snapshots or TrainingSnapshotStore()
 
-    def load_training_data(self, producer_type: str) -> pd.DataFrame:
+    def load_training_data(
+        self, producer_type: str, full_refresh: bool = False
+    ) -> pd.DataFrame:
         """
         Charge et joint les données pour l'entrainement.
+        Seules les colonnes utiles (date, features, target) sont demandées,
+        et les tables sont lues page par page pour ne pas être tronquées
+        par la limite de lignes de PostgREST. Avec les instantanés locaux,
+        seules les lignes récentes sont relues (voir load_table).
         """
-        # Jointure météo solaire + production solaire
-        if producer_type == "solar":
-            weather_data = (
-                self.supabase.table("clean_solar_history").select("*").execute()
-            )
-            production_data = (
-                self.supabase.table("clean_prod_solaire").select("*").execute()
-            )
-
-        # Jointure météo éolienne + production éolienne
-        elif producer_type == "wind":
-            weather_data = (
-                self.supabase.table("clean_wind_history").select("*").execute()
-            )
-            production_data = (
-                self.supabase.table("clean_prod_eolienne").select("*").execute()
-            )
-
-        # Jointure données Hub'Eau + production hydro
-        elif producer_type == "hydro":
-            weather_data = self.supabase.table("clean_hubeau").select("*").execute()
-            production_data = (
-                self.supabase.table("clean_prod_hydro").select("*").execute()
-            )
-
-        else:
+        if producer_type not in TRAINING_TABLES:
             raise ValueError(f"Type de producteur inconnu: {producer_type}.")
 
-        # Conversion en DataFrame et jointure sur date
-        df_weather = pd.DataFrame(weather_data.data)
-        df_production = pd.DataFrame(production_data.data)
+        start = time.perf_counter()
+        config = MODEL_CONFIG[producer_type]
+        weather_table, production_table = TRAINING_TABLES[producer_type]
+
+        df_weather = self.load_table(
+            weather_table, ["date", *config["features"]], full_refresh
+        )
+        df_production = self.load_table(
+            production_table, ["date", config["target"]], full_refresh
+        )
 
         # Standardisation des colonnes date
         df_weather["date"] = pd.to_datetime(df_weather["date"])
@@ -49,4 +64,127 @@ class SupabaseDataLoader:
 
         merged_df = pd.merge(df_weather, df_production, on="date", how="inner")
 
+        logging.info(
+            f"Données d'entrainement {producer_type}: {len(merged_df)} lignes "
+            f"({len(df_weather)} météo, {len(df_production)} production) "
+            f"en {time.perf_counter() - start:.2f}s"
+        )
         return merged_df
+
+    def load_table(
+        self, table: str, columns: List[str], full_refresh: bool = False
+    ) -> pd.DataFrame:
+        """
+        Lit une table en partant de son instantané local : seules les lignes
+        à partir de la dernière date de l'instantané, moins le recouvrement
+        des révisions, sont relues dans Supabase puis remplacent les
+        lignes correspondantes.
+        """
+        if not self.use_snapshots:
+            return self.fetch_table(table, columns)
+
+        snapshot = None if full_refresh else self.snapshots.read(table, columns)
+        if snapshot is None or snapshot[1]["max_date"] is None:
+            df = self.fetch_table(table, columns)
+            df["date"] = pd.to_datetime(df["date"])
+        else:
+            df_snapshot, meta = snapshot
+            since = (
+                pd.Timestamp(meta["max_date"])
+                - pd.Timedelta(days=settings.ingestion_overlap_days)
+            ).normalize()
+            df_new = self.fetch_table(
+                table, columns, since=since.strftime("%Y-%m-%d")
+            )
+            df_new["date"] = pd.to_datetime(df_new["date"])
+            df = pd.concat(
+                [df_snapshot[df_snapshot["date"] < since], df_new], ignore_index=True
+            )
+            logging.info(
+                f"{table}: instantané local de {len(df_snapshot)} lignes "
+                f"(jusqu'au {meta['max_date']}), {len(df_new)} lignes relues "
+                f"depuis le {since.date()}"
+            )
+
+        df = df.sort_values("date", ignore_index=True)
+        try:
+            meta = self.snapshots.write(table, columns, df)
+            logging.info(
+                f"Instantané {table} enregistré: {meta['rows']} lignes "
+                f"jusqu'au {meta['max_date']} ({meta['format']})"
+            )
+        except Exception as e:
+            logging.warning(f"Instantané de {table} non enregistré: {e}")
+        return df
+
+    def fetch_table(
+        self, table: str, columns: List[str], since: str = None
+    ) -> pd.DataFrame:
+        """
+        Lit toutes les lignes d'une table (colonnes demandées uniquement),
+        ou celles à partir de la date `since`.
+        La première page donne le nombre total de lignes ; les pages suivantes
+        sont demandées en parallèle par plages (offset/limit), triées par date.
+        """
+        start = time.perf_counter()
+        first = self._fetch_page(
+            table, columns, 0, self.page_size - 1, since=since, count=True
+        )
+        rows = list(first.data)
+        total = first.count
+
+        # Le serveur peut plafonner une page sous la taille demandée :
+        # les plages suivantes utilisent la taille réellement reçue
+        page_size = len(rows) if 0 < len(rows) < self.page_size else self.page_size
+
+        if total is None:
+            # Nombre total inconnu : pages lues une à une jusqu'à la dernière
+            while rows and len(rows) % page_size == 0:
+                page = self._fetch_page(
+                    table, columns, len(rows), len(rows) + page_size - 1, since
+                ).data
+                if not page:
+                    break
+                rows.extend(page)
+            pages = -(-len(rows) // page_size) if rows else 1
+        else:
+            offsets = range(len(rows), total, page_size)
+            pages = 1 + len(offsets)
+            if offsets:
+                with ThreadPoolExecutor(
+                    max_workers=min(self.max_workers, len(offsets)),
+                    thread_name_prefix="loader",
+                ) as executor:
+                    for page in executor.map(
+                        lambda offset: self._fetch_page(
+                            table, columns, offset, offset + page_size - 1, since
+                        ).data,
+                        offsets,
+                    ):
+                        rows.extend(page)
+
+        # Construction colonne par colonne (pas de dict par ligne dans pandas)
+        df = pd.DataFrame(
+            {column: [row.get(column) for row in rows] for column in columns}
+        )
+        logging.info(
+            f"{table}: {len(df)} lignes, {len(columns)} colonnes, {pages} pages "
+            f"en {time.perf_counter() - start:.2f}s"
+        )
+        return df
+
+    def _fetch_page(
+        self,
+        table: str,
+        columns: List[str],
+        first: int,
+        last: int,
+        since: str = None,
+        count: bool = False,
+    ):
+        query = self.supabase.table(table).select(
+            *columns, count="exact" if count else None
+        )
+        if since:
+            query = query.gte("date", since)
+        return query.order("date").range(first, last).execute()
@@ -0,0 +1,332 @@
+"""
+Recherche d'hyperparamètres par halving successif.
+
+Des configurations sont tirées dans l'espace déclaratif de chaque famille
+(SEARCH_SPACES) puis évaluées sur un pli de validation tiré du jeu
+d'entraînement (le jeu de test reste réservé à la comparaison finale).
+À chaque palier, seul le meilleur tiers (1/eta) des configurations passe
+au palier suivant, évalué sur eta fois plus de données. XGBoost fixe son
+nombre d'arbres par arrêt anticipé sur le pli de validation.
+
+Les évaluations d'un palier tournent en parallèle dans un pool de processus.
+La recherche s'arrête à l'échéance fixée (les résultats déjà obtenus sont
+gardés) : une évaluation dont la durée estimée dépasse l'échéance n'est pas
+lancée, XGBoost et Random Forest s'interrompent à l'échéance et les processus
+du pool encore occupés sont arrêtés.
+"""
+
+import logging
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import mean_absolute_error
+
+from src.config.settings import settings
+from .model_config import SEARCH_SPACES
+from .model_trainer import SCALED_FAMILIES, build_model
+
+# Nombre minimal de lignes d'entraînement à un palier
+MIN_ROWS = 20
+
+# Arbres ajoutés entre deux vérifications de l'échéance (Random Forest)
+RF_TREES_STEP = 25
+
+
+class SearchTimeout(Exception):
+    """Évaluation interrompue par l'échéance de la recherche."""
+
+
+class _DeadlineCallback(xgb.callback.TrainingCallback):
+    """Arrête le boosting XGBoost à l'échéance."""
+
+    def __init__(self, deadline: float):
+        super().__init__()
+        self.deadline = deadline
+
+    def after_iteration(self, model, epoch, evals_log) -> bool:
+        return time.time() >= self.deadline
+
+
+def sample_params(space: Dict[str, dict], rng: np.random.Generator) -> dict:
+    """Tire une configuration dans un espace de recherche déclaratif."""
+    params = {}
+    for name, spec in space.items():
+        kind = spec["type"]
+        if kind == "float":
+            low, high = spec["low"], spec["high"]
+            if spec.get("log"):
+                value = math.exp(rng.uniform(math.log(low), math.log(high)))
+            else:
+                value = rng.uniform(low, high)
+            params[name] = float(value)
+        elif kind == "int":
+            params[name] = int(rng.integers(spec["low"], spec["high"] + 1))
+        elif kind == "choice":
+            params[name] = spec["values"][int(rng.integers(len(spec["values"])))]
+        else:
+            raise ValueError(f"Type de paramètre inconnu pour {name}: {kind}.")
+    return params
+
+
+def make_validation_fold(
+    split: dict, family: str, validation_size: float = 0.2, random_state: int = 42
+) -> dict:
+    """
+    Sépare le jeu d'entraînement en pli d'ajustement (mélangé : ses premières
+    lignes forment un sous-échantillon aléatoire) et pli de validation.
+    """
+    suffix = "_scaled" if family in SCALED_FAMILIES else ""
+    X, y = split[f"X_train{suffix}"], split["y_train"]
+
+    order = np.random.default_rng(random_state).permutation(len(y))
+    n_val = max(1, int(len(y) * validation_size))
+    val_idx, fit_idx = order[:n_val], order[n_val:]
+    return {
+        "X_fit": _take(X, fit_idx),
+        "y_fit": _take(y, fit_idx),
+        "X_val": _take(X, val_idx),
+        "y_val": _take(y, val_idx),
+    }
+
+
+def evaluate_config(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Entraine une configuration sur une part des données d'ajustement et
+    retourne sa MAE de validation (exécuté dans un processus du pool).
+    """
+    start = time.perf_counter()
+    family, params, fold = job["family"], dict(job["params"]), job["fold"]
+    deadline = job["deadline"]
+    n_rows = max(MIN_ROWS, int(len(fold["y_fit"]) * job["fraction"]))
+    X_fit, y_fit = fold["X_fit"][:n_rows], fold["y_fit"][:n_rows]
+
+    if family == "xgboost":
+        # Nombre d'arbres choisi par arrêt anticipé sur le pli de validation
+        model = build_model(
+            family,
+            {
+                **params,
+                "n_estimators": job["max_estimators"],
+                "early_stopping_rounds": job["early_stopping_rounds"],
+                "callbacks": [_DeadlineCallback(deadline)],
+            },
+            n_jobs=job["threads"],
+        )
+        model.fit(
+            X_fit, y_fit, eval_set=[(fold["X_val"], fold["y_val"])], verbose=False
+        )
+        params["n_estimators"] = int(model.best_iteration) + 1
+    elif family == "random_forest":
+        # Forêt construite par paliers d'arbres (même résultat qu'en une fois)
+        n_estimators = params.get("n_estimators", 100)
+        model = build_model(
+            family, {**params, "warm_start": True}, n_jobs=job["threads"]
+        )
+        steps = range(RF_TREES_STEP, n_estimators + RF_TREES_STEP, RF_TREES_STEP)
+        for n_trees in steps:
+            if time.time() >= deadline:
+                break
+            model.set_params(n_estimators=min(n_trees, n_estimators))
+            model.fit(X_fit, y_fit)
+    else:
+        model = build_model(family, params, n_jobs=job["threads"])
+        model.fit(X_fit, y_fit)
+
+    # Un modèle tronqué par l'échéance n'est pas comparable aux autres
+    if time.time() >= deadline:
+        raise SearchTimeout(f"Évaluation {family} interrompue par l'échéance")
+
+    score = mean_absolute_error(fold["y_val"], model.predict(fold["X_val"]))
+    return {
+        "params": params,
+        "score": float(score),
+        "rows": n_rows,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def successive_halving(
+    family: str,
+    split: dict,
+    base_params: dict = None,
+    space: Dict[str, dict] = None,
+    n_configs: int = None,
+    eta: int = None,
+    min_fraction: float = None,
+    deadline: float = None,
+    max_workers: int = None,
+    threads: int = 1,
+    random_state: int = 42,
+) -> Dict[str, Any]:
+    """
+    Recherche les meilleurs hyperparamètres d'une famille de modèles.
+    Args:
+        split: Jeu préparé par RenewableModelTrainer.prepare_training_split
+        base_params: Configuration actuelle (MODEL_CONFIG), toujours évaluée
+        deadline: Échéance (time.time()) au-delà de laquelle la recherche s'arrête
+        max_workers: Évaluations en parallèle (1 : dans le processus courant,
+            2 ou plus : pool de processus arrêté à l'échéance)
+        threads: Threads par évaluation (RF n_jobs, XGBoost n_jobs)
+    Returns:
+        Dictionnaire params (meilleure configuration), score (MAE de validation),
+        trials, rungs, seconds et budget_exhausted
+    """
+    start = time.perf_counter()
+    base_params = dict(base_params or {})
+    space = SEARCH_SPACES[family] if space is None else space
+    n_configs = n_configs or settings.search_n_configs
+    eta = eta or settings.search_eta
+    min_fraction = min_fraction or settings.search_min_fraction
+    deadline = deadline or time.time() + settings.search_time_budget
+    max_workers = max_workers or settings.search_max_workers or os.cpu_count() or 1
+
+    rng = np.random.default_rng(random_state)
+    candidates = [base_params] + [
+        {**base_params, **sample_params(space, rng)} for _ in range(n_configs - 1)
+    ]
+    n_rungs = max(1, int(math.floor(math.log(1 / min_fraction, eta) + 1e-9)) + 1)
+    fold = make_validation_fold(split, family, random_state=random_state)
+
+    result = {
+        "family": family,
+        "params": base_params,
+        "score": None,
+        "trials": 0,
+        "rungs": 0,
+        "budget_exhausted": False,
+    }
+    executor = None
+    if max_workers > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=min(max_workers, len(candidates)),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    # Durée estimée d'une évaluation au palier suivant (inconnue au premier)
+    expected = 0.0
+    previous_fraction = None
+    try:
+        for rung in range(n_rungs):
+            fraction = 1.0 if rung == n_rungs - 1 else min_fraction * eta**rung
+            if previous_fraction:
+                # Durée proportionnelle au nombre de lignes
+                expected *= fraction / previous_fraction
+            previous_fraction = fraction
+            jobs = [
+                {
+                    "family": family,
+                    "params": params,
+                    "fold": fold,
+                    "fraction": fraction,
+                    "threads": threads,
+                    "deadline": deadline,
+                    "max_estimators": settings.search_xgb_max_estimators,
+                    "early_stopping_rounds": settings.search_early_stopping_rounds,
+                }
+                for params in candidates
+            ]
+            scored, complete = _run_rung(jobs, executor, deadline, expected)
+            result["trials"] += len(scored)
+            result["budget_exhausted"] = not complete
+            if not scored:
+                break
+
+            scored.sort(key=lambda trial: trial["score"])
+            result.update(
+                {"params": scored[0]["params"], "score": scored[0]["score"]}
+            )
+            result["rungs"] = rung + 1
+            expected = max(trial["seconds"] for trial in scored)
+            logging.info(
+                f"Recherche {family}, palier {rung + 1}/{n_rungs}: "
+                f"{len(scored)} configurations sur {scored[0]['rows']} lignes, "
+                f"meilleure MAE={scored[0]['score']:.3f}"
+            )
+
+            if result["budget_exhausted"]:
+                break
+            candidates = [
+                trial["params"] for trial in scored[: max(1, len(scored) // eta)]
+            ]
+    finally:
+        if executor is not None:
+            if result["budget_exhausted"]:
+                # Les évaluations encore en cours ne doivent pas survivre à
+                # l'échéance (ni concurrencer l'entrainement final)
+                _terminate_workers(executor)
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    if result["budget_exhausted"]:
+        logging.warning(
+            f"Recherche {family} arrêtée par le budget de temps après "
+            f"{result['rungs']} paliers"
+        )
+    return result
+
+
+def _run_rung(
+    jobs: List[Dict[str, Any]],
+    executor: Optional[ProcessPoolExecutor],
+    deadline: float,
+    expected: float = 0.0,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Évalue les configurations d'un palier avant l'échéance. Une évaluation
+    n'est lancée que si sa durée estimée (`expected`, puis la plus longue
+    évaluation du palier) tient avant l'échéance.
+    Returns:
+        Tuple (évaluations réussies, palier terminé avant l'échéance)
+    """
+    scored = []
+    if executor is None:
+        for job in jobs:
+            if time.time() + expected >= deadline:
+                return scored, False
+            try:
+                trial = evaluate_config(job)
+            except SearchTimeout:
+                return scored, False
+            except Exception as e:
+                logging.warning(f"Configuration {job['params']} en échec: {e}")
+                continue
+            scored.append(trial)
+            expected = max(expected, trial["seconds"])
+        return scored, True
+
+    remaining = deadline - time.time()
+    if remaining <= expected:
+        return [], False
+    futures = [executor.submit(evaluate_config, job) for job in jobs]
+    done, not_done = wait(futures, timeout=remaining)
+    complete = not not_done
+    for future in not_done:
+        future.cancel()
+    for future in done:
+        try:
+            scored.append(future.result())
+        except SearchTimeout:
+            complete = False
+        except Exception as e:
+            logging.warning(f"Configuration en échec: {e}")
+    return scored, complete
+
+
+def _terminate_workers(executor: ProcessPoolExecutor):
+    """
+    Arrête les processus du pool (ProcessPoolExecutor n'expose pas cet arrêt
+    avant Python 3.14).
+    """
+    for process in list((executor._processes or {}).values()):
+        if process.is_alive():
+            process.terminate()
+
+
+def _take(values, index: np.ndarray):
+    return values.iloc[index] if hasattr(values, "iloc") else values[index]
@@ -42,3 +42,28 @@ MODEL_CONFIG = {
         },
     },
 }
+
+# Espaces de recherche des hyperparamètres (mode recherche, voir
+# src/models/hyperparameter_search.py). Chaque paramètre est décrit par :
+# - {"type": "float", "low", "high", "log"} : réel, échelle log si log=True
+# - {"type": "int", "low", "high"} : entier, bornes incluses
+# - {"type": "choice", "values"} : valeur parmi une liste
+# Pour XGBoost, n_estimators est fixé par l'arrêt anticipé.
+SEARCH_SPACES = {
+    "ridge": {
+        "alpha": {"type": "float", "low": 1e-4, "high": 100.0, "log": True},
+    },
+    "xgboost": {
+        "max_depth": {"type": "int", "low": 2, "high": 10},
+        "learning_rate": {"type": "float", "low": 0.01, "high": 0.3, "log": True},
+        "subsample": {"type": "float", "low": 0.5, "high": 1.0},
+        "colsample_bytree": {"type": "float", "low": 0.5, "high": 1.0},
+        "min_child_weight": {"type": "float", "low": 1.0, "high": 20.0, "log": True},
+    },
+    "random_forest": {
+        "n_estimators": {"type": "int", "low": 50, "high": 400},
+        "max_depth": {"type": "choice", "values": [None, 6, 10, 16, 24]},
+        "min_samples_leaf": {"type": "int", "low": 1, "high": 10},
+        "max_features": {"type": "choice", "values": [1.0, "sqrt", 0.5]},
+    },
+}
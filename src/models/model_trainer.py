@@ -7,11 +7,104 @@ from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 import xgboost as xgb
 import joblib
+import json
 import logging
 import os
+import time
+from datetime import datetime, timedelta
+from src.config.settings import settings
+from src.prediction.model_registry import file_sha256, manifest_name
 from .data_loarder import SupabaseDataLoader
 from .model_config import MODEL_CONFIG
 
+MODELS_DIR = "src/models/saved"
+
+# Familles de modèles entraînées pour chaque producteur
+MODEL_FAMILIES = ["ridge", "xgboost", "random_forest"]
+
+# Familles entraînées sur les features standardisées
+# (Random Forest est peu sensible à la normalisation)
+SCALED_FAMILIES = {"ridge", "xgboost"}
+
+
+def build_model(family: str, params: dict, n_jobs: int = None):
+    """
+    Instancie un modèle d'une famille. n_jobs (threads de RF et XGBoost)
+    remplace la valeur de la configuration quand il est fourni.
+    """
+    if family == "ridge":
+        return Ridge(**params)
+    if family == "xgboost":
+        return xgb.XGBRegressor(**params, **({"n_jobs": n_jobs} if n_jobs else {}))
+    if family == "random_forest":
+        return RandomForestRegressor(
+            **params, **({"n_jobs": n_jobs} if n_jobs else {})
+        )
+    raise ValueError(f"Famille de modèle inconnue: {family}.")
+
+
+def evaluate_predictions(y_true: pd.Series, y_pred: np.ndarray) -> dict:
+    """Métriques d'évaluation d'un modèle."""
+    return {
+        "mae": mean_absolute_error(y_true, y_pred),
+        "mse": mean_squared_error(y_true, y_pred),
+        "rmse": np.sqrt(mean_squared_error(y_true, y_pred)),
+        "r2": r2_score(y_true, y_pred),
+    }
+
+
+def fit_model_family(family: str, params: dict, split: dict, n_jobs: int = None):
+    """
+    Entraine et évalue une famille de modèles sur un jeu préparé
+    (voir RenewableModelTrainer.prepare_training_split).
+    Returns:
+        Tuple (modèle entraîné, métriques)
+    """
+    suffix = "_scaled" if family in SCALED_FAMILIES else ""
+    model = build_model(family, params, n_jobs)
+    model.fit(split[f"X_train{suffix}"], split["y_train"])
+    y_pred = model.predict(split[f"X_test{suffix}"])
+    return model, evaluate_predictions(split["y_test"], y_pred)
+
+
+def ridge_statistics(X, y) -> dict:
+    """
+    Statistiques suffisantes de Ridge : nombre de lignes, sommes, X'X et X'y.
+    Elles s'additionnent d'une fenêtre de données à l'autre.
+    """
+    X, y = np.asarray(X, dtype=float), np.asarray(y, dtype=float)
+    return {
+        "n": len(y),
+        "sum_x": X.sum(axis=0),
+        "sum_y": y.sum(),
+        "xtx": X.T @ X,
+        "xty": X.T @ y,
+    }
+
+
+def merge_ridge_statistics(left: dict, right: dict) -> dict:
+    """Statistiques suffisantes de la réunion de deux jeux de données."""
+    return {name: np.asarray(left[name]) + np.asarray(right[name]) for name in left}
+
+
+def solve_ridge(statistics: dict, alpha: float) -> tuple:
+    """
+    Coefficients et intercept de Ridge (avec intercept) à partir des
+    statistiques suffisantes, identiques à Ridge(alpha).fit sur les données.
+    """
+    n = statistics["n"]
+    mean_x = np.asarray(statistics["sum_x"]) / n
+    mean_y = float(statistics["sum_y"]) / n
+    # Données centrées, comme le fait Ridge avec fit_intercept=True
+    xtx = np.asarray(statistics["xtx"]) - n * np.outer(mean_x, mean_x)
+    xty = np.asarray(statistics["xty"]) - n * mean_x * mean_y
+    coef = np.linalg.solve(xtx + alpha * np.eye(len(mean_x)), xty)
+    return coef, mean_y - mean_x @ coef
+
+
+def _statistics_to_json(statistics: dict) -> dict:
+    return {name: np.asarray(value).tolist() for name, value in statistics.items()}
+
 
 class RenewableModelTrainer:
     def __init__(self, producer_type: str):
@@ -20,6 +113,13 @@ class RenewableModelTrainer:
         self.config = MODEL_CONFIG[producer_type]
         self.models = {}
         self.scalers = {}
+        # Paramètres retenus et résultats de recherche par famille
+        self.params = {}
+        self.search_results = {}
+        # Données du dernier entrainement (métadonnées, mode incrémental)
+        self.features = []
+        self.data_max_date = None
+        self.ridge_statistics = None
         self.logger = logging.getLogger(__name__)
 
     def prepare_features(self, df: pd.DataFrame) -> tuple:
@@ -48,17 +148,29 @@ class RenewableModelTrainer:
 
         return X, y
 
-    def train_models(self, test_size: float = 0.2) -> dict:
+    def prepare_training_split(
+        self, test_size: float = 0.2, full_refresh: bool = False
+    ) -> dict:
         """
-        Entraine les modèles.
+        Charge les données, sépare train/test et standardise les features.
+        Args:
+            full_refresh: Relit les tables entières et réécrit leurs
+                instantanés locaux (voir SupabaseDataLoader.load_table)
+        Returns:
+            Dictionnaire X_train, X_test, X_train_scaled, X_test_scaled,
+            y_train, y_test
         """
 
         # Chargement des données
-        df = self.data_loader.load_training_data(self.producer_type)
+        df = self.data_loader.load_training_data(
+            self.producer_type, full_refresh=full_refresh
+        )
         if df.empty:
             raise ValueError(f"Aucune donnée trouvée pour {self.producer_type}.")
 
         X, y = self.prepare_features(df)
+        self.features = list(X.columns)
+        self.data_max_date = str(df["date"].max()) if "date" in df.columns else None
 
         # Split Train/Test
         X_train, X_test, y_train, y_test = train_test_split(
@@ -71,71 +183,327 @@ class RenewableModelTrainer:
         X_test_scaled = scaler.transform(X_test)
 
         self.scalers["standard"] = scaler
+        # Statistiques de toutes les lignes (train et test) : la mise à jour
+        # incrémentale de Ridge n'écarte pas définitivement le jeu de test
+        self.ridge_statistics = merge_ridge_statistics(
+            ridge_statistics(X_train_scaled, y_train),
+            ridge_statistics(X_test_scaled, y_test),
+        )
 
-        results = {}
+        return {
+            "X_train": X_train,
+            "X_test": X_test,
+            "X_train_scaled": X_train_scaled,
+            "X_test_scaled": X_test_scaled,
+            "y_train": y_train,
+            "y_test": y_test,
+        }
 
-        # Entrainement Ridge
-        self.logger.info("Entrainement Ridge...")
-        ridge_model = Ridge(**self.config["models"]["ridge"])
-        ridge_model.fit(X_train_scaled, y_train)
-        self.models["ridge"] = ridge_model
+    def train_models(
+        self,
+        test_size: float = 0.2,
+        search: bool = None,
+        time_budget: float = None,
+        full_refresh: bool = False,
+    ) -> dict:
+        """
+        Entraine les modèles l'un après l'autre
+        (voir TrainingOrchestrator pour l'entrainement en parallèle).
+        Args:
+            search: Recherche d'hyperparamètres avant l'entrainement final
+                (par défaut SEARCH_ENABLED)
+            time_budget: Budget de temps de la recherche, toutes familles
+                confondues (secondes, par défaut SEARCH_TIME_BUDGET)
+            full_refresh: Relit les tables entières au lieu des instantanés
+        """
+        # Import local : hyperparameter_search dépend de ce module
+        from .hyperparameter_search import successive_halving
 
-        # Evaluation Ridge
-        y_pred_ridge = ridge_model.predict(X_test_scaled)
-        results["ridge"] = self._evaluate_model(y_test, y_pred_ridge)
+        search = settings.search_enabled if search is None else search
+        split = self.prepare_training_split(test_size, full_refresh)
+        # Budget décompté après le chargement des données (lecture paginée)
+        deadline = time.time() + (time_budget or settings.search_time_budget)
 
-        # Entraînement XGBoost
-        self.logger.info("Entraînement XGBoost...")
-        xgb_model = xgb.XGBRegressor(**self.config["models"]["xgboost"])
-        xgb_model.fit(X_train_scaled, y_train)
-        self.models["xgboost"] = xgb_model
+        results = {}
+        for family in MODEL_FAMILIES:
+            params = self.config["models"][family]
+            if search:
+                self.logger.info(f"Recherche d'hyperparamètres {family}...")
+                self.search_results[family] = successive_halving(
+                    family, split, base_params=params, deadline=deadline
+                )
+                params = self.search_results[family]["params"]
+            self.params[family] = params
 
-        # Évaluation XGBoost
-        y_pred_xgb = xgb_model.predict(X_test_scaled)
-        results["xgboost"] = self._evaluate_model(y_test, y_pred_xgb)
+            self.logger.info(f"Entrainement {family}...")
+            self.models[family], results[family] = fit_model_family(
+                family, params, split
+            )
 
-        # Entraînement Random Forest
-        self.logger.info("Entraînement Random Forest...")
-        rf_model = RandomForestRegressor(**self.config["models"]["random_forest"])
-        rf_model.fit(X_train, y_train)  # RF moins sensible à la normalisation
-        self.models["random_forest"] = rf_model
+        # Sauvegarde du meilleur modèle
+        self.save_best_model(results)
 
-        # Évaluation Random Forest
-        y_pred_rf = rf_model.predict(X_test)
-        results["random_forest"] = self._evaluate_model(y_test, y_pred_rf)
+        return results
 
-        # Sauvegarde du meilleur modèle
+    def save_best_model(self, results: dict) -> str:
+        """Sauvegarde le modèle de plus faible MAE et retourne sa famille."""
         best_model_name = min(results, key=lambda x: results[x]["mae"])
-        self._save_best_model(best_model_name)
+        self._save_best_model(best_model_name, results[best_model_name])
+        return best_model_name
 
-        return results
+    def train_incremental(self, rebuild: bool = True) -> dict:
+        """
+        Met à jour le modèle sauvegardé avec les seules lignes postérieures
+        à son dernier entrainement :
+        - XGBoost : boosting poursuivi depuis le booster sauvegardé
+        - Random Forest : arbres ajoutés (warm_start) sur la nouvelle fenêtre
+        - Ridge : solution recalculée depuis les statistiques suffisantes de
+          toutes les lignes vues (train et test du dernier entrainement
+          complet, puis chaque nouvelle fenêtre), avec le scaler sauvegardé
+        Une reconstruction complète reste nécessaire sans modèle sauvegardé,
+        si les features ont changé ou après TRAINING_FULL_REBUILD_DAYS jours ;
+        elle relit alors les tables entières (full_refresh), ce qui
+        resynchronise les instantanés locaux.
+        Args:
+            rebuild: Lance train_models si une reconstruction est nécessaire
+                (sinon le rapport l'indique seulement)
+        Returns:
+            Rapport avec mode : "incremental", "up_to_date" (trop peu de
+            nouvelles lignes), "full" ou "full_required" (rebuild=False)
+        """
+        start = time.perf_counter()
+        metadata = self.load_metadata()
+        reason = self._full_rebuild_reason(metadata)
+
+        if reason is None:
+            df = self.data_loader.load_training_data(self.producer_type)
+            new_df = df[df["date"] > pd.Timestamp(metadata["data_max_date"])]
+            if len(new_df) < settings.incremental_min_rows:
+                self.logger.info(
+                    f"Modèle {self.producer_type} à jour: {len(new_df)} "
+                    f"nouvelles lignes."
+                )
+                return {
+                    "mode": "up_to_date",
+                    "model_family": metadata["model_family"],
+                    "rows": len(new_df),
+                }
+            X_new, y_new = self.prepare_features(new_df)
+            if list(X_new.columns) != metadata["features"]:
+                reason = "features modifiées"
+
+        if reason is not None:
+            self.logger.info(f"Reconstruction complète {self.producer_type}: {reason}.")
+            if not rebuild:
+                return {"mode": "full_required", "reason": reason}
+            results = self.train_models(full_refresh=True)
+            return {
+                "mode": "full",
+                "reason": reason,
+                "results": results,
+                "seconds": round(time.perf_counter() - start, 3),
+            }
+
+        report = self._update_saved_model(metadata, new_df, X_new, y_new)
+        report["seconds"] = round(time.perf_counter() - start, 3)
+        self.logger.info(
+            f"Mise à jour incrémentale {self.producer_type}/{report['model_family']}: "
+            f"{report['rows']} lignes en {report['seconds']:.2f}s "
+            f"(MAE avant mise à jour={report['metrics_before']['mae']:.3f})."
+        )
+        return report
+
+    def load_metadata(self) -> dict:
+        """Métadonnées du modèle sauvegardé, ou None."""
+        try:
+            with open(self._metadata_path(), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Métadonnées {self.producer_type} illisibles: {e}")
+            return None
+
+    def _full_rebuild_reason(self, metadata: dict) -> str:
+        """Raison d'une reconstruction complète, ou None."""
+        if metadata is None:
+            return "aucune métadonnée de modèle"
+        if not metadata.get("data_max_date") or not metadata.get("last_full_rebuild"):
+            return "métadonnées incomplètes"
+        family = metadata["model_family"]
+        if not os.path.exists(self._model_path(family)):
+            return "modèle sauvegardé introuvable"
+        if family == "ridge" and not metadata.get("ridge_statistics"):
+            return "statistiques Ridge absentes"
+        age = datetime.now() - datetime.fromisoformat(metadata["last_full_rebuild"])
+        if age > timedelta(days=settings.training_full_rebuild_days):
+            return f"dernière reconstruction il y a {age.days} jours"
+        return None
+
+    def _update_saved_model(
+        self, metadata: dict, new_df: pd.DataFrame, X_new: pd.DataFrame, y_new
+    ) -> dict:
+        """Poursuit l'entrainement du modèle sauvegardé sur la nouvelle fenêtre."""
+        family = metadata["model_family"]
+        model = joblib.load(self._model_path(family))
+        X_fit = X_new
+        if family in SCALED_FAMILIES:
+            # Le scaler du dernier entrainement complet reste inchangé
+            scaler = joblib.load(f"{MODELS_DIR}/{self.producer_type}_scaler.pkl")
+            self.scalers["standard"] = scaler
+            X_fit = scaler.transform(X_new)
+
+        # Erreur du modèle actuel sur des données qu'il n'a pas vues
+        metrics_before = evaluate_predictions(y_new, model.predict(X_fit))
+
+        statistics = None
+        if family == "xgboost":
+            model_params = {
+                **metadata["params"],
+                "n_estimators": settings.incremental_xgb_rounds,
+            }
+            updated = build_model(family, model_params)
+            updated.fit(X_fit, y_new, xgb_model=model.get_booster())
+        elif family == "random_forest":
+            model.set_params(
+                warm_start=True,
+                n_estimators=model.n_estimators + settings.incremental_rf_trees,
+            )
+            updated = model.fit(X_fit, y_new)
+        elif family == "ridge":
+            statistics = merge_ridge_statistics(
+                metadata["ridge_statistics"], ridge_statistics(X_fit, y_new)
+            )
+            model.coef_, model.intercept_ = solve_ridge(statistics, model.alpha)
+            updated = model
+        else:
+            raise ValueError(f"Famille de modèle inconnue: {family}.")
+
+        self.models[family] = updated
+        self._atomic_dump(updated, self._model_path(family))
+        self._write_manifest(family)
+
+        report = {
+            "mode": "incremental",
+            "model_family": family,
+            "rows": len(new_df),
+            "metrics_before": {
+                name: float(value) for name, value in metrics_before.items()
+            },
+        }
+        metadata.update(
+            {
+                "data_max_date": str(new_df["date"].max()),
+                "training_mode": "incremental",
+                "incremental_updates": metadata.get("incremental_updates", 0) + 1,
+                "last_update": report,
+                "trained_at": datetime.now().isoformat(),
+            }
+        )
+        if statistics is not None:
+            metadata["ridge_statistics"] = _statistics_to_json(statistics)
+        self._write_json(metadata, self._metadata_path())
+        return report
 
     def _evaluate_model(self, y_true: pd.Series, y_pred: np.ndarray) -> dict:
         """
         Evalue les performances du modèle.
         """
-        return {
-            "mae": mean_absolute_error(y_true, y_pred),
-            "mse": mean_squared_error(y_true, y_pred),
-            "rmse": np.sqrt(mean_squared_error(y_true, y_pred)),
-            "r2": r2_score(y_true, y_pred),
-        }
+        return evaluate_predictions(y_true, y_pred)
 
-    def _save_best_model(self, model_name: str):
+    def _save_best_model(self, model_name: str, metrics: dict = None):
         """
-        Sauvegarde le meilleur modèle et son scaler.
+        Sauvegarde le meilleur modèle, son scaler et ses métadonnées
+        (paramètres retenus, métriques, recherche d'hyperparamètres).
+        Les fichiers sont écrits puis renommés atomiquement pour que l'API
+        (qui recharge les modèles à chaud) ne lise jamais un fichier partiel ;
+        le manifeste, écrit en dernier, publie la nouvelle paire modèle/scaler.
         """
         model = self.models[model_name]
         scaler = self.scalers.get("standard")
 
+        # Sauvegarde scaler (avant le modèle)
+        if scaler:
+            scaler_path = f"{MODELS_DIR}/{self.producer_type}_scaler.pkl"
+            self._atomic_dump(scaler, scaler_path)
+
         # Sauvegarde modèle
-        model_path = f"src/models/saved/{self.producer_type}_{model_name}_model.pkl"
-        joblib.dump(model, model_path)
+        model_path = self._model_path(model_name)
+        self._atomic_dump(model, model_path)
         logging.info(f"Modèle '{model}' sauvegardé !")
 
-        # Sauvegarde scaler
-        if scaler:
-            scaler_path = f"src/models/saved/{self.producer_type}_scaler.pkl"
-            joblib.dump(scaler, scaler_path)
+        self._write_metadata(model_name, metrics)
+        self._write_manifest(model_name)
+
+        # Suppression des modèles d'autres familles pour ce producteur
+        for f in os.listdir(MODELS_DIR):
+            if (
+                f.startswith(f"{self.producer_type}_")
+                and f.endswith("_model.pkl")
+                and f != os.path.basename(model_path)
+            ):
+                os.remove(os.path.join(MODELS_DIR, f))
+                self.logger.info(f"Ancien modèle supprimé: {f}.")
 
         self.logger.info(f"Meilleur modèle sauvegardé: {model_path}.")
+
+    def _write_metadata(self, model_name: str, metrics: dict = None):
+        """Écrit {producteur}_metadata.json à côté du modèle sauvegardé."""
+        trained_at = datetime.now().isoformat()
+        statistics = self.ridge_statistics if model_name == "ridge" else None
+        metadata = {
+            "producer": self.producer_type,
+            "model_family": model_name,
+            "params": self.params.get(model_name, self.config["models"][model_name]),
+            "metrics": {name: float(value) for name, value in (metrics or {}).items()},
+            "search": self.search_results.get(model_name),
+            "trained_at": trained_at,
+            # Reprise par train_incremental
+            "features": self.features,
+            "data_max_date": self.data_max_date,
+            "training_mode": "full",
+            "last_full_rebuild": trained_at,
+            "incremental_updates": 0,
+            "ridge_statistics": (
+                _statistics_to_json(statistics) if statistics else None
+            ),
+        }
+        self._write_json(metadata, self._metadata_path())
+
+    def _write_manifest(self, model_name: str):
+        """
+        Écrit {producteur}_manifest.json avec les empreintes du modèle et du
+        scaler sauvegardés : le registre ne recharge que cette paire.
+        """
+        files = {"model_file": os.path.basename(self._model_path(model_name))}
+        scaler_file = f"{self.producer_type}_scaler.pkl"
+        if os.path.exists(f"{MODELS_DIR}/{scaler_file}"):
+            files["scaler_file"] = scaler_file
+        manifest = {
+            **files,
+            "sha256": {
+                name: file_sha256(f"{MODELS_DIR}/{name}") for name in files.values()
+            },
+        }
+        self._write_json(manifest, f"{MODELS_DIR}/{manifest_name(self.producer_type)}")
+
+    def _model_path(self, model_name: str) -> str:
+        return f"{MODELS_DIR}/{self.producer_type}_{model_name}_model.pkl"
+
+    def _metadata_path(self) -> str:
+        return f"{MODELS_DIR}/{self.producer_type}_metadata.json"
+
+    @staticmethod
+    def _write_json(data: dict, path: str):
+        """Écrit un fichier JSON temporaire puis le renomme."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _atomic_dump(obj, path: str):
+        """Écrit un objet joblib dans un fichier temporaire puis le renomme."""
+        tmp_path = f"{path}.tmp"
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, path)
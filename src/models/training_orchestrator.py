@@ -0,0 +1,232 @@
+"""
+Entraînement parallèle des modèles : un job par producteur et famille de
+modèles, exécuté dans un pool de processus sous un budget global de cœurs.
+
+Chaque job dispose de `threads_per_job` threads (n_jobs de Random Forest et
+XGBoost, BLAS via threadpoolctl) : workers × threads ne dépasse pas le budget.
+Chaque job tourne dans un processus neuf (max_tasks_per_child=1), ce qui
+permet de mesurer son pic mémoire. En mode recherche, chaque job cherche
+d'abord ses hyperparamètres (halving successif) avant l'entrainement final ;
+tous les jobs partagent la même échéance.
+"""
+
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from threadpoolctl import threadpool_limits
+
+from src.config.settings import settings
+from .hyperparameter_search import successive_halving
+from .model_trainer import MODEL_FAMILIES, RenewableModelTrainer, fit_model_family
+
+try:
+    import resource
+except ImportError:  # Windows : pic mémoire non disponible
+    resource = None
+
+PRODUCERS = ["solar", "wind", "hydro"]
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Pic de mémoire résidente du processus courant (Mo)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kio sous Linux, octets sous macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def plan_workers(n_jobs: int, cpu_budget: int, max_workers: int = 0):
+    """
+    Répartit le budget de cœurs entre processus et threads par job.
+    Returns:
+        Tuple (processus, threads par job)
+    """
+    workers = min(n_jobs, cpu_budget, max_workers or cpu_budget)
+    workers = max(1, workers)
+    return workers, max(1, cpu_budget // workers)
+
+
+def run_training_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Entraine une famille de modèles pour un producteur (exécuté dans un
+    processus du pool).
+    """
+    start = time.perf_counter()
+    params, search = job["params"], None
+    with threadpool_limits(limits=job["threads"]):
+        if job.get("search"):
+            # Déjà dans un processus du pool : évaluations séquentielles
+            search = successive_halving(
+                job["family"],
+                job["split"],
+                base_params=params,
+                deadline=job["deadline"],
+                max_workers=1,
+                threads=job["threads"],
+            )
+            params = search["params"]
+        model, metrics = fit_model_family(
+            job["family"], params, job["split"], n_jobs=job["threads"]
+        )
+    return {
+        "producer": job["producer"],
+        "family": job["family"],
+        "model": model,
+        "params": params,
+        "search": search,
+        "metrics": metrics,
+        "seconds": round(time.perf_counter() - start, 3),
+        "peak_memory_mb": peak_memory_mb(),
+        "pid": os.getpid(),
+    }
+
+
+class TrainingOrchestrator:
+    """
+    Entraîne producteurs × familles de modèles en parallèle puis sauvegarde
+    le meilleur modèle de chaque producteur.
+    """
+
+    def __init__(
+        self,
+        producers: List[str] = None,
+        families: List[str] = None,
+        cpu_budget: int = None,
+        max_workers: int = None,
+        test_size: float = 0.2,
+        search: bool = None,
+        time_budget: float = None,
+        full_refresh: bool = False,
+    ):
+        self.producers = producers or PRODUCERS
+        self.families = families or MODEL_FAMILIES
+        self.cpu_budget = (
+            cpu_budget or settings.training_cpu_budget or os.cpu_count() or 1
+        )
+        self.max_workers = (
+            settings.training_max_processes if max_workers is None else max_workers
+        )
+        self.test_size = test_size
+        self.search = settings.search_enabled if search is None else search
+        self.time_budget = time_budget or settings.search_time_budget
+        # Relecture complète des tables (instantanés locaux réécrits)
+        self.full_refresh = full_refresh
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Lance tous les jobs et retourne le rapport d'entrainement :
+        durée totale, répartition du budget, et pour chaque job sa durée,
+        son pic mémoire et ses métriques ; meilleur modèle par producteur.
+        """
+        start = time.perf_counter()
+        report: Dict[str, Any] = {"jobs": [], "best": {}, "errors": {}}
+
+        # Données chargées une fois par producteur, partagées par ses jobs
+        trainers, jobs = {}, []
+        for producer in self.producers:
+            try:
+                trainer = RenewableModelTrainer(producer)
+                split = trainer.prepare_training_split(
+                    self.test_size, self.full_refresh
+                )
+            except Exception as e:
+                logging.error(f"Préparation des données {producer} en échec: {e}")
+                report["errors"][producer] = str(e)
+                continue
+            trainers[producer] = trainer
+            jobs += [
+                {
+                    "producer": producer,
+                    "family": family,
+                    "params": trainer.config["models"][family],
+                    "split": split,
+                    "search": self.search,
+                }
+                for family in self.families
+            ]
+
+        # Budget de recherche décompté une fois les données chargées
+        deadline = time.time() + self.time_budget
+        workers, threads = plan_workers(len(jobs), self.cpu_budget, self.max_workers)
+        report.update(
+            {
+                "cpu_budget": self.cpu_budget,
+                "workers": workers,
+                "threads_per_job": threads,
+            }
+        )
+        logging.info(
+            f"{len(jobs)} jobs d'entrainement: {workers} processus × "
+            f"{threads} threads (budget {self.cpu_budget} cœurs)"
+        )
+
+        results: Dict[str, Dict[str, Any]] = {producer: {} for producer in trainers}
+        if jobs:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=1,
+            ) as executor:
+                futures = {
+                    executor.submit(
+                        run_training_job,
+                        {**job, "deadline": deadline, "threads": threads},
+                    ): job
+                    for job in jobs
+                }
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logging.error(
+                            f"Job {job['producer']}/{job['family']} en échec: {e}"
+                        )
+                        report["jobs"].append(
+                            {
+                                "producer": job["producer"],
+                                "family": job["family"],
+                                "error": str(e),
+                            }
+                        )
+                        continue
+
+                    trainer = trainers[result["producer"]]
+                    trainer.models[result["family"]] = result.pop("model")
+                    trainer.params[result["family"]] = result["params"]
+                    if result["search"] is not None:
+                        trainer.search_results[result["family"]] = result["search"]
+                    results[result["producer"]][result["family"]] = result["metrics"]
+                    report["jobs"].append(result)
+                    logging.info(
+                        f"Job {result['producer']}/{result['family']}: "
+                        f"{result['seconds']:.2f}s, pic mémoire "
+                        f"{result['peak_memory_mb']} Mo, "
+                        f"MAE={result['metrics']['mae']:.3f}"
+                    )
+
+        # Sauvegarde du meilleur modèle de chaque producteur
+        for producer, producer_results in results.items():
+            if not producer_results:
+                continue
+            try:
+                report["best"][producer] = trainers[producer].save_best_model(
+                    producer_results
+                )
+            except Exception as e:
+                logging.error(f"Sauvegarde du modèle {producer} en échec: {e}")
+                report["errors"][producer] = str(e)
+
+        report["results"] = results
+        report["wall_seconds"] = round(time.perf_counter() - start, 3)
+        logging.info(
+            f"Entrainement terminé en {report['wall_seconds']:.2f}s: "
+            f"{len(report['jobs'])} jobs, meilleurs modèles {report['best']}"
+        )
+        return report
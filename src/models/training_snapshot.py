@@ -0,0 +1,97 @@
+"""
+Instantanés locaux des tables d'entraînement.
+
+Chaque table lue par SupabaseDataLoader est gardée sur disque (Parquet si
+pyarrow est installé, sinon pickle) avec ses métadonnées : colonnes, nombre
+de lignes et dernière date. Les entraînements suivants ne relisent dans
+Supabase que les lignes récentes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.config.settings import settings
+
+try:
+    import pyarrow  # noqa: F401
+
+    SNAPSHOT_FORMAT = "parquet"
+except ImportError:  # Dépendance optionnelle
+    SNAPSHOT_FORMAT = "pickle"
+
+
+class TrainingSnapshotStore:
+    """
+    Instantanés des tables d'entraînement, un fichier par table et par jeu
+    de colonnes (un changement de features n'utilise pas l'ancien instantané).
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or settings.training_snapshot_dir
+
+    def read(
+        self, table: str, columns: List[str]
+    ) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+        """
+        Returns:
+            (DataFrame, métadonnées) ou None si aucun instantané valide
+        """
+        data_path, meta_path = self._paths(table, columns)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["format"] == "parquet":
+                df = pd.read_parquet(data_path)
+            else:
+                df = pd.read_pickle(data_path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Instantané de {table} illisible, ignoré: {e}")
+            return None
+
+        if len(df) != meta.get("rows"):
+            logging.warning(f"Instantané de {table} incomplet, ignoré")
+            return None
+        return df, meta
+
+    def write(
+        self, table: str, columns: List[str], df: pd.DataFrame
+    ) -> Dict[str, Any]:
+        """Enregistre l'instantané (écriture atomique) et retourne ses métadonnées."""
+        data_path, meta_path = self._paths(table, columns)
+        os.makedirs(self.directory, exist_ok=True)
+
+        tmp_path = f"{data_path}.tmp"
+        if SNAPSHOT_FORMAT == "parquet":
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, data_path)
+
+        max_date = df["date"].max() if not df.empty else None
+        meta = {
+            "table": table,
+            "columns": columns,
+            "format": SNAPSHOT_FORMAT,
+            "rows": len(df),
+            "max_date": None if pd.isna(max_date) else str(max_date),
+            "updated_at": datetime.now().isoformat(),
+        }
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+        return meta
+
+    def _paths(self, table: str, columns: List[str]) -> Tuple[str, str]:
+        digest = hashlib.sha256(",".join(columns).encode()).hexdigest()[:8]
+        extension = "parquet" if SNAPSHOT_FORMAT == "parquet" else "pkl"
+        base = os.path.join(self.directory, f"{table}_{digest}")
+        return f"{base}.{extension}", f"{base}.json"
@@ -0,0 +1,200 @@
+"""
+Métriques au format texte Prometheus, sans collecteur externe.
+
+Les compteurs et histogrammes sont conservés en mémoire dans le processus
+et exposés par l'endpoint /metrics de l'API.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# Bornes des histogrammes de latence (secondes)
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], **extra):
+    pairs = list(zip(labelnames, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Compteur monotone, une série par combinaison de labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        return self._values.get(key, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram:
+    """Histogramme cumulatif (bornes fixes), une série par combinaison de labels."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...],
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Par série : [comptes par borne (+Inf inclus), somme, nombre]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[key] = series
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        series = self._series.get(key)
+        return series[2] if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series_copy = {
+                key: (list(counts), total, count)
+                for key, (counts, total, count) in self._series.items()
+            }
+
+        lines = []
+        for key, (counts, total, count) in sorted(series_copy.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, le=_format_value(bound))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Ensemble des métriques du processus et rendu au format texte Prometheus."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Retourne toutes les métriques au format d'exposition texte Prometheus."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+
+# Registre unique partagé par le processus
+metrics = MetricsRegistry()
+
+http_requests_total = metrics.counter(
+    "enr_http_requests_total",
+    "Nombre de requêtes HTTP traitées",
+    ("method", "route", "status"),
+)
+http_request_duration_seconds = metrics.histogram(
+    "enr_http_request_duration_seconds",
+    "Durée de traitement des requêtes HTTP (secondes)",
+    ("method", "route"),
+)
+stage_duration_seconds = metrics.histogram(
+    "enr_stage_duration_seconds",
+    "Durée des étapes internes de prédiction (secondes)",
+    ("stage", "producer"),
+)
+
+
+@contextmanager
+def time_stage(stage: str, producer: str = ""):
+    """
+    Mesure la durée d'une étape interne (fetch Supabase, nettoyage, scaling,
+    model.predict, sérialisation), y compris quand elle lève une exception.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_duration_seconds.observe(
+            time.perf_counter() - start, stage=stage, producer=producer
+        )
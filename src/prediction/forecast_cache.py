@@ -0,0 +1,175 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from src.config.settings import settings
+
+
+class CacheEntry:
+    """Valeur mise en cache avec la version des données qui l'ont produite."""
+
+    def __init__(self, value: Any, version: Any):
+        self.value = value
+        self.version = version
+        self.created_at = time.monotonic()
+
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+
+class ForecastCache:
+    """
+    Cache en mémoire des prédictions, avec TTL et stale-while-revalidate.
+
+    - entrée plus jeune que `ttl` : servie directement (hit)
+    - entrée expirée mais plus jeune que `ttl + stale_ttl` : servie immédiatement
+      (stale hit) pendant qu'une seule tâche de fond la revalide
+    - sinon : calcul synchrone (miss)
+
+    Les entrées sont indexées par (clé, version des données) : la version
+    (empreinte des tables de prévision et version du modèle) est recalculée à
+    la revalidation. Inchangée, l'entrée est simplement prolongée sans relancer
+    les modèles ; sinon une nouvelle entrée remplace celle de l'ancienne version.
+    """
+
+    def __init__(self, ttl: float = None, stale_ttl: float = None):
+        self.ttl = settings.forecast_cache_ttl if ttl is None else ttl
+        self.stale_ttl = (
+            settings.forecast_cache_stale_ttl if stale_ttl is None else stale_ttl
+        )
+        self._entries: Dict[Tuple[Hashable, Any], CacheEntry] = {}
+        # Version de l'entrée servie pour chaque clé
+        self._versions: Dict[Hashable, Any] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "revalidations": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+        self.logger = logging.getLogger(__name__)
+
+    def get(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        version: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        """
+        Retourne la valeur en cache pour `key` ou la calcule avec `loader`.
+        Args:
+            key: Clé de cache (type de producteur)
+            loader: Fonction sans argument qui calcule la valeur
+            version: Fonction sans argument qui retourne la version des données
+        """
+        entry = self._current(key)
+
+        if entry is not None:
+            age = entry.age()
+            if age < self.ttl:
+                self._count("hits")
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self._count("stale_hits")
+                self._schedule_refresh(key, loader, version)
+                return entry.value
+
+        self._count("misses")
+        return self._load(key, loader, version() if version else None)
+
+    def invalidate(self, key: Hashable = None):
+        """Supprime une entrée (ou toutes les entrées)."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._versions.clear()
+            else:
+                self._entries.pop((key, self._versions.pop(key, None)), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retourne les compteurs et l'âge des entrées."""
+        with self._lock:
+            stats = dict(self.stats)
+            entries = {
+                key: self._entries[(key, version)]
+                for key, version in self._versions.items()
+            }
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_ratio"] = (
+            round((stats["hits"] + stats["stale_hits"]) / lookups, 3)
+            if lookups
+            else 0.0
+        )
+        stats["ttl"] = self.ttl
+        stats["stale_ttl"] = self.stale_ttl
+        stats["entries"] = {
+            str(key): {"age_s": round(entry.age(), 1), "version": str(entry.version)}
+            for key, entry in entries.items()
+        }
+        return stats
+
+    def _current(self, key) -> Optional[CacheEntry]:
+        with self._lock:
+            return self._entries.get((key, self._versions.get(key)))
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.stats[counter] += 1
+
+    def _load(self, key, loader, current_version) -> Any:
+        value = loader()
+        # Un résultat vide (Supabase indisponible, modèle absent) n'est pas mis en cache
+        if value:
+            with self._lock:
+                # L'entrée de la version précédente n'est plus servie
+                previous = self._versions.get(key)
+                if previous != current_version:
+                    self._entries.pop((key, previous), None)
+                self._entries[(key, current_version)] = CacheEntry(
+                    value, current_version
+                )
+                self._versions[key] = current_version
+        return value
+
+    def _schedule_refresh(self, key, loader, version):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        threading.Thread(
+            target=self._refresh,
+            args=(key, loader, version),
+            name=f"forecast-cache-{key}",
+            daemon=True,
+        ).start()
+
+    def _refresh(self, key, loader, version):
+        try:
+            entry = self._current(key)
+            current_version = version() if version else None
+            if (
+                version is not None
+                and entry is not None
+                and current_version == entry.version
+            ):
+                # Données inchangées : on prolonge l'entrée sans recalcul
+                with self._lock:
+                    entry.created_at = time.monotonic()
+                self._count("revalidations")
+                return
+
+            self._load(key, loader, current_version)
+            self._count("refreshes")
+
+        except Exception as e:
+            self._count("refresh_errors")
+            self.logger.error(f"Erreur rafraîchissement du cache {key}: {e}")
+
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
@@ -1,13 +1,22 @@
 import logging
+import numpy as np
+import pandas as pd
 from typing import List, Dict, Any
 from datetime import datetime
 from .model_predictor import ModelPredictor
-from .forecast_service import ForecastService
+from .model_registry import model_registry
+from .forecast_cache import ForecastCache
+from .forecast_service import ForecastService, run_by_producer
+from .forecast_store import ForecastStore
+
+PRODUCER_LABELS = {"solar": "solaire", "wind": "éolien", "hydro": "hydraulique"}
 
 
 class ForecastPredictor:
-    def __init__(self):
+    def __init__(self, cache: ForecastCache = None, store: ForecastStore = None):
         self.forecast_service = ForecastService()
+        self.cache = cache
+        self.store = store
         self.logger = logging.getLogger(__name__)
 
     def predict_solar_forecast(self) -> List[Dict[str, Any]]:
@@ -16,65 +25,20 @@ class ForecastPredictor:
         Returns:
             Liste de prédictions avec date, prediction_kwh et features
         """
+        return self._cached("solar", self._compute_solar_forecast)
+
+    def _compute_solar_forecast(self, rows=None) -> List[Dict[str, Any]]:
         try:
             self.logger.info("Début des prédictions solaires...")
 
             # Récupérer les prévisions météo
-            forecasts = self.forecast_service.get_solar_forecast()
+            forecasts = self.forecast_service.get_solar_forecast(rows)
 
             if not forecasts:
                 self.logger.warning("Aucune prévision solaire disponible")
                 return []
 
-            # Initialiser le prédicteur
-            predictor = ModelPredictor("solar")
-            model_info = predictor.get_model_info()
-
-            if not model_info["loaded"]:
-                self.logger.error("Modèle solaire non chargé")
-                return []
-
-            self.logger.info(f"Modèle solaire chargé: {model_info['model_type']}")
-
-            # Générer les prédictions pour chaque jour
-            predictions = []
-            successful_predictions = 0
-
-            for forecast in forecasts:
-                try:
-                    # Extraire les features (sans la date)
-                    features = {k: v for k, v in forecast.items() if k != "date"}
-
-                    # Faire la prédiction
-                    prediction_kwh = predictor.predict(features)
-
-                    # Créer l'objet de résultat
-                    result = {
-                        "date": forecast["date"],
-                        "prediction_kwh": round(prediction_kwh, 2),
-                        "producer_type": "solar",
-                        "features": features,
-                        "model_type": model_info["model_type"],
-                        "timestamp": datetime.now().isoformat(),
-                    }
-
-                    predictions.append(result)
-                    successful_predictions += 1
-
-                    self.logger.debug(
-                        f"Prédiction solaire {forecast['date']}: {prediction_kwh:.2f} kWh"
-                    )
-
-                except Exception as e:
-                    self.logger.error(
-                        f"Erreur prédiction solaire pour {forecast.get('date', 'date inconnue')}: {e}"
-                    )
-                    continue
-
-            self.logger.info(
-                f"Prédictions solaires terminées: {successful_predictions}/{len(forecasts)} réussies"
-            )
-            return predictions
+            return self.predict_forecasts("solar", forecasts)
 
         except Exception as e:
             self.logger.error(f"Erreur générale prédictions solaires: {e}")
@@ -86,65 +50,20 @@ class ForecastPredictor:
         Returns:
             Liste de prédictions avec date, prediction_kwh et features
         """
+        return self._cached("wind", self._compute_wind_forecast)
+
+    def _compute_wind_forecast(self, rows=None) -> List[Dict[str, Any]]:
         try:
             self.logger.info("Début des prédictions éoliennes...")
 
             # Récupérer les prévisions météo
-            forecasts = self.forecast_service.get_wind_forecast()
+            forecasts = self.forecast_service.get_wind_forecast(rows)
 
             if not forecasts:
                 self.logger.warning("Aucune prévision éolienne disponible")
                 return []
 
-            # Initialiser le prédicteur
-            predictor = ModelPredictor("wind")
-            model_info = predictor.get_model_info()
-
-            if not model_info["loaded"]:
-                self.logger.error("Modèle éolien non chargé")
-                return []
-
-            self.logger.info(f"Modèle éolien chargé: {model_info['model_type']}")
-
-            # Générer les prédictions pour chaque jour
-            predictions = []
-            successful_predictions = 0
-
-            for forecast in forecasts:
-                try:
-                    # Extraire les features (sans la date)
-                    features = {k: v for k, v in forecast.items() if k != "date"}
-
-                    # Faire la prédiction
-                    prediction_kwh = predictor.predict(features)
-
-                    # Créer l'objet de résultat
-                    result = {
-                        "date": forecast["date"],
-                        "prediction_kwh": round(prediction_kwh, 2),
-                        "producer_type": "wind",
-                        "features": features,
-                        "model_type": model_info["model_type"],
-                        "timestamp": datetime.now().isoformat(),
-                    }
-
-                    predictions.append(result)
-                    successful_predictions += 1
-
-                    self.logger.debug(
-                        f"Prédiction éolienne {forecast['date']}: {prediction_kwh:.2f} kWh"
-                    )
-
-                except Exception as e:
-                    self.logger.error(
-                        f"Erreur prédiction éolienne pour {forecast.get('date', 'date inconnue')}: {e}"
-                    )
-                    continue
-
-            self.logger.info(
-                f"Prédictions éoliennes terminées: {successful_predictions}/{len(forecasts)} réussies"
-            )
-            return predictions
+            return self.predict_forecasts("wind", forecasts)
 
         except Exception as e:
             self.logger.error(f"Erreur générale prédictions éoliennes: {e}")
@@ -156,70 +75,212 @@ class ForecastPredictor:
         Returns:
             Liste de prédictions avec date, prediction_kwh et features
         """
+        return self._cached("hydro", self._compute_hydro_forecast)
+
+    def _compute_hydro_forecast(self, rows=None) -> List[Dict[str, Any]]:
         try:
             self.logger.info("Début des prédictions hydrauliques...")
 
             # Récupérer les données hydrauliques
-            forecasts = self.forecast_service.get_hydro_forecast()
+            forecasts = self.forecast_service.get_hydro_forecast(rows)
 
             if not forecasts:
                 self.logger.warning("Aucune donnée hydraulique disponible")
                 return []
 
-            # Initialiser le prédicteur
-            predictor = ModelPredictor("hydro")
-            model_info = predictor.get_model_info()
+            return self.predict_forecasts("hydro", forecasts)
 
-            if not model_info["loaded"]:
-                self.logger.error("Modèle hydraulique non chargé")
-                return []
+        except Exception as e:
+            self.logger.error(f"Erreur générale prédictions hydrauliques: {e}")
+            return []
 
-            self.logger.info(f"Modèle hydraulique chargé: {model_info['model_type']}")
+    def _cached(self, producer_type: str, compute) -> List[Dict[str, Any]]:
+        """
+        Passe par le cache des prévisions et le stock de prédictions
+        matérialisées s'ils sont configurés. Les lignes d'entrée sont lues une
+        seule fois par calcul : la version des données en est tirée, puis le
+        stock est vérifié et le calcul en direct les réutilise.
+        """
+        if self.cache is None and self.store is None:
+            return compute()
 
-            # Générer les prédictions
-            predictions = []
-            successful_predictions = 0
+        inputs = {}
 
-            for forecast in forecasts:
-                try:
-                    # Extraire les features (sans la date)
-                    features = {k: v for k, v in forecast.items() if k != "date"}
+        def version():
+            inputs["rows"] = self._read_inputs(producer_type)
+            inputs["version"] = self.get_forecast_version(
+                producer_type, inputs["rows"]
+            )
+            return inputs["version"]
+
+        def load():
+            # Sans cache (ou entrée jamais versionnée), lecture faite ici
+            if "version" not in inputs:
+                version()
+            return self._stored_or_live(
+                producer_type, compute, inputs["rows"], inputs["version"]
+            )
 
-                    # Faire la prédiction
-                    prediction_kwh = predictor.predict(features)
+        if self.cache is None:
+            # Sans cache, le stock est d'abord validé par une sonde légère
+            # plutôt que par la relecture complète des prévisions
+            record = self._probed_record(producer_type)
+            if record is not None:
+                return record["predictions"]
+            return load()
+        return self.cache.get(producer_type, load, version)
+
+    def _stored_or_live(
+        self, producer_type: str, compute, rows, version: tuple
+    ) -> List[Dict[str, Any]]:
+        """
+        Retourne les prédictions matérialisées si elles sont à jour (même
+        modèle et mêmes données de prévision), sinon les calcule en direct
+        à partir des lignes déjà lues.
+        """
+        input_version, model_version = version
 
-                    # Créer l'objet de résultat
-                    result = {
-                        "date": forecast["date"],
-                        "prediction_kwh": round(prediction_kwh, 2),
-                        "producer_type": "hydro",
-                        "features": features,
-                        "model_type": model_info["model_type"],
-                        "timestamp": datetime.now().isoformat(),
-                    }
+        if self.store is not None:
+            record = self.store.get_fresh(producer_type, model_version, input_version)
+            if record is not None:
+                return record["predictions"]
 
-                    predictions.append(result)
-                    successful_predictions += 1
+            self.logger.info(
+                f"Prédictions stockées {producer_type} absentes ou périmées, "
+                f"calcul en direct"
+            )
+        return compute(rows)
 
-                    self.logger.debug(
-                        f"Prédiction hydraulique {forecast['date']}: {prediction_kwh:.2f} kWh"
-                    )
+    def _probed_record(self, producer_type: str):
+        """Entrée du stock valide selon la sonde des prévisions, ou None."""
+        input_probe = self._read_probe(producer_type)
+        if input_probe is None:
+            return None
+        try:
+            model_version = model_registry.get(producer_type).version
+        except Exception:
+            return None
+        return self.store.get_fresh(
+            producer_type, model_version, input_probe=input_probe
+        )
+
+    def _read_probe(self, producer_type: str):
+        """Sonde des prévisions d'un producteur, ou None si indisponible."""
+        try:
+            return self.forecast_service.get_forecast_probe(producer_type)
+        except Exception as e:
+            self.logger.warning(
+                f"Sonde des prévisions {producer_type} indisponible: {e}"
+            )
+            return None
 
-                except Exception as e:
-                    self.logger.error(
-                        f"Erreur prédiction hydraulique pour {forecast.get('date', 'date inconnue')}: {e}"
-                    )
-                    continue
+    def _read_inputs(self, producer_type: str):
+        """Lignes d'entrée d'un producteur, ou None si Supabase est indisponible."""
+        try:
+            return self.forecast_service.get_forecast_inputs(producer_type)
+        except Exception as e:
+            self.logger.warning(f"Prévisions {producer_type} indisponibles: {e}")
+            return None
 
-            self.logger.info(
-                f"Prédictions hydrauliques terminées: {successful_predictions}/{len(forecasts)} réussies"
+    def get_forecast_version(self, producer_type: str, rows=None) -> tuple:
+        """
+        Version des entrées d'une prédiction : données de prévision et modèle.
+        Une partie indisponible vaut None (la version change quand elle revient).
+        Args:
+            rows: Lignes déjà lues par ForecastService.get_forecast_inputs
+                (sinon lues ici)
+        """
+        try:
+            data_version = self.forecast_service.get_forecast_version(
+                producer_type, rows
             )
-            return predictions
-
         except Exception as e:
-            self.logger.error(f"Erreur générale prédictions hydrauliques: {e}")
+            self.logger.warning(f"Version des prévisions {producer_type} indisponible: {e}")
+            data_version = None
+
+        try:
+            model_version = model_registry.get(producer_type).version
+        except Exception:
+            model_version = None
+
+        return data_version, model_version
+
+    def predict_forecasts(
+        self, producer_type: str, forecasts: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Prédit la production pour tout l'horizon de prévision en un seul appel
+        au modèle. Un jour invalide est écarté sans bloquer les autres.
+        Args:
+            producer_type: 'solar', 'wind' ou 'hydro'
+            forecasts: Liste de dictionnaires avec la date et les features
+        Returns:
+            Liste de prédictions avec date, prediction_kwh et features
+        """
+        label = PRODUCER_LABELS[producer_type]
+
+        # Initialiser le prédicteur
+        predictor = ModelPredictor(producer_type)
+        model_info = predictor.get_model_info()
+
+        if not model_info["loaded"]:
+            self.logger.error(f"Modèle {label} non chargé")
             return []
 
+        self.logger.info(f"Modèle {label} chargé: {model_info['model_type']}")
+
+        # Matrice de features pour tout l'horizon (la colonne date est ignorée)
+        features_df = pd.DataFrame.from_records(forecasts)
+        try:
+            predictions_kwh, errors = predictor.predict_frame(features_df)
+        except Exception as e:
+            # Repli jour par jour pour isoler la ligne fautive
+            self.logger.warning(
+                f"Échec de la prédiction {label} par lot ({e}), repli jour par jour"
+            )
+            predictions_kwh, errors = self._predict_row_by_row(predictor, forecasts)
+
+        timestamp = datetime.now().isoformat()
+        predictions = []
+
+        for index, forecast in enumerate(forecasts):
+            if index in errors:
+                self.logger.error(
+                    f"Erreur prédiction {label} pour {forecast.get('date', 'date inconnue')}: {errors[index]}"
+                )
+                continue
+
+            prediction_kwh = float(predictions_kwh[index])
+            predictions.append(
+                {
+                    "date": forecast["date"],
+                    "prediction_kwh": round(prediction_kwh, 2),
+                    "producer_type": producer_type,
+                    "features": {k: v for k, v in forecast.items() if k != "date"},
+                    "model_type": model_info["model_type"],
+                    "timestamp": timestamp,
+                }
+            )
+
+        self.logger.info(
+            f"Prédictions {label} terminées: {len(predictions)}/{len(forecasts)} réussies"
+        )
+        return predictions
+
+    @staticmethod
+    def _predict_row_by_row(
+        predictor: ModelPredictor, forecasts: List[Dict[str, Any]]
+    ) -> tuple:
+        """Prédit chaque jour séparément et collecte les erreurs par index."""
+        predictions = np.full(len(forecasts), np.nan)
+        errors = {}
+        for index, forecast in enumerate(forecasts):
+            try:
+                predictions[index] = predictor.predict(forecast)
+            except Exception as e:
+                errors[index] = str(e)
+        return predictions, errors
+
     def predict_all_forecasts(self) -> Dict[str, List[Dict[str, Any]]]:
         """
         Génère les prédictions pour tous les types de producteurs
@@ -229,10 +290,21 @@ class ForecastPredictor:
         try:
             self.logger.info("Début des prédictions pour tous les producteurs...")
 
-            # Lancer les prédictions en séquentiel (pour éviter les conflits de ressources)
-            solar_predictions = self.predict_solar_forecast()
-            wind_predictions = self.predict_wind_forecast()
-            hydro_predictions = self.predict_hydro_forecast()
+            # Les trois pipelines (Supabase + modèle) s'exécutent en parallèle,
+            # un producteur en échec ou hors délai donne un résultat partiel
+            predictions, errors = run_by_producer(
+                {
+                    "solar": self.predict_solar_forecast,
+                    "wind": self.predict_wind_forecast,
+                    "hydro": self.predict_hydro_forecast,
+                }
+            )
+            for producer, error in errors.items():
+                self.logger.error(f"Erreur prédictions {producer}: {error}")
+
+            solar_predictions = predictions.get("solar", [])
+            wind_predictions = predictions.get("wind", [])
+            hydro_predictions = predictions.get("hydro", [])
 
             result = {
                 "solar": solar_predictions,
@@ -248,6 +320,8 @@ class ForecastPredictor:
                     "timestamp": datetime.now().isoformat(),
                 },
             }
+            if errors:
+                result["summary"]["errors"] = errors
 
             self.logger.info(
                 f"Prédictions terminées - "
@@ -282,25 +356,8 @@ class ForecastPredictor:
             # Récupérer les prévisions sans faire de prédictions
             forecasts = self.forecast_service.get_all_forecasts()
 
-            # Vérifier la disponibilité des modèles - CORRECTION ICI
-            models_status = {}
-            for producer_type in ["solar", "wind", "hydro"]:
-                try:
-                    predictor = ModelPredictor(producer_type)
-                    # Vérifier activement que le modèle est chargé
-                    if predictor.model is not None:
-                        models_status[producer_type] = {
-                            "loaded": True,
-                            "model_type": type(predictor.model).__name__,
-                            "has_scaler": predictor.scaler is not None,
-                        }
-                    else:
-                        models_status[producer_type] = {
-                            "loaded": False,
-                            "error": "Modèle non initialisé",
-                        }
-                except Exception as e:
-                    models_status[producer_type] = {"loaded": False, "error": str(e)}
+            # Vérifier la disponibilité des modèles via le registre partagé
+            models_status = model_registry.status()
 
             stats = {
                 "forecast_availability": {
@@ -1,8 +1,53 @@
+import hashlib
+import json
 import pandas as pd
 from supabase import create_client
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Tuple
 import logging
 from src.config.settings import settings
+from src.monitoring.metrics import time_stage
+from src.utils.concurrency import run_concurrently
+
+# Tables sources des features de prévision par type de producteur
+FORECAST_TABLES = {
+    "solar": "clean_solar_forecast",
+    "wind": "clean_wind_forecast",
+    "hydro": "clean_hubeau",
+}
+
+# Colonnes lues pour la prédiction et nombre de lignes (None : toute la table
+# par date croissante, sinon les dernières dates)
+FORECAST_INPUTS = {
+    "solar": (
+        "date, temperature_2m_mean, shortwave_radiation_sum_kwh_m2, sunshine_duration, cloud_cover_mean, relative_humidity_2m_mean",
+        None,
+    ),
+    "wind": (
+        "date, wind_speed_10m_max, wind_gusts_10m_max, wind_direction_10m_dominant, temperature_2m_mean",
+        None,
+    ),
+    # Moyenne des 7 derniers jours de débit
+    "hydro": ("date, debit_l_s", 7),
+}
+
+
+def run_by_producer(
+    tasks: Dict[str, Callable[[], Any]], timeout: float = None
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Exécute une tâche par type de producteur en parallèle (pool partagé
+    par les requêtes, dimensionné comme les appels Supabase de l'API).
+    Args:
+        tasks: Dictionnaire {producteur: fonction sans argument}
+        timeout: Délai maximal par producteur en secondes
+    Returns:
+        Tuple (résultats, erreurs) : un producteur en échec ou hors délai
+        n'a pas de résultat et son erreur est renseignée
+    """
+    timeout = settings.forecast_producer_timeout if timeout is None else timeout
+    return run_concurrently(
+        tasks, timeout, pool="producer", max_workers=settings.api_io_threads
+    )
 
 
 class ForecastService:
@@ -10,33 +55,46 @@ class ForecastService:
         self.supabase = create_client(settings.supabase_url, settings.supabase_key)
         self.logger = logging.getLogger(__name__)
 
-    def get_solar_forecast(self) -> List[Dict[str, Any]]:
+    def get_forecast_inputs(self, producer_type: str) -> List[Dict[str, Any]]:
+        """
+        Lit les lignes de la table de prévision utilisées pour la prédiction
+        (voir FORECAST_INPUTS). Elles servent à la fois au calcul de la
+        version des données et à la prédiction, sans seconde lecture.
+        """
+        columns, limit = FORECAST_INPUTS[producer_type]
+        with time_stage("supabase_fetch", producer_type):
+            query = (
+                self.supabase.table(FORECAST_TABLES[producer_type])
+                .select(columns)
+                .order("date", desc=bool(limit))
+            )
+            if limit:
+                query = query.limit(limit)
+            return query.execute().data
+
+    def get_solar_forecast(
+        self, rows: List[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Récupère les prévisions solaires depuis la table clean_solar_forecast
+        Args:
+            rows: Lignes déjà lues par get_forecast_inputs (sinon lues ici)
         Returns:
             Liste de dictionnaires avec les features pour la prédiction solaire
         """
         try:
             self.logger.info("Récupération des prévisions solaires...")
 
-            response = (
-                self.supabase.table("clean_solar_forecast")
-                .select(
-                    "date, temperature_2m_mean, shortwave_radiation_sum_kwh_m2, sunshine_duration, cloud_cover_mean, relative_humidity_2m_mean"
-                )
-                .order("date")
-                .execute()
-            )
-
-            forecasts = response.data
+            forecasts = self.get_forecast_inputs("solar") if rows is None else rows
             self.logger.info(f"Récupéré {len(forecasts)} prévisions solaires")
 
             # Validation et nettoyage des données
             valid_forecasts = []
-            for forecast in forecasts:
-                cleaned_forecast = self._clean_solar_forecast(forecast)
-                if cleaned_forecast:
-                    valid_forecasts.append(cleaned_forecast)
+            with time_stage("forecast_cleaning", "solar"):
+                for forecast in forecasts:
+                    cleaned_forecast = self._clean_solar_forecast(forecast)
+                    if cleaned_forecast:
+                        valid_forecasts.append(cleaned_forecast)
 
             self.logger.info(
                 f"{len(valid_forecasts)} prévisions solaires valides après nettoyage"
@@ -93,33 +151,29 @@ class ForecastService:
             )
             return None
 
-    def get_wind_forecast(self) -> List[Dict[str, Any]]:
+    def get_wind_forecast(
+        self, rows: List[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Récupère les prévisions éoliennes depuis la table clean_wind_forecast
+        Args:
+            rows: Lignes déjà lues par get_forecast_inputs (sinon lues ici)
         Returns:
             Liste de dictionnaires avec les features pour la prédiction éolienne
         """
         try:
             self.logger.info("Récupération des prévisions éoliennes...")
 
-            response = (
-                self.supabase.table("clean_wind_forecast")
-                .select(
-                    "date, wind_speed_10m_max, wind_gusts_10m_max, wind_direction_10m_dominant, temperature_2m_mean"
-                )
-                .order("date")
-                .execute()
-            )
-
-            forecasts = response.data
+            forecasts = self.get_forecast_inputs("wind") if rows is None else rows
             self.logger.info(f"Récupéré {len(forecasts)} prévisions éoliennes")
 
             # Validation et nettoyage des données
             valid_forecasts = []
-            for forecast in forecasts:
-                cleaned_forecast = self._clean_wind_forecast(forecast)
-                if cleaned_forecast:
-                    valid_forecasts.append(cleaned_forecast)
+            with time_stage("forecast_cleaning", "wind"):
+                for forecast in forecasts:
+                    cleaned_forecast = self._clean_wind_forecast(forecast)
+                    if cleaned_forecast:
+                        valid_forecasts.append(cleaned_forecast)
 
             self.logger.info(
                 f"{len(valid_forecasts)} prévisions éoliennes valides après nettoyage"
@@ -171,10 +225,14 @@ class ForecastService:
             )
             return None
 
-    def get_hydro_forecast(self) -> List[Dict[str, Any]]:
+    def get_hydro_forecast(
+        self, rows: List[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Récupère les dernières données hydrauliques pour prévision
         Pour l'hydro, on utilise les données les plus récentes de clean_hubeau
+        Args:
+            rows: Lignes déjà lues par get_forecast_inputs (sinon lues ici)
         Returns:
             Liste de dictionnaires avec les features pour la prédiction hydraulique
         """
@@ -182,25 +240,18 @@ class ForecastService:
             self.logger.info("Récupération des données hydrauliques...")
 
             # Récupérer les 7 derniers jours pour avoir un historique récent
-            response = (
-                self.supabase.table("clean_hubeau")
-                .select("date, debit_l_s")
-                .order("date", desc=True)
-                .limit(7)
-                .execute()
-            )
-
-            forecasts = response.data
+            forecasts = self.get_forecast_inputs("hydro") if rows is None else rows
             self.logger.info(f"Récupéré {len(forecasts)} données hydrauliques récentes")
 
             # Utiliser la moyenne des 7 derniers jours pour la prévision
             if forecasts:
                 # Calculer la moyenne des débits
-                debits = [
-                    max(0, float(f["debit_l_s"]))
-                    for f in forecasts
-                    if f.get("debit_l_s") is not None
-                ]
+                with time_stage("forecast_cleaning", "hydro"):
+                    debits = [
+                        max(0, float(f["debit_l_s"]))
+                        for f in forecasts
+                        if f.get("debit_l_s") is not None
+                    ]
                 if debits:
                     avg_debit = sum(debits) / len(debits)
 
@@ -222,25 +273,31 @@ class ForecastService:
 
     def get_all_forecasts(self) -> Dict[str, List[Dict[str, Any]]]:
         """
-        Récupère toutes les prévisions en une seule requête
+        Récupère toutes les prévisions (requêtes parallèles par producteur)
         Returns:
             Dictionnaire avec les prévisions pour chaque type de producteur
         """
         try:
             self.logger.info("Récupération de toutes les prévisions...")
 
-            solar_forecasts = self.get_solar_forecast()
-            wind_forecasts = self.get_wind_forecast()
-            hydro_forecasts = self.get_hydro_forecast()
+            # Les trois requêtes Supabase sont lancées en parallèle
+            forecasts, errors = run_by_producer(
+                {
+                    "solar": self.get_solar_forecast,
+                    "wind": self.get_wind_forecast,
+                    "hydro": self.get_hydro_forecast,
+                }
+            )
+            for producer, error in errors.items():
+                self.logger.error(f"Erreur récupération prévisions {producer}: {error}")
 
             result = {
-                "solar": solar_forecasts,
-                "wind": wind_forecasts,
-                "hydro": hydro_forecasts,
+                producer: forecasts.get(producer, [])
+                for producer in ["solar", "wind", "hydro"]
             }
 
             self.logger.info(
-                f"Prévisions récupérées - Solaire: {len(solar_forecasts)}, Éolien: {len(wind_forecasts)}, Hydro: {len(hydro_forecasts)}"
+                f"Prévisions récupérées - Solaire: {len(result['solar'])}, Éolien: {len(result['wind'])}, Hydro: {len(result['hydro'])}"
             )
             return result
 
@@ -248,6 +305,43 @@ class ForecastService:
             self.logger.error(f"Erreur récupération toutes les prévisions: {e}")
             return {"solar": [], "wind": [], "hydro": []}
 
+    def get_forecast_version(
+        self, producer_type: str, rows: List[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Retourne la version des données de prévision d'un producteur :
+        empreinte des lignes lues pour la prédiction (au plus quelques jours),
+        qui change dès qu'une valeur est réécrite, même à dates et nombre
+        de lignes identiques.
+        Args:
+            rows: Lignes déjà lues par get_forecast_inputs (sinon lues ici)
+        """
+        if rows is None:
+            rows = self.get_forecast_inputs(producer_type)
+
+        digest = hashlib.sha256(
+            json.dumps(rows, sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+        latest_date = max((row["date"] for row in rows), default=None)
+        return f"{latest_date}:{len(rows)}:{digest}"
+
+    def get_forecast_probe(self, producer_type: str) -> str:
+        """
+        Sonde légère des données de prévision : dernière date et nombre de
+        lignes de la table, lus sur une seule ligne (count exact). Sert à
+        valider les prédictions matérialisées sans relire les prévisions.
+        """
+        with time_stage("supabase_probe", producer_type):
+            response = (
+                self.supabase.table(FORECAST_TABLES[producer_type])
+                .select("date", count="exact")
+                .order("date", desc=True)
+                .limit(1)
+                .execute()
+            )
+        latest_date = response.data[0]["date"] if response.data else None
+        return f"{latest_date}:{response.count}"
+
     def check_forecast_availability(self) -> Dict[str, bool]:
         """
         Vérifie la disponibilité des données prévisionnelles
@@ -0,0 +1,205 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from src.config.settings import settings
+from .forecast_service import run_by_producer
+
+PRODUCER_TYPES = ["solar", "wind", "hydro"]
+
+
+class ForecastStore:
+    """
+    Stockage des prédictions précalculées après chaque ingestion.
+
+    Les prédictions sont écrites dans un fichier JSON local (et optionnellement
+    copiées dans une table Supabase), avec la version du modèle et la version
+    des données d'entrée. Le fichier est relu uniquement quand il change :
+    une lecture coûte ensuite un simple accès dictionnaire.
+    """
+
+    def __init__(self, path: str = None, max_age: float = None):
+        self.path = path or settings.predictions_store_path
+        self.max_age = settings.predictions_max_age if max_age is None else max_age
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def get(self, producer_type: str) -> Optional[Dict[str, Any]]:
+        """Retourne l'entrée stockée d'un producteur (ou None)."""
+        self._reload_if_changed()
+        return self._records.get(producer_type)
+
+    def get_fresh(
+        self,
+        producer_type: str,
+        model_version: str = None,
+        input_version: str = None,
+        input_probe: str = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Retourne l'entrée stockée si elle est encore valide : calculée avec
+        le modèle actuellement servi, sur les données de prévision actuelles
+        (empreinte complète `input_version` ou sonde légère `input_probe`)
+        et plus récente que `max_age`. Une version inconnue (None) n'est pas
+        vérifiée.
+        """
+        record = self.get(producer_type)
+        if record is None:
+            return None
+
+        if model_version is not None and record["model_version"] != model_version:
+            return None
+
+        # Ingestion sans matérialisation réussie : entrées modifiées depuis
+        if input_version is not None and record["input_version"] != input_version:
+            return None
+        if input_probe is not None and record.get("input_probe") != input_probe:
+            return None
+
+        age = (
+            datetime.now() - datetime.fromisoformat(record["materialized_at"])
+        ).total_seconds()
+        if age > self.max_age:
+            return None
+
+        return record
+
+    def save(self, records: Dict[str, Dict[str, Any]]):
+        """
+        Enregistre les entrées de plusieurs producteurs. Les producteurs absents
+        conservent leur entrée précédente.
+        """
+        with self._lock:
+            self._reload_if_changed()
+            merged = {**self._records, **records}
+
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(merged, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+            self._records = merged
+            self._mtime = os.stat(self.path).st_mtime_ns
+
+        self.logger.info(
+            f"Prédictions stockées dans {self.path}: {', '.join(records) or 'aucune'}"
+        )
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+
+        if mtime == self._mtime:
+            return
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._records = json.load(f)
+            self._mtime = mtime
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Lecture impossible du stock de prédictions: {e}")
+
+
+def materialize_forecasts(
+    predictor=None, store: ForecastStore = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Calcule les prédictions de tous les producteurs et les stocke avec
+    la version du modèle et la version des données d'entrée.
+    À lancer juste après l'ingestion (fetch_all) ou via `main.py predict`.
+    Returns:
+        Dictionnaire {producteur: entrée stockée} des producteurs matérialisés
+    """
+    from .forecast_predictor import ForecastPredictor
+
+    predictor = predictor or ForecastPredictor()
+    store = store or ForecastStore()
+    compute = {
+        "solar": predictor._compute_solar_forecast,
+        "wind": predictor._compute_wind_forecast,
+        "hydro": predictor._compute_hydro_forecast,
+    }
+
+    def materialize(producer_type: str) -> Optional[Dict[str, Any]]:
+        # Sonde prise avant la lecture : une ingestion concurrente la périme
+        input_probe = predictor._read_probe(producer_type)
+        # Une seule lecture des prévisions pour la version et la prédiction
+        rows = predictor._read_inputs(producer_type)
+        input_version, model_version = predictor.get_forecast_version(
+            producer_type, rows
+        )
+        predictions = compute[producer_type](rows)
+        if not predictions:
+            return None
+        return build_record(predictions, model_version, input_version, input_probe)
+
+    results, errors = run_by_producer(
+        {producer: partial(materialize, producer) for producer in PRODUCER_TYPES}
+    )
+    for producer, error in errors.items():
+        logging.error(f"Erreur matérialisation {producer}: {error}")
+
+    records = {producer: record for producer, record in results.items() if record}
+    if records:
+        store.save(records)
+        if settings.predictions_supabase_table:
+            _upload_to_supabase(records)
+
+    skipped = [p for p in PRODUCER_TYPES if p not in records]
+    if skipped:
+        logging.warning(
+            f"Aucune prédiction matérialisée pour: {', '.join(skipped)} "
+            f"(les entrées précédentes sont conservées)"
+        )
+    return records
+
+
+def build_record(
+    predictions: List[Dict[str, Any]],
+    model_version: str,
+    input_version: str,
+    input_probe: str = None,
+) -> Dict[str, Any]:
+    """Construit une entrée du stock de prédictions."""
+    return {
+        "predictions": predictions,
+        "model_version": model_version,
+        "input_version": input_version,
+        "input_probe": input_probe,
+        "materialized_at": datetime.now().isoformat(),
+    }
+
+
+def _upload_to_supabase(records: Dict[str, Dict[str, Any]]):
+    """Copie les prédictions matérialisées dans la table Supabase configurée."""
+    from src.data_ingestion.handlers.etl_supabase import SupabaseHandler
+
+    rows = [
+        {
+            "date": prediction["date"],
+            "producer_type": producer_type,
+            "prediction_kwh": prediction["prediction_kwh"],
+            "model_version": record["model_version"],
+            "input_version": record["input_version"],
+            "materialized_at": record["materialized_at"],
+        }
+        for producer_type, record in records.items()
+        for prediction in record["predictions"]
+    ]
+    try:
+        SupabaseHandler().upsert_dataframe(
+            pd.DataFrame(rows), settings.predictions_supabase_table
+        )
+    except Exception as e:
+        logging.error(f"Erreur upload des prédictions matérialisées: {e}")
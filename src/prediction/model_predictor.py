@@ -1,48 +1,31 @@
-import joblib
 import pandas as pd
 import numpy as np
-import os
 import logging
-from sklearn.preprocessing import StandardScaler
+from src.monitoring.metrics import time_stage
+from .model_registry import ModelRegistry, model_registry
 
 
 class ModelPredictor:
-    def __init__(self, producer_type: str):
+    def __init__(self, producer_type: str, registry: ModelRegistry = None):
         self.producer_type = producer_type
+        self.registry = registry or model_registry
         self.model = None
         self.scaler = None
+        self.model_version = None
         self.logger = logging.getLogger(__name__)
         self._load_model()
 
     def _load_model(self):
         """
-        Charge le modèle et le scaler sauvegardés.
+        Récupère le modèle et le scaler depuis le registre partagé.
+        Le chargement depuis le disque n'a lieu qu'une fois par processus
+        (ou après un ré-entraînement).
         """
         try:
-            models_dir = "src/models/saved"
-
-            # Chercher le meilleur modèle sauvegardé
-            model_files = [
-                f
-                for f in os.listdir(models_dir)
-                if f.startswith(f"{self.producer_type}_") and f.endswith("_model.pkl")
-            ]
-
-            if not model_files:
-                raise FileNotFoundError(
-                    f"Aucun modèle trouvé pour {self.producer_type}"
-                )
-
-            # Prendre le premier modèle trouvé (normalement il n'y en a qu'un de sauvegardé)
-            model_path = os.path.join(models_dir, model_files[0])
-            self.model = joblib.load(model_path)
-            self.logger.info(f"Modèle chargé: {model_files[0]}")
-
-            # Charge le scaler si existant
-            scaler_path = os.path.join(models_dir, f"{self.producer_type}_scaler.pkl")
-            if os.path.exists(scaler_path):
-                self.scaler = joblib.load(scaler_path)
-                self.logger.info(f"Scaler chargé pour {self.producer_type}")
+            artifacts = self.registry.get(self.producer_type)
+            self.model = artifacts.model
+            self.scaler = artifacts.scaler
+            self.model_version = artifacts.version
 
         except Exception as e:
             self.logger.error(
@@ -70,87 +53,89 @@ class ModelPredictor:
         }
         return feature_mapping.get(self.producer_type, [])
 
-    def _validate_features(self, features: dict) -> bool:
-        """Valide que toutes les features requises sont présentes"""
-        expected_features = self._get_expected_features()
-        missing_features = [f for f in expected_features if f not in features]
-
-        if missing_features:
-            self.logger.error(f"Features manquantes: {missing_features}")
-            self.logger.error(f"Features reçues: {list(features.keys())}")
-            self.logger.error(f"Features attendues: {expected_features}")
-            return False
-
-        # Validation des types et valeurs
-        for feature, value in feature.items():
-            if feature in expected_features:
-                try:
-                    # Conversion en float
-                    float_value = float(value)
-                    # Validation des valeurs négatives pour certaines features
-                    if (
-                        feature
-                        in [
-                            "shortwave_radiation_sum_kwh_m2",
-                            "sunshine_duration",
-                            "debit_l_s",
-                        ]
-                        and float_value < 0
-                    ):
-                        self.logger.warning(
-                            f"Valeur négative pour {feature}: {float_value}"
-                        )
-                except (ValueError, TypeError):
-                    self.logger.error(f"Valeur invalide pour {feature}: {value}")
-                    return False
-        return True
-
-    def _prepare_features_dataframe(self, features: dict) -> pd.DataFrame:
-        """
-        Prépare le DataFrame avec les features dans le bon ordre
-        """
-        expected_features = self._get_expected_features()
-
-        # S'assurer que toutes les features sont présentes et dans le bon ordre
-        prepared_features = {}
-        for feature in expected_features:
-            if feature in features:
-                prepared_features[feature] = [float(features[feature])]
-            else:
-                # Si une feature manque (normalement déjà validé), utiliser 0
-                self.logger.warning(f"Feature {feature} manquante, utilisation de 0")
-                prepared_features[feature] = [0.0]
-
-        return pd.DataFrame(prepared_features)
-
     def predict(self, features: dict) -> float:
         """
         Prédit la production à partir des features.
         """
         try:
-            # Conversion en DataFrame
-            feature_df = pd.DataFrame([features])
-
-            self.logger.info(f"Features reçues: {features}")
-            self.logger.info(f"Colonnes du DataFrame: {feature_df.columns.tolist()}")
+            predictions, errors = self.predict_batch([features])
+            if errors:
+                raise ValueError(errors[0])
 
-            # Application du scaler si disponible
-            if self.scaler:
-                feature_df = self.scaler.transform(feature_df)
-
-            # Prédiction
-            prediction = self.model.predict(feature_df)[0]
-
-            # Assurer une prédiction positive
-            prediction = max(0, prediction)
-
-            self.logger.info(f"Prédiction réussie: {prediction:.2f} kWh")
+            prediction = float(predictions[0])
+            self.logger.debug(f"Prédiction réussie: {prediction:.2f} kWh")
             return prediction
 
         except Exception as e:
             self.logger.error(f"Erreur lors de la prédiction: {e}")
             raise
 
+    def predict_batch(self, rows: list) -> tuple:
+        """
+        Prédit la production pour une liste de dictionnaires de features.
+        Returns:
+            Tuple (prédictions, erreurs) - voir predict_frame
+        """
+        return self.predict_frame(pd.DataFrame.from_records(rows))
+
+    def predict_frame(self, df: pd.DataFrame) -> tuple:
+        """
+        Prédit la production pour toutes les lignes d'un DataFrame en un seul
+        appel au scaler et au modèle. Les lignes invalides (feature manquante,
+        non numérique ou infinie) sont écartées sans bloquer les autres.
+        Returns:
+            Tuple (prédictions, erreurs) où prédictions est un np.ndarray aligné
+            sur les lignes d'entrée (NaN pour les lignes en erreur) et erreurs
+            un dictionnaire {index de ligne: message}
+        """
+        expected_features = self._get_expected_features()
+        n_rows = len(df)
+
+        # Matrice de features dans l'ordre attendu par le scaler et le modèle
+        # (tableaux numpy : indépendante de l'index du DataFrame d'entrée)
+        feature_df = pd.DataFrame(
+            {
+                feature: (
+                    pd.to_numeric(df[feature], errors="coerce").to_numpy(float)
+                    if feature in df.columns
+                    else np.full(n_rows, np.nan)
+                )
+                for feature in expected_features
+            },
+            index=range(n_rows),
+            dtype=float,
+        )
+        values = feature_df.to_numpy()
+
+        # Validation vectorisée, messages construits pour les seules lignes en erreur
+        invalid_mask = ~np.isfinite(values)
+        invalid_rows = invalid_mask.any(axis=1)
+        errors = {}
+        for row in np.flatnonzero(invalid_rows):
+            bad_features = [
+                feature
+                for feature, bad in zip(expected_features, invalid_mask[row])
+                if bad
+            ]
+            errors[int(row)] = f"Features manquantes ou invalides: {bad_features}"
+
+        predictions = np.full(n_rows, np.nan)
+        valid_rows = ~invalid_rows
+        if valid_rows.any():
+            X = feature_df[valid_rows]
+            if self.scaler:
+                with time_stage("scaling", self.producer_type):
+                    X = self.scaler.transform(X)
+            # Assurer des prédictions positives
+            with time_stage("model_predict", self.producer_type):
+                predictions[valid_rows] = np.maximum(0, self.model.predict(X))
+
+        self.logger.debug(
+            f"Prédiction par lot {self.producer_type}: "
+            f"{int(valid_rows.sum())}/{n_rows} lignes prédites"
+        )
+        return predictions, errors
+
     def get_model_info(self) -> dict:
         """
         Retourne des informations sur le modèle chargé
@@ -164,4 +149,5 @@ class ModelPredictor:
             "model_type": type(self.model).__name__,
             "expected_features": self._get_expected_features(),
             "has_scaler": self.scaler is not None,
+            "version": self.model_version,
         }
@@ -0,0 +1,276 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import joblib
+
+from src.config.settings import settings
+
+MODELS_DIR = "src/models/saved"
+
+
+class ModelArtifacts:
+    """Modèle et scaler chargés pour un type de producteur."""
+
+    def __init__(
+        self,
+        producer_type: str,
+        model: Any,
+        scaler: Any,
+        model_file: str,
+        version: str,
+        signature: tuple,
+    ):
+        self.producer_type = producer_type
+        self.model = model
+        self.scaler = scaler
+        self.model_file = model_file
+        self.version = version
+        self.signature = signature
+        self.loaded_at = datetime.now()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "loaded": True,
+            "model_type": type(self.model).__name__,
+            "model_file": self.model_file,
+            "has_scaler": self.scaler is not None,
+            "version": self.version,
+            "loaded_at": self.loaded_at.isoformat(),
+        }
+
+
+class ModelRegistry:
+    """
+    Registre des modèles partagé par tout le processus.
+
+    Chaque modèle est chargé une seule fois puis réutilisé par toutes les requêtes.
+    Les fichiers sont surveillés (mtime/taille puis hash du contenu) et rechargés
+    quand un ré-entraînement les remplace. Le remplacement est atomique : tant que
+    les nouveaux artefacts ne sont pas entièrement chargés, les anciens restent servis.
+
+    Quand le manifeste {producteur}_manifest.json existe, seul lui est surveillé :
+    l'entrainement l'écrit en dernier avec les empreintes du modèle et du scaler,
+    et une paire dont les empreintes diffèrent (écriture en cours) n'est pas
+    chargée. Le modèle et son scaler restent ainsi toujours appariés.
+    """
+
+    def __init__(self, models_dir: str = MODELS_DIR, check_interval: float = None):
+        self.models_dir = models_dir
+        self.check_interval = (
+            settings.model_registry_check_interval
+            if check_interval is None
+            else check_interval
+        )
+        self._artifacts: Dict[str, ModelArtifacts] = {}
+        self._last_check: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def get(self, producer_type: str) -> ModelArtifacts:
+        """
+        Retourne les artefacts du producteur, en les (re)chargeant si nécessaire.
+        """
+        artifacts = self._artifacts.get(producer_type)
+        if artifacts is not None and not self._check_due(producer_type):
+            return artifacts
+
+        with self._get_lock(producer_type):
+            # Un autre thread a pu recharger pendant l'attente du verrou
+            artifacts = self._artifacts.get(producer_type)
+            if artifacts is not None and not self._check_due(producer_type):
+                return artifacts
+
+            self._last_check[producer_type] = time.monotonic()
+            return self._refresh(producer_type, artifacts)
+
+    def reload(self, producer_type: str) -> ModelArtifacts:
+        """Force la vérification immédiate des fichiers d'un producteur."""
+        self._last_check.pop(producer_type, None)
+        return self.get(producer_type)
+
+    def status(self, producer_types: list = None) -> Dict[str, Dict[str, Any]]:
+        """Retourne l'état de chargement de chaque modèle."""
+        status = {}
+        for producer_type in producer_types or ["solar", "wind", "hydro"]:
+            try:
+                status[producer_type] = self.get(producer_type).info()
+            except Exception as e:
+                status[producer_type] = {"loaded": False, "error": str(e)}
+        return status
+
+    def _check_due(self, producer_type: str) -> bool:
+        last_check = self._last_check.get(producer_type)
+        return last_check is None or (
+            time.monotonic() - last_check >= self.check_interval
+        )
+
+    def _get_lock(self, producer_type: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(producer_type, threading.Lock())
+
+    def _refresh(
+        self, producer_type: str, current: Optional[ModelArtifacts]
+    ) -> ModelArtifacts:
+        try:
+            signature = self._scan(producer_type)
+        except FileNotFoundError:
+            if current is not None:
+                self.logger.warning(
+                    f"Fichiers du modèle {producer_type} introuvables, "
+                    f"conservation de la version {current.version}"
+                )
+                return current
+            raise
+
+        if current is not None and signature == current.signature:
+            return current
+
+        version = self._hash_files(signature)
+        if current is not None and version == current.version:
+            # Fichiers touchés mais contenu identique : pas de rechargement
+            current.signature = signature
+            return current
+
+        try:
+            artifacts = self._load(producer_type, signature, version)
+        except Exception as e:
+            if current is not None:
+                self.logger.error(
+                    f"Échec du rechargement du modèle {producer_type}: {e}. "
+                    f"Conservation de la version {current.version}"
+                )
+                return current
+            raise
+
+        # Remplacement atomique : les requêtes en cours gardent l'ancienne référence
+        self._artifacts[producer_type] = artifacts
+        if current is None:
+            self.logger.info(
+                f"Modèle {producer_type} chargé: {artifacts.model_file} "
+                f"(version {version})"
+            )
+        else:
+            self.logger.info(
+                f"Modèle {producer_type} rechargé: {artifacts.model_file} "
+                f"(version {current.version} -> {version})"
+            )
+        return artifacts
+
+    def _scan(self, producer_type: str) -> tuple:
+        """
+        Retourne la signature (chemin, mtime, taille) du manifeste, ou à défaut
+        du modèle et du scaler. Sans manifeste, si plusieurs modèles existent
+        pour un producteur, le plus récent est retenu.
+        """
+        manifest_file = manifest_name(producer_type)
+        manifest_path = os.path.join(self.models_dir, manifest_file)
+        if os.path.exists(manifest_path):
+            stat = os.stat(manifest_path)
+            return ((manifest_file, stat.st_mtime_ns, stat.st_size),)
+
+        candidates = []
+        for f in os.listdir(self.models_dir):
+            if f.startswith(f"{producer_type}_") and f.endswith("_model.pkl"):
+                stat = os.stat(os.path.join(self.models_dir, f))
+                candidates.append((stat.st_mtime_ns, f, stat.st_size))
+
+        if not candidates:
+            raise FileNotFoundError(f"Aucun modèle trouvé pour {producer_type}")
+
+        mtime, model_file, size = max(candidates)
+        signature = [(model_file, mtime, size)]
+
+        scaler_file = f"{producer_type}_scaler.pkl"
+        scaler_path = os.path.join(self.models_dir, scaler_file)
+        if os.path.exists(scaler_path):
+            stat = os.stat(scaler_path)
+            signature.append((scaler_file, stat.st_mtime_ns, stat.st_size))
+
+        return tuple(signature)
+
+    def _hash_files(self, signature: tuple) -> str:
+        digest = hashlib.sha256()
+        for file_name, _, _ in signature:
+            digest.update(file_name.encode())
+            with open(os.path.join(self.models_dir, file_name), "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+        return digest.hexdigest()[:12]
+
+    def _load(self, producer_type: str, signature: tuple, version: str):
+        if signature[0][0] == manifest_name(producer_type):
+            return self._load_manifest(producer_type, signature, version)
+
+        model_file = signature[0][0]
+        model = joblib.load(os.path.join(self.models_dir, model_file))
+
+        scaler = None
+        if len(signature) > 1:
+            scaler = joblib.load(os.path.join(self.models_dir, signature[1][0]))
+
+        return ModelArtifacts(
+            producer_type=producer_type,
+            model=model,
+            scaler=scaler,
+            model_file=model_file,
+            version=version,
+            signature=signature,
+        )
+
+    def _load_manifest(self, producer_type: str, signature: tuple, version: str):
+        """
+        Charge la paire modèle/scaler décrite par le manifeste. Chaque fichier
+        est lu une fois : son empreinte est vérifiée sur les octets chargés.
+        """
+        manifest_path = os.path.join(self.models_dir, signature[0][0])
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        artifacts = {}
+        for role in ("model", "scaler"):
+            file_name = manifest.get(f"{role}_file")
+            if file_name is None:
+                artifacts[role] = None
+                continue
+            with open(os.path.join(self.models_dir, file_name), "rb") as f:
+                data = f.read()
+            if hashlib.sha256(data).hexdigest() != manifest["sha256"][file_name]:
+                raise ValueError(
+                    f"{file_name} ne correspond pas au manifeste (écriture en cours)"
+                )
+            artifacts[role] = joblib.load(io.BytesIO(data))
+
+        return ModelArtifacts(
+            producer_type=producer_type,
+            model=artifacts["model"],
+            scaler=artifacts["scaler"],
+            model_file=manifest["model_file"],
+            version=version,
+            signature=signature,
+        )
+
+
+def manifest_name(producer_type: str) -> str:
+    """Nom du manifeste de la paire modèle/scaler d'un producteur."""
+    return f"{producer_type}_manifest.json"
+
+
+def file_sha256(path: str) -> str:
+    """Empreinte SHA-256 d'un fichier, lu par blocs."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Instance unique partagée par le processus
+model_registry = ModelRegistry()
@@ -0,0 +1,60 @@
+"""
+Exécution en parallèle de tâches indépendantes avec un délai global.
+
+Les tâches tournent dans des pools de threads partagés et bornés (un par
+usage) : une tâche hors délai se termine en arrière-plan en occupant un
+thread du pool, au lieu qu'un nouveau pool soit créé à chaque appel.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Tuple
+
+_executors: Dict[Tuple[str, int], ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def shared_executor(pool: str, max_workers: int) -> ThreadPoolExecutor:
+    """Pool de threads partagé (créé au premier appel) pour un usage donné."""
+    key = (pool, max_workers)
+    with _executors_lock:
+        if key not in _executors:
+            _executors[key] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=pool
+            )
+        return _executors[key]
+
+
+def run_concurrently(
+    tasks: Dict[str, Callable[[], Any]],
+    timeout: float,
+    pool: str,
+    max_workers: int,
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Exécute des tâches en parallèle dans un pool partagé.
+    Args:
+        tasks: Dictionnaire {nom: fonction sans argument}
+        timeout: Délai maximal global en secondes
+        pool: Nom du pool partagé (préfixe des threads)
+        max_workers: Taille du pool
+    Returns:
+        Tuple (résultats, erreurs) : une tâche en échec ou hors délai
+        n'a pas de résultat et son erreur est renseignée
+    """
+    executor = shared_executor(pool, max_workers)
+    futures = {name: executor.submit(task) for name, task in tasks.items()}
+    done, not_done = wait(futures.values(), timeout=timeout)
+    # Tâches pas encore démarrées (pool occupé) : abandonnées
+    for future in not_done:
+        future.cancel()
+
+    results, errors = {}, {}
+    for name, future in futures.items():
+        if future not in done:
+            errors[name] = f"Délai dépassé ({timeout}s)"
+        elif future.exception() is not None:
+            errors[name] = str(future.exception())
+        else:
+            results[name] = future.result()
+    return results, errors
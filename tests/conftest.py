@@ -0,0 +1,23 @@
+import os
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import Ridge
+from sklearn.preprocessing import StandardScaler
+from src.prediction.model_registry import ModelRegistry
+from src.prediction.model_predictor import ModelPredictor
+
+
+@pytest.fixture
+def hydro_predictor(tmp_path):
+    """Prédicteur hydro entraîné sur production = 2 * débit."""
+    X = pd.DataFrame({"debit_l_s": np.linspace(0, 100, 50)})
+    y = 2 * X["debit_l_s"]
+    scaler = StandardScaler().fit(X)
+    model = Ridge(alpha=1e-6).fit(scaler.transform(X), y)
+    joblib.dump(model, os.path.join(tmp_path, "hydro_ridge_model.pkl"))
+    joblib.dump(scaler, os.path.join(tmp_path, "hydro_scaler.pkl"))
+
+    registry = ModelRegistry(models_dir=str(tmp_path), check_interval=60)
+    return ModelPredictor("hydro", registry=registry)
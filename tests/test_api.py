@@ -0,0 +1,137 @@
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from src.api.main import app
+from src.prediction.model_predictor import ModelPredictor
+
+
+@pytest.fixture
+def client(hydro_predictor):
+    """Client de test dont les prédicteurs utilisent un registre temporaire."""
+    registry = hydro_predictor.registry
+    with patch(
+        "src.api.main.ModelPredictor",
+        side_effect=lambda producer_type: ModelPredictor(producer_type, registry),
+    ):
+        yield TestClient(app)
+
+
+def test_status(client):
+    """Test l'endpoint de statut."""
+    response = client.get("/status")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "Ok"
+
+
+def test_predict_batch_rows(client):
+    """Test la prédiction par lot en lignes avec une ligne invalide."""
+    response = client.post(
+        "/predict/hydro/batch",
+        json={"rows": [{"debit_l_s": 10.0}, {"debit_l_s": "abc"}]},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 2
+    assert body["success_count"] == 1
+    assert body["predictions"][1] is None
+    assert body["errors"][0]["index"] == 1
+    assert body["status"] == "partial"
+
+
+def test_predict_batch_columns(client):
+    """Test la prédiction par lot en colonnes."""
+    response = client.post(
+        "/predict/hydro/batch", json={"columns": {"debit_l_s": [10.0, 20.0, 30.0]}}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success_count"] == 3
+    assert body["status"] == "success"
+
+
+def test_predict_batch_invalid_payload(client):
+    """Test le rejet d'un lot sans rows ni columns."""
+    response = client.post("/predict/hydro/batch", json={})
+
+    assert response.status_code == 422
+
+
+def test_predict_batch_unknown_producer(client):
+    """Test le rejet d'un type de producteur inconnu."""
+    response = client.post("/predict/geothermal/batch", json={"rows": []})
+
+    assert response.status_code == 422
+
+
+def test_predict_hydro(client):
+    """Test la prédiction unitaire exécutée hors de la boucle d'événements."""
+    response = client.post("/predict/hydro", json={"debit_l_s": 10.0})
+
+    assert response.status_code == 200
+    assert response.json()["prediction_kwh"] == pytest.approx(20.0, rel=1e-2)
+
+
+def test_forecast_solar(client):
+    """Test l'endpoint de prévisions solaires avec un prédicteur simulé."""
+    with patch("src.api.main.get_forecast_predictor") as mock_get_predictor:
+        mock_get_predictor.return_value.predict_solar_forecast.return_value = [
+            {"date": "2024-01-01", "prediction_kwh": 120.5}
+        ]
+        response = client.get("/forecast/solar")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["producer_type"] == "solar"
+    assert body["forecast_days"] == 1
+    assert "timestamp" in body
+
+
+def test_metrics_endpoint(client):
+    """Test l'exposition des métriques par route et par étape."""
+    client.post("/predict/hydro/batch", json={"rows": [{"debit_l_s": 10.0}]})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'enr_http_requests_total{method="POST",route="/predict/{producer_type}/batch",status="200"}'
+        in response.text
+    )
+    assert 'enr_stage_duration_seconds_count{stage="model_predict",producer="hydro"}' in (
+        response.text
+    )
+    assert 'stage="serialization"' in response.text
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+@pytest.mark.parametrize("fast_json", [False, True])
+def test_forecast_all_compressed(client, encoding, fast_json):
+    """Test la compression négociée et l'encodeur rapide sur /forecast/all."""
+    predictions = [
+        {"date": f"2024-01-{day:02d}", "prediction_kwh": 100.0 + day, "features": {}}
+        for day in range(1, 31)
+    ]
+    with (
+        patch("src.api.main.get_forecast_predictor") as mock_get_predictor,
+        patch("src.api.utils.settings.api_fast_json", fast_json),
+    ):
+        mock_get_predictor.return_value.predict_all_forecasts.return_value = {
+            "solar": predictions,
+            "summary": {"total_predictions": len(predictions)},
+        }
+        response = client.get("/forecast/all", headers={"Accept-Encoding": encoding})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == encoding
+    assert response.json()["solar"] == predictions
+
+
+def test_small_response_not_compressed(client):
+    """Test qu'une petite réponse n'est pas compressée."""
+    response = client.get("/status", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,82 @@
+import pytest
+import pandas as pd
+from src.data_ingestion.fetchers.archive_backfill import (
+    fetch_archive_chunked,
+    split_calendar_chunks,
+)
+
+
+def _fake_chunk(calls):
+    """Fonction de téléchargement simulée : une ligne par jour du morceau."""
+
+    def fetch(start_date, end_date):
+        calls.append((start_date, end_date))
+        dates = pd.date_range(start_date, end_date, freq="D")
+        return pd.DataFrame({"time": dates, "value": range(len(dates))})
+
+    return fetch
+
+
+def test_split_calendar_chunks():
+    """Test le découpage aux limites d'année et de mois."""
+    assert split_calendar_chunks("2016-09-01", "2018-02-10", "year") == [
+        ("2016-09-01", "2016-12-31"),
+        ("2017-01-01", "2017-12-31"),
+        ("2018-01-01", "2018-02-10"),
+    ]
+    assert split_calendar_chunks("2023-11-15", "2024-01-05", "month") == [
+        ("2023-11-15", "2023-11-30"),
+        ("2023-12-01", "2023-12-31"),
+        ("2024-01-01", "2024-01-05"),
+    ]
+
+
+def test_fetch_archive_chunked_merges_in_date_order(tmp_path):
+    """Test la fusion ordonnée des morceaux téléchargés en parallèle."""
+    calls = []
+
+    df = fetch_archive_chunked(
+        _fake_chunk(calls), "test", "2016-09-01", "2018-02-10", "year", 3, tmp_path
+    )
+
+    assert len(calls) == 3
+    assert df["time"].is_monotonic_increasing
+    assert df["time"].iloc[0] == pd.Timestamp("2016-09-01")
+    assert df["time"].iloc[-1] == pd.Timestamp("2018-02-10")
+    assert len(df) == len(pd.date_range("2016-09-01", "2018-02-10"))
+
+
+def test_fetch_archive_chunked_resumes_from_checkpoints(tmp_path):
+    """Test qu'une reprise ne retélécharge que les morceaux manquants."""
+    calls = []
+    failing_chunk = ("2017-01-01", "2017-12-31")
+
+    def flaky(start_date, end_date):
+        if (start_date, end_date) == failing_chunk:
+            raise ConnectionError("coupure réseau")
+        return _fake_chunk(calls)(start_date, end_date)
+
+    with pytest.raises(ConnectionError):
+        fetch_archive_chunked(
+            flaky, "test", "2016-09-01", "2018-02-10", "year", 3, tmp_path
+        )
+
+    calls.clear()
+    df = fetch_archive_chunked(
+        _fake_chunk(calls), "test", "2016-09-01", "2018-02-10", "year", 3, tmp_path
+    )
+
+    assert calls == [failing_chunk]
+    assert len(df) == len(pd.date_range("2016-09-01", "2018-02-10"))
+
+
+def test_fetch_archive_chunked_short_range_single_call(tmp_path):
+    """Test qu'une période courte (incrémentale) fait un seul appel sans reprise."""
+    calls = []
+
+    fetch_archive_chunked(
+        _fake_chunk(calls), "test", "2024-06-01", "2024-06-10", "year", 3, tmp_path
+    )
+
+    assert calls == [("2024-06-01", "2024-06-10")]
+    assert not any(tmp_path.iterdir())
@@ -0,0 +1,27 @@
+import gzip
+import zlib
+from src.api.compression import compress, negotiate_encoding
+
+
+def test_negotiate_encoding_prefers_gzip():
+    """Test la préférence gzip à qualité égale."""
+    assert negotiate_encoding("deflate, gzip") == "gzip"
+    assert negotiate_encoding("gzip, deflate, br") == "gzip"
+
+
+def test_negotiate_encoding_quality_values():
+    """Test le respect des valeurs q."""
+    assert negotiate_encoding("gzip;q=0.5, deflate") == "deflate"
+    assert negotiate_encoding("gzip;q=0, deflate;q=0") is None
+    assert negotiate_encoding("*") == "gzip"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+
+
+def test_compress_round_trip():
+    """Test que les deux encodages se décompressent à l'identique."""
+    body = b'{"prediction_kwh": 120.5}' * 100
+
+    assert gzip.decompress(compress(body, "gzip")) == body
+    assert zlib.decompress(compress(body, "deflate")) == body
+    assert compress(body, "gzip") == compress(body, "gzip")
@@ -0,0 +1,38 @@
+import threading
+import time
+from src.utils.concurrency import run_concurrently, shared_executor
+
+
+def test_run_concurrently_results_and_errors():
+    """Test les résultats, erreurs et délais dépassés par tâche."""
+
+    def failing():
+        raise RuntimeError("indisponible")
+
+    results, errors = run_concurrently(
+        {"ok": lambda: 1, "failing": failing, "slow": lambda: time.sleep(1)},
+        timeout=0.2,
+        pool="test-errors",
+        max_workers=3,
+    )
+
+    assert results == {"ok": 1}
+    assert errors["failing"] == "indisponible"
+    assert "Délai" in errors["slow"]
+
+
+def test_timed_out_tasks_do_not_pile_up_threads():
+    """Test que des appels successifs hors délai réutilisent le même pool borné."""
+    release = threading.Event()
+
+    for _ in range(5):
+        _, errors = run_concurrently(
+            {"blocked": release.wait}, timeout=0.05, pool="test-bounded", max_workers=2
+        )
+        assert "blocked" in errors
+
+    threads = [t for t in threading.enumerate() if t.name.startswith("test-bounded")]
+    release.set()
+
+    assert shared_executor("test-bounded", 2) is shared_executor("test-bounded", 2)
+    assert len(threads) <= 2
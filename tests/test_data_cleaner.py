@@ -34,3 +34,48 @@ def test_prepare_solar_data_raw():
 
     assert not df_raw.empty
     assert "shortwave_radiation_sum" in df_raw.columns
+
+
+def test_derive_solar_data_single_pass():
+    """Test que la dérivation en une passe donne les mêmes tables raw et clean."""
+    df_input = pd.DataFrame(
+        {
+            "time": ["2024-01-01", "2024-01-02", "2024-01-02"],
+            "temperature_2m_max": [15.0, np.nan, 16.0],
+            "shortwave_radiation_sum": [15.5, 16.2, 16.2],
+        }
+    )
+    snapshot = df_input.copy()
+
+    df_raw, df_clean = DataCleaner.derive_solar_data(df_input)
+
+    pd.testing.assert_frame_equal(df_raw, DataCleaner.prepare_solar_data_raw(df_input))
+    pd.testing.assert_frame_equal(df_clean, DataCleaner.clean_solar_data(df_input))
+    # La réponse API et la version raw ne sont pas modifiées par le nettoyage
+    pd.testing.assert_frame_equal(df_input, snapshot)
+    assert "shortwave_radiation_sum" in df_raw.columns
+    assert df_raw["temperature_2m_max"].isna().sum() == 1
+
+
+def test_derive_wind_and_hydro_data_single_pass():
+    """Test la dérivation en une passe des données éoliennes et Hub'Eau."""
+    df_wind = pd.DataFrame(
+        {"time": ["2024-01-01", "invalide"], "wind_speed_10m_max": [12.0, 200.0]}
+    )
+    wind_raw, wind_clean = DataCleaner.derive_wind_data(df_wind)
+    pd.testing.assert_frame_equal(wind_raw, DataCleaner.prepare_wind_data_raw(df_wind))
+    pd.testing.assert_frame_equal(wind_clean, DataCleaner.clean_wind_data(df_wind))
+
+    df_hydro = pd.DataFrame(
+        {
+            "code_station": ["Y321002101"] * 2,
+            "date_obs_elab": ["2024-01-01", "2024-01-02"],
+            "resultat_obs_elab": [1500.0, -1.0],
+        }
+    )
+    hydro_raw, hydro_clean = DataCleaner.derive_hydro_data(df_hydro)
+    pd.testing.assert_frame_equal(
+        hydro_raw, DataCleaner.prepare_hydro_data_raw(df_hydro)
+    )
+    pd.testing.assert_frame_equal(hydro_clean, DataCleaner.clean_hydro_data(df_hydro))
+    assert list(hydro_clean["debit_l_s"]) == [1500.0]
@@ -0,0 +1,133 @@
+import pandas as pd
+from unittest.mock import Mock, patch
+from src.models.data_loarder import SupabaseDataLoader
+from src.models.training_snapshot import TrainingSnapshotStore
+
+
+class FakeTable:
+    """Table PostgREST simulée : sélection, tri par date et plages."""
+
+    def __init__(self, rows, max_rows=None, with_count=True):
+        self.rows = rows
+        self.max_rows = max_rows
+        self.with_count = with_count
+        self.selects = []
+        self.ranges = []
+        self.filters = []
+
+    def select(self, *columns, count=None):
+        self.selects.append(columns)
+        self._columns, self._count, self._since = columns, count, None
+        return self
+
+    def gte(self, column, value):
+        self.filters.append((column, value))
+        self._since = value
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, first, last):
+        self.ranges.append((first, last))
+        if self.max_rows:
+            last = min(last, first + self.max_rows - 1)
+        rows = [
+            row for row in self.rows if not self._since or row["date"] >= self._since
+        ]
+        data = [
+            {column: row[column] for column in self._columns}
+            for row in rows[first : last + 1]
+        ]
+        count = len(rows) if self._count and self.with_count else None
+        return Mock(execute=Mock(return_value=Mock(data=data, count=count)))
+
+
+def _loader(tables, page_size=2, snapshots=None):
+    with patch("src.models.data_loarder.create_client") as mock_client:
+        mock_client.return_value.table.side_effect = lambda name: tables[name]
+        return SupabaseDataLoader(
+            page_size=page_size,
+            max_workers=3,
+            snapshots=snapshots,
+            use_snapshots=snapshots is not None,
+        )
+
+
+def _weather_rows(n):
+    return [
+        {"date": f"2024-01-{day:02d}", "debit_l_s": float(day), "code_site": "X"}
+        for day in range(1, n + 1)
+    ]
+
+
+def test_load_training_data_paginates_projected_columns():
+    """Test la lecture complète page par page des seules colonnes utiles."""
+    weather = FakeTable(_weather_rows(7))
+    production = FakeTable(
+        [
+            {"date": f"2024-01-{day:02d}", "production_kwh": day * 10}
+            for day in range(1, 6)
+        ]
+    )
+    loader = _loader({"clean_hubeau": weather, "clean_prod_hydro": production})
+
+    df = loader.load_training_data("hydro")
+
+    assert weather.selects[0] == ("date", "debit_l_s")
+    assert production.selects[0] == ("date", "production_kwh")
+    assert sorted(weather.ranges) == [(0, 1), (2, 3), (4, 5), (6, 7)]
+    assert list(df.columns) == ["date", "debit_l_s", "production_kwh"]
+    assert len(df) == 5
+    assert pd.api.types.is_datetime64_any_dtype(df["date"])
+
+
+def test_fetch_table_adapts_to_server_row_cap():
+    """Test qu'un plafond de lignes du serveur ne laisse pas de trous."""
+    table = FakeTable(_weather_rows(7), max_rows=3)
+    loader = _loader({"clean_hubeau": table}, page_size=5)
+
+    df = loader.fetch_table("clean_hubeau", ["date", "debit_l_s"])
+
+    assert list(df["debit_l_s"]) == [float(day) for day in range(1, 8)]
+
+
+def test_fetch_table_without_count():
+    """Test la lecture séquentielle quand le nombre total est inconnu."""
+    table = FakeTable(_weather_rows(5), with_count=False)
+    loader = _loader({"clean_hubeau": table})
+
+    df = loader.fetch_table("clean_hubeau", ["date", "debit_l_s"])
+
+    assert len(df) == 5
+    assert table.ranges == [(0, 1), (2, 3), (4, 5)]
+
+
+def test_load_table_refreshes_snapshot_incrementally(tmp_path):
+    """Test que seules les lignes récentes sont relues après un premier chargement."""
+    table = FakeTable(_weather_rows(20))
+    store = TrainingSnapshotStore(str(tmp_path))
+    loader = _loader({"clean_hubeau": table}, page_size=50, snapshots=store)
+    columns = ["date", "debit_l_s"]
+
+    first = loader.load_table("clean_hubeau", columns)
+    assert len(first) == 20
+    assert table.filters == []
+
+    # Nouvelle journée et révision d'une journée récente côté Supabase
+    table.rows = _weather_rows(21)
+    table.rows[18]["debit_l_s"] = 99.0
+
+    second = loader.load_table("clean_hubeau", columns)
+
+    # Recouvrement de 7 jours avant la dernière date de l'instantané
+    assert table.filters == [("date", "2024-01-13")]
+    assert len(second) == 21
+    assert second["date"].is_unique
+    assert second.loc[18, "debit_l_s"] == 99.0
+    assert store.read("clean_hubeau", columns)[1]["rows"] == 21
+
+    # Rechargement complet sur demande
+    loader.load_table("clean_hubeau", columns, full_refresh=True)
+    assert table.filters[-1] == ("date", "2024-01-13")
+    assert len(table.filters) == 1
@@ -1,9 +1,16 @@
+import json
 import pytest
+import numpy as np
 import pandas as pd
 from unittest.mock import Mock, patch
 from src.data_ingestion.handlers.etl_supabase import (
     SupabaseHandler,
     DataUploader,
+    RowHashIndex,
+    encode_json,
+    estimate_row_bytes,
+    frame_to_json_columns,
+    iter_record_batches,
 )
 
 
@@ -69,3 +76,213 @@ def test_data_uploader_upload_clean_dataset(mock_supabase_handler):
     uploader.upload_clean_dataset(df, "test_dataset")
 
     mock_instance.upsert_dataframe.assert_called_once()
+
+
+@patch("src.data_ingestion.handlers.etl_supabase.create_client")
+def test_upsert_dataframe_in_batches(mock_client):
+    """Test l'envoi par lots et le résumé retourné."""
+    mock_supabase = Mock()
+    mock_client.return_value = mock_supabase
+
+    handler = SupabaseHandler()
+    df = pd.DataFrame({"date": pd.date_range("2024-01-01", periods=5), "value": range(5)})
+
+    summary = handler.upsert_dataframe(df, "test_table", batch_size=2, max_workers=2)
+
+    upsert = mock_supabase.table.return_value.upsert
+    assert upsert.call_count == 3
+    assert sorted(len(call.args[0]) for call in upsert.call_args_list) == [1, 2, 2]
+    assert summary["rows_sent"] == 5
+    assert summary["batches"] == 3
+    assert summary["failed_batches"] == 0
+    assert summary["bytes"] > 0
+
+
+@patch("src.data_ingestion.handlers.etl_supabase.time.sleep")
+@patch("src.data_ingestion.handlers.etl_supabase.create_client")
+def test_upsert_dataframe_retries_failed_batch(mock_client, mock_sleep):
+    """Test la nouvelle tentative avec backoff exponentiel d'un lot en échec."""
+    mock_supabase = Mock()
+    mock_client.return_value = mock_supabase
+    mock_supabase.table.return_value.upsert.return_value.execute.side_effect = [
+        TimeoutError("délai dépassé"),
+        TimeoutError("délai dépassé"),
+        None,
+    ]
+
+    handler = SupabaseHandler()
+    summary = handler.upsert_dataframe(pd.DataFrame({"value": [1]}), "test_table")
+
+    assert summary["rows_sent"] == 1
+    delays = [call.args[0] for call in mock_sleep.call_args_list]
+    assert delays[1] == 2 * delays[0]
+
+
+@patch("src.data_ingestion.handlers.etl_supabase.time.sleep")
+@patch("src.data_ingestion.handlers.etl_supabase.create_client")
+def test_upsert_dataframe_reports_failed_batches(mock_client, mock_sleep):
+    """Test qu'un lot définitivement en échec est compté sans bloquer les autres."""
+    mock_supabase = Mock()
+    mock_client.return_value = mock_supabase
+
+    def execute_for(batch):
+        result = Mock()
+        if batch[0]["value"] == 0:
+            result.execute.side_effect = ConnectionError("refusé")
+        return result
+
+    mock_supabase.table.return_value.upsert.side_effect = execute_for
+
+    handler = SupabaseHandler()
+    summary = handler.upsert_dataframe(
+        pd.DataFrame({"value": range(4)}), "test_table", batch_size=2
+    )
+
+    assert summary["failed_batches"] == 1
+    assert summary["rows_sent"] == 2
+
+
+@patch("src.data_ingestion.handlers.etl_supabase.frame_to_json_columns")
+@patch("src.data_ingestion.handlers.etl_supabase.create_client")
+def test_upsert_dataframe_reports_conversion_failure(mock_client, mock_convert):
+    """Test qu'une conversion impossible est signalée comme un envoi en échec."""
+    mock_convert.side_effect = ValueError("conversion")
+
+    summary = SupabaseHandler().upsert_dataframe(
+        pd.DataFrame({"value": [1, 2]}), "test_table"
+    )
+
+    assert summary["failed_batches"] == 1
+    assert summary["rows_sent"] == 0
+    assert summary["error"] == "conversion"
+    mock_client.return_value.table.assert_not_called()
+
+
+def test_frame_to_json_columns_converts_dates_and_missing_values():
+    """Test la conversion colonne par colonne : dates en texte, NaN/NaT en null."""
+    df = pd.DataFrame(
+        {
+            "date": ["2024-01-01", "2024-01-02", "2024-01-03"],
+            "horodatage": pd.to_datetime(["2024-01-01 06:30", None, "2024-01-03 00:00"]),
+            "value": [1.5, np.nan, 3.0],
+            "count": [1, 2, 3],
+            "label": ["a", None, "c"],
+        }
+    )
+
+    columns = frame_to_json_columns(df)
+    records = next(iter_record_batches(columns, len(df), batch_size=10))
+
+    assert records[0] == {
+        "date": "2024-01-01",
+        "horodatage": "2024-01-01 06:30:00",
+        "value": 1.5,
+        "count": 1,
+        "label": "a",
+    }
+    assert records[1]["horodatage"] is None
+    assert records[1]["value"] is None
+    assert records[1]["label"] is None
+    # Scalaires Python : sérialisables par json sans encodeur spécifique
+    assert type(records[2]["count"]) is int
+    json.dumps(records, allow_nan=False)
+
+
+def test_estimate_row_bytes_matches_encoded_size():
+    """Test l'estimation de la taille JSON sans encoder toutes les lignes."""
+    df = pd.DataFrame(
+        {
+            "date": pd.date_range("2024-01-01", periods=1000),
+            "value": np.arange(1000.0),
+        }
+    )
+    columns = frame_to_json_columns(df)
+    encoded = encode_json(next(iter_record_batches(columns, len(df), len(df))))
+
+    estimate = estimate_row_bytes(columns, len(df)) * len(df)
+
+    assert estimate == pytest.approx(len(encoded), rel=0.05)
+    assert estimate_row_bytes({}, 0) == 0.0
+
+
+def test_data_uploader_skips_unchanged_rows(tmp_path):
+    """Test que seules les lignes nouvelles ou modifiées sont renvoyées."""
+    handler = Mock()
+    handler.upsert_dataframe.side_effect = lambda df, table: {
+        "table": table,
+        "rows": len(df),
+        "rows_sent": len(df),
+        "failed_batches": 0,
+    }
+    uploader = DataUploader(
+        handler, skip_unchanged=True, hash_index=RowHashIndex(str(tmp_path))
+    )
+    df = pd.DataFrame(
+        {"date": ["2024-01-01", "2024-01-02", "2024-01-03"], "value": [1.0, 2.0, 3.0]}
+    )
+    uploader.upload_clean_dataset(df, "solar_history")
+
+    # Un jour modifié, un jour ajouté
+    df_next = pd.DataFrame(
+        {
+            "date": ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"],
+            "value": [1.0, 2.5, 3.0, 4.0],
+        }
+    )
+    summary = uploader.upload_clean_dataset(df_next, "solar_history")
+
+    sent = handler.upsert_dataframe.call_args.args[0]
+    assert sent["date"].tolist() == ["2024-01-02", "2024-01-04"]
+    assert summary["skipped_rows"] == 2
+    assert uploader.stats["clean_solar_history"]["skipped_rows"] == 2
+
+
+def test_data_uploader_resends_after_failed_batches(tmp_path):
+    """Test que l'index n'est pas mis à jour si un lot a échoué."""
+    handler = Mock()
+    handler.upsert_dataframe.return_value = {"failed_batches": 1}
+    uploader = DataUploader(
+        handler, skip_unchanged=True, hash_index=RowHashIndex(str(tmp_path))
+    )
+    df = pd.DataFrame({"date": ["2024-01-01"], "value": [1.0]})
+
+    uploader.upload_raw_dataset(df, "hubeau")
+    uploader.upload_raw_dataset(df, "hubeau")
+
+    assert handler.upsert_dataframe.call_count == 2
+    assert len(handler.upsert_dataframe.call_args.args[0]) == 1
+
+
+@patch("src.data_ingestion.handlers.etl_supabase.frame_to_json_columns")
+@patch("src.data_ingestion.handlers.etl_supabase.create_client")
+def test_data_uploader_resends_after_conversion_failure(
+    mock_client, mock_convert, tmp_path
+):
+    """Test que des lignes jamais envoyées ne sont pas indexées comme inchangées."""
+    mock_convert.side_effect = ValueError("conversion")
+    uploader = DataUploader(
+        SupabaseHandler(), skip_unchanged=True, hash_index=RowHashIndex(str(tmp_path))
+    )
+    df = pd.DataFrame(
+        {"date": ["2024-01-01", "2024-01-02", "2024-01-03"], "value": [1.0, 2.0, 3.0]}
+    )
+
+    first = uploader.upload_raw_dataset(df, "hubeau")
+    second = uploader.upload_raw_dataset(df, "hubeau")
+
+    assert first["failed_batches"] == 1
+    # Les 3 lignes sont renvoyées, aucune n'est ignorée comme inchangée
+    assert second["skipped_rows"] == 0
+    assert len(mock_convert.call_args.args[0]) == 3
+
+
+def test_row_hash_index_retain(tmp_path):
+    """Test que retain oublie les lignes supprimées de la table."""
+    index = RowHashIndex(str(tmp_path))
+    index.update("raw_solar_forecast", {"2024-06-01": "a", "2024-06-02": "b"})
+
+    index.retain(
+        "raw_solar_forecast", pd.DataFrame({"date": ["2024-06-02", "2024-06-03"]})
+    )
+
+    assert RowHashIndex(str(tmp_path)).get("raw_solar_forecast") == {"2024-06-02": "b"}
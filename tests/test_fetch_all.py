@@ -1,7 +1,26 @@
 import pytest
+import threading
+import time
 import pandas as pd
 from unittest.mock import patch, Mock
-from src.data_ingestion.fetchers.fetch_all import fetch_all
+from src.data_ingestion.handlers.handler_hubeau import HubeauDataHandler
+from src.data_ingestion.fetchers.fetch_all import (
+    fetch_all,
+    fetch_sources,
+    incremental_start_date,
+    prune_forecast_table,
+    upload_succeeded,
+)
+
+
+def _handler_with_latest(latest):
+    """SupabaseHandler simulé dont la dernière date en base est `latest`."""
+    handler = Mock()
+    query = handler.supabase.table.return_value.select.return_value
+    query.order.return_value.limit.return_value.execute.return_value = Mock(
+        data=[{"date": latest}] if latest else []
+    )
+    return handler
 
 
 @patch("src.data_ingestion.fetchers.fetch_all.SupabaseHandler")
@@ -33,25 +52,22 @@ def test_fetch_all_success(
     mock_solar_instance = Mock()
     mock_wind_instance = Mock()
 
-    # Configurer les retours pour load()
-    mock_solar_instance.load.side_effect = [
-        pd.DataFrame({"date": ["2024-01-01"], "solar_forecast": [1]}),
-        pd.DataFrame({"date": ["2024-01-01"], "solar_history": [3]}),
-    ]
-    mock_wind_instance.load.side_effect = [
-        pd.DataFrame({"date": ["2024-01-01"], "wind_forecast": [5]}),
-        pd.DataFrame({"date": ["2024-01-01"], "wind_history": [7]}),
-    ]
+    # Configurer les réponses brutes de l'API pour fetch()
+    mock_solar_instance.fetch.return_value = pd.DataFrame(
+        {"time": ["2024-01-01"], "shortwave_radiation_sum": [10.0]}
+    )
+    mock_wind_instance.fetch.return_value = pd.DataFrame(
+        {"time": ["2024-01-01"], "wind_speed_10m_max": [5.0]}
+    )
 
     mock_weather_handler.side_effect = [mock_solar_instance, mock_wind_instance]
 
-    # Mock HubeauDataHandler
-    mock_hubeau_instance = Mock()
-    mock_hubeau_instance.load.return_value = pd.DataFrame(
-        {"date": ["2024-01-01"], "hubeau_data": [9]}
-    )
-    mock_hubeau_instance.clean.return_value = None
-    mock_hubeau_handler.return_value = mock_hubeau_instance
+    # HubeauDataHandler réel, deux pages Hub'Eau simulées
+    mock_hubeau_handler.side_effect = HubeauDataHandler
+    pages = [
+        pd.DataFrame({"date_obs_elab": [f"2024-01-0{day}"], "resultat_obs_elab": [9]})
+        for day in (1, 2)
+    ]
 
     # Mock pandas.read_csv
     mock_read_csv.return_value = pd.DataFrame(
@@ -59,7 +75,11 @@ def test_fetch_all_success(
     )
 
     # Appel de la fonction
-    result = fetch_all()
+    with patch(
+        "src.data_ingestion.handlers.handler_hubeau.iter_hubeau_data",
+        return_value=iter(pages),
+    ):
+        result = fetch_all()
 
     # VÉRIFICATIONS CORRIGÉES
     assert isinstance(result, dict)
@@ -76,6 +96,32 @@ def test_fetch_all_success(
     assert mock_uploader_instance.upload_raw_dataset.call_count >= 1
     assert mock_uploader_instance.upload_clean_dataset.call_count >= 1
 
+    # Raw et clean dérivés de la réponse brute, sans second nettoyage
+    raw = {
+        call.args[1]: call.args[0]
+        for call in mock_uploader_instance.upload_raw_dataset.call_args_list
+    }
+    clean = {
+        call.args[1]: call.args[0]
+        for call in mock_uploader_instance.upload_clean_dataset.call_args_list
+    }
+    assert raw["solar_history"]["shortwave_radiation_sum"].iloc[0] == 10.0
+    assert clean["solar_history"]["shortwave_radiation_sum_kwh_m2"].iloc[
+        0
+    ] == pytest.approx(2.7778)
+    assert "debit_l_s" in clean["hubeau"].columns
+    assert "date_obs_elab" in raw["hubeau"].columns
+    mock_solar_instance.load.assert_not_called()
+
+    # Hub'Eau envoyé page par page, table clean complète retournée
+    hubeau_uploads = [
+        call.args[0]
+        for call in mock_uploader_instance.upload_clean_dataset.call_args_list
+        if call.args[1] == "hubeau"
+    ]
+    assert [len(df) for df in hubeau_uploads] == [1, 1]
+    assert len(result["hubeau"]) == 2
+
 
 @patch("src.data_ingestion.fetchers.fetch_all.SupabaseHandler")
 @patch("src.data_ingestion.fetchers.fetch_all.WeatherDataHandler")
@@ -103,12 +149,12 @@ def test_fetch_all_with_empty_data(
     # Mock handlers avec données vides
     mock_solar_instance = Mock()
     mock_wind_instance = Mock()
-    mock_solar_instance.load.return_value = pd.DataFrame()
-    mock_wind_instance.load.return_value = pd.DataFrame()
+    mock_solar_instance.fetch.return_value = pd.DataFrame()
+    mock_wind_instance.fetch.return_value = pd.DataFrame()
     mock_weather_handler.side_effect = [mock_solar_instance, mock_wind_instance]
 
     mock_hubeau_instance = Mock()
-    mock_hubeau_instance.load.return_value = pd.DataFrame()
+    mock_hubeau_instance.stream.return_value = pd.DataFrame()
     mock_hubeau_handler.return_value = mock_hubeau_instance
 
     # Appel de la fonction
@@ -119,3 +165,159 @@ def test_fetch_all_with_empty_data(
     assert result["hubeau"].empty
     assert result["solar_forecast"].empty
     assert result["solar_history"].empty
+
+
+def test_fetch_sources_runs_concurrently():
+    """Test que les sources sont téléchargées en parallèle."""
+    barrier = threading.Barrier(3, timeout=5)
+
+    def source():
+        # Ne passe la barrière que si les trois sources tournent en même temps
+        barrier.wait()
+        return pd.DataFrame({"date": ["2024-01-01"]})
+
+    results = fetch_sources({"a": source, "b": source, "c": source}, max_workers=3)
+
+    assert all(len(df) == 1 for df in results.values())
+
+
+def test_fetch_sources_isolates_failures():
+    """Test qu'une source en échec ou hors délai n'empêche pas les autres."""
+
+    def failing():
+        raise ConnectionError("API indisponible")
+
+    def slow():
+        time.sleep(1)
+        return pd.DataFrame({"date": ["2024-01-01"]})
+
+    results = fetch_sources(
+        {
+            "ok": lambda: pd.DataFrame({"date": ["2024-01-01"]}),
+            "failing": failing,
+            "slow": slow,
+        },
+        timeout=0.2,
+    )
+
+    assert len(results["ok"]) == 1
+    assert results["failing"].empty
+    assert results["slow"].empty
+
+
+def test_incremental_start_date_uses_high_water_mark():
+    """Test le départ à la dernière date en base moins le recouvrement."""
+    handler = _handler_with_latest("2024-06-10 00:00:00")
+
+    start = incremental_start_date(
+        handler, "clean_solar_history", "2016-09-01", overlap_days=7
+    )
+
+    assert start == "2024-06-03"
+    handler.supabase.table.assert_called_with("clean_solar_history")
+
+
+def test_incremental_start_date_empty_table_or_full_backfill():
+    """Test le chargement complet si la table est vide ou sur demande."""
+    assert (
+        incremental_start_date(_handler_with_latest(None), "clean_hubeau", "2022-07-01")
+        == "2022-07-01"
+    )
+    assert (
+        incremental_start_date(
+            _handler_with_latest("2024-06-10"),
+            "clean_hubeau",
+            "2022-07-01",
+            full_backfill=True,
+        )
+        == "2022-07-01"
+    )
+
+
+def test_incremental_start_date_not_before_default_start():
+    """Test que le recouvrement ne remonte pas avant la date de début."""
+    handler = _handler_with_latest("2022-07-03")
+
+    assert (
+        incremental_start_date(handler, "clean_hubeau", "2022-07-01", overlap_days=7)
+        == "2022-07-01"
+    )
+
+
+def test_prune_forecast_table_single_request():
+    """Test l'élagage des dates hors fenêtre en une seule requête."""
+    handler = Mock()
+    df = pd.DataFrame({"date": pd.to_datetime(["2024-06-03", "2024-06-01"])})
+
+    assert prune_forecast_table(handler, "clean_solar_forecast", df)
+
+    handler.supabase.table.assert_called_once_with("clean_solar_forecast")
+    delete = handler.supabase.table.return_value.delete.return_value
+    delete.or_.assert_called_once_with("date.lt.2024-06-01,date.gt.2024-06-03")
+    delete.or_.return_value.execute.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "summary, expected",
+    [
+        ({"rows": 3, "rows_sent": 3, "failed_batches": 0}, True),
+        # Toutes les lignes inchangées : la fenêtre est déjà en base
+        ({"rows": 0, "rows_sent": 0, "failed_batches": 0, "skipped_rows": 3}, True),
+        ({"rows": 3, "rows_sent": 0, "failed_batches": 1, "error": "x"}, False),
+        ({"rows": 3, "rows_sent": 0, "failed_batches": 0}, False),
+        (None, False),
+    ],
+)
+def test_upload_succeeded(summary, expected):
+    """Test qu'un envoi n'est réussi que si toutes ses lignes ont été écrites."""
+    assert upload_succeeded(summary) is expected
+
+
+@pytest.mark.parametrize("failed_batches, rows_sent", [(0, 1), (1, 0), (0, 0)])
+@patch("src.data_ingestion.fetchers.fetch_all.SupabaseHandler")
+@patch("src.data_ingestion.fetchers.fetch_all.WeatherDataHandler")
+@patch("src.data_ingestion.fetchers.fetch_all.HubeauDataHandler")
+@patch("src.data_ingestion.fetchers.fetch_all.DataUploader")
+@patch("os.path.exists")
+def test_fetch_all_replaces_forecast_only_on_success(
+    mock_exists,
+    mock_data_uploader,
+    mock_hubeau_handler,
+    mock_weather_handler,
+    mock_supabase_handler,
+    failed_batches,
+    rows_sent,
+):
+    """Test que les tables forecast ne sont élaguées qu'après un upsert réussi."""
+    mock_exists.return_value = False
+    supabase = mock_supabase_handler.return_value.supabase
+    uploader = mock_data_uploader.return_value
+    summary = {"rows": 1, "rows_sent": rows_sent, "failed_batches": failed_batches}
+    uploader.upload_raw_dataset.return_value = summary
+    uploader.upload_clean_dataset.return_value = summary
+
+    weather = Mock()
+    weather.fetch.side_effect = lambda forecast=False, **kwargs: (
+        pd.DataFrame({"time": ["2024-06-01"], "shortwave_radiation_sum": [10.0]})
+        if forecast
+        else pd.DataFrame()
+    )
+    wind = Mock()
+    wind.fetch.return_value = pd.DataFrame()
+    mock_weather_handler.side_effect = [weather, wind]
+    mock_hubeau_handler.return_value.stream.return_value = pd.DataFrame()
+
+    fetch_all()
+
+    # Aucune table vidée avant le téléchargement
+    supabase.table.return_value.select.return_value.execute.assert_not_called()
+    pruned = [
+        call.args[0]
+        for call in supabase.table.call_args_list
+        if call.args[0].endswith("_forecast")
+    ]
+    if failed_batches or not rows_sent:
+        assert pruned == []
+    else:
+        assert pruned == ["raw_solar_forecast", "clean_solar_forecast"]
+        uploader.hash_index.retain.assert_called()
@@ -1,12 +1,17 @@
 import pytest
 import pandas as pd
 from unittest.mock import patch, Mock
-from src.data_ingestion.fetchers.fetch_hubeau import get_hubeau_data
+from src.data_ingestion.fetchers.fetch_hubeau import (
+    get_hubeau_data,
+    iter_hubeau_data,
+    split_date_range,
+)
 
 
-@patch("src.data_ingestion.fetchers.fetch_hubeau.requests.get")
-def test_get_hubeau_data_success(mock_get):
+@patch("src.data_ingestion.fetchers.fetch_hubeau.get_session")
+def test_get_hubeau_data_success(mock_get_session):
     """Test la récupération réussie des données Hub'Eau."""
+    mock_get = mock_get_session.return_value.get
     # Mock de la réponse
     mock_response = Mock()
     mock_response.json.return_value = {
@@ -32,9 +37,10 @@ def test_get_hubeau_data_success(mock_get):
     assert "resultat_obs_elab" in df.columns
 
 
-@patch("src.data_ingestion.fetchers.fetch_hubeau.requests.get")
-def test_get_hubeau_data_empty(mock_get):
+@patch("src.data_ingestion.fetchers.fetch_hubeau.get_session")
+def test_get_hubeau_data_empty(mock_get_session):
     """Test la récupération avec données vides."""
+    mock_get = mock_get_session.return_value.get
     mock_response = Mock()
     mock_response.json.return_value = {"data": []}
     mock_response.raise_for_status = Mock()
@@ -46,10 +52,69 @@ def test_get_hubeau_data_empty(mock_get):
     assert df.empty
 
 
-@patch("src.data_ingestion.fetchers.fetch_hubeau.requests.get")
-def test_get_hubeau_data_http_error(mock_get):
+@patch("src.data_ingestion.fetchers.fetch_hubeau.get_session")
+def test_get_hubeau_data_http_error(mock_get_session):
     """Test la gestion des erreurs HTTP."""
+    mock_get = mock_get_session.return_value.get
     mock_get.side_effect = Exception("HTTP Error")
 
     with pytest.raises(Exception):
         get_hubeau_data("Y321002101", "2024-01-01", "2024-01-31")
+
+
+def _page(rows, next_url=None):
+    """Réponse Hub'Eau simulée avec un lien vers la page suivante."""
+    response = Mock()
+    response.json.return_value = {"data": rows, "next": next_url}
+    return response
+
+
+@patch("src.data_ingestion.fetchers.fetch_hubeau.get_session")
+def test_get_hubeau_data_follows_next_links(mock_get_session):
+    """Test que toutes les pages sont récupérées en suivant les liens next."""
+    mock_get = mock_get_session.return_value.get
+    mock_get.side_effect = [
+        _page([{"date_obs_elab": "2024-01-01"}], "https://hubeau/next?cursor=2"),
+        _page([{"date_obs_elab": "2024-01-02"}], "https://hubeau/next?cursor=3"),
+        _page([{"date_obs_elab": "2024-01-03"}]),
+    ]
+
+    df = get_hubeau_data("Y321002101", "2024-01-01", "2024-01-31")
+
+    assert df["date_obs_elab"].tolist() == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert mock_get.call_count == 3
+    assert mock_get.call_args_list[1].args[0] == "https://hubeau/next?cursor=2"
+    assert mock_get.call_args_list[1].kwargs["params"] is None
+
+
+@patch("src.data_ingestion.fetchers.fetch_hubeau.get_session")
+def test_iter_hubeau_data_windows_in_date_order(mock_get_session):
+    """Test le découpage en fenêtres parallèles restituées dans l'ordre des dates."""
+
+    def get(url, params=None, timeout=None):
+        return _page([{"date_obs_elab": params["date_debut_obs_elab"]}])
+
+    mock_get_session.return_value.get.side_effect = get
+
+    chunks = list(
+        iter_hubeau_data(
+            "Y321002101", "2022-01-01", "2024-12-31", window_days=365, max_workers=2
+        )
+    )
+
+    assert [chunk["date_obs_elab"].iloc[0] for chunk in chunks] == [
+        "2022-01-01",
+        "2023-01-01",
+        "2024-01-01",
+        "2024-12-31",
+    ]
+
+
+def test_split_date_range():
+    """Test le découpage d'une période en fenêtres contiguës."""
+    assert split_date_range("2024-01-01", "2024-01-10", 4) == [
+        ("2024-01-01", "2024-01-04"),
+        ("2024-01-05", "2024-01-08"),
+        ("2024-01-09", "2024-01-10"),
+    ]
+    assert split_date_range(None, "2024-01-10", 4) == [(None, "2024-01-10")]
@@ -7,9 +7,10 @@ from src.data_ingestion.fetchers.fetch_open_meteo_solaire import (
 )
 
 
-@patch("src.data_ingestion.fetchers.fetch_open_meteo_solaire.requests.get")
-def test_get_solar_forecast_success(mock_get):
+@patch("src.data_ingestion.fetchers.fetch_open_meteo_solaire.get_session")
+def test_get_solar_forecast_success(mock_get_session):
     """Test la récupération des prévisions solaires."""
+    mock_get = mock_get_session.return_value.get
     mock_response = Mock()
     mock_response.json.return_value = {
         "daily": {
@@ -28,9 +29,10 @@ def test_get_solar_forecast_success(mock_get):
     assert "time" in df.columns
 
 
-@patch("src.data_ingestion.fetchers.fetch_open_meteo_solaire.requests.get")
-def test_get_solar_history_success(mock_get):
+@patch("src.data_ingestion.fetchers.http_session.get_session")
+def test_get_solar_history_success(mock_get_session):
     """Test la récupération de l'historique solaire."""
+    mock_get = mock_get_session.return_value.get
     mock_response = Mock()
     mock_response.json.return_value = {
         "daily": {
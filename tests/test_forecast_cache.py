@@ -0,0 +1,74 @@
+import time
+from unittest.mock import Mock
+from src.prediction.forecast_cache import ForecastCache
+
+
+def _wait_for_refresh(cache, key="solar", timeout=2.0):
+    """Attend la fin de la revalidation en arrière-plan."""
+    deadline = time.monotonic() + timeout
+    while key in cache._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_cache_hit_within_ttl():
+    """Test qu'une entrée fraîche est servie sans recalcul."""
+    cache = ForecastCache(ttl=60, stale_ttl=60)
+    loader = Mock(return_value=[1, 2, 3])
+
+    assert cache.get("solar", loader) == [1, 2, 3]
+    assert cache.get("solar", loader) == [1, 2, 3]
+
+    assert loader.call_count == 1
+    assert cache.stats["misses"] == 1
+    assert cache.stats["hits"] == 1
+
+
+def test_cache_stale_while_revalidate():
+    """Test qu'une entrée expirée est servie pendant sa revalidation."""
+    cache = ForecastCache(ttl=0, stale_ttl=60)
+    loader = Mock(side_effect=[["ancien"], ["nouveau"]])
+    version = Mock(side_effect=["v1", "v2"])
+
+    cache.get("solar", loader, version)
+    assert cache.get("solar", loader, version) == ["ancien"]
+    _wait_for_refresh(cache)
+
+    assert cache.stats["stale_hits"] == 1
+    assert cache.stats["refreshes"] == 1
+    assert cache._entries[("solar", "v2")].value == ["nouveau"]
+    assert ("solar", "v1") not in cache._entries
+
+
+def test_cache_revalidation_without_change():
+    """Test qu'une version inchangée prolonge l'entrée sans recalcul."""
+    cache = ForecastCache(ttl=0, stale_ttl=60)
+    loader = Mock(return_value=["valeur"])
+    version = Mock(return_value="v1")
+
+    cache.get("solar", loader, version)
+    cache.get("solar", loader, version)
+    _wait_for_refresh(cache)
+
+    assert loader.call_count == 1
+    assert cache.stats["revalidations"] == 1
+
+
+def test_cache_miss_after_stale_window():
+    """Test le recalcul synchrone quand l'entrée est trop ancienne."""
+    cache = ForecastCache(ttl=0, stale_ttl=0)
+    loader = Mock(side_effect=[["ancien"], ["nouveau"]])
+
+    cache.get("solar", loader)
+
+    assert cache.get("solar", loader) == ["nouveau"]
+    assert cache.stats["misses"] == 2
+
+
+def test_cache_does_not_store_empty_results():
+    """Test qu'un résultat vide n'est pas mis en cache."""
+    cache = ForecastCache(ttl=60, stale_ttl=60)
+    loader = Mock(side_effect=[[], ["valeur"]])
+
+    assert cache.get("wind", loader) == []
+    assert cache.get("wind", loader) == ["valeur"]
+    assert cache.get_stats()["entries"]["wind"]["version"] == "None"
@@ -0,0 +1,90 @@
+import pytest
+from unittest.mock import patch
+from src.prediction.forecast_cache import ForecastCache
+from src.prediction.forecast_predictor import ForecastPredictor
+from src.prediction.model_predictor import ModelPredictor
+
+
+@pytest.fixture
+def forecast_predictor(hydro_predictor):
+    """ForecastPredictor sans Supabase, utilisant le registre de test."""
+    registry = hydro_predictor.registry
+    with patch("src.prediction.forecast_predictor.ForecastService"), patch(
+        "src.prediction.forecast_predictor.ModelPredictor",
+        side_effect=lambda producer_type: ModelPredictor(producer_type, registry),
+    ):
+        yield ForecastPredictor()
+
+
+def test_predict_forecasts_whole_horizon_single_call(forecast_predictor):
+    """Test que tout l'horizon est prédit en un seul appel au modèle."""
+    forecasts = [
+        {"date": f"2024-01-{day:02d}", "debit_l_s": float(day)} for day in range(1, 31)
+    ]
+
+    with patch.object(
+        ModelPredictor, "predict_frame", autospec=True, wraps=ModelPredictor.predict_frame
+    ) as mock_predict_frame:
+        predictions = forecast_predictor.predict_forecasts("hydro", forecasts)
+
+    assert mock_predict_frame.call_count == 1
+    assert len(predictions) == 30
+    assert predictions[0]["date"] == "2024-01-01"
+    assert predictions[0]["features"] == {"debit_l_s": 1.0}
+    assert predictions[9]["prediction_kwh"] == pytest.approx(20.0, rel=1e-2)
+
+
+def test_predict_forecasts_isolates_invalid_day(forecast_predictor):
+    """Test qu'un jour invalide n'empêche pas les autres prédictions."""
+    forecasts = [
+        {"date": "2024-01-01", "debit_l_s": 10.0},
+        {"date": "2024-01-02", "debit_l_s": None},
+        {"date": "2024-01-03", "debit_l_s": 30.0},
+    ]
+
+    predictions = forecast_predictor.predict_forecasts("hydro", forecasts)
+
+    assert [p["date"] for p in predictions] == ["2024-01-01", "2024-01-03"]
+
+
+def test_predict_hydro_forecast_without_data(forecast_predictor):
+    """Test le comportement sans données de prévision."""
+    forecast_predictor.forecast_service.get_hydro_forecast.return_value = []
+
+    assert forecast_predictor.predict_hydro_forecast() == []
+
+
+def test_predict_all_forecasts_partial(forecast_predictor):
+    """Test que /forecast/all renvoie les producteurs disponibles malgré une erreur."""
+    forecast_predictor.predict_solar_forecast = lambda: [{"date": "2024-01-01"}]
+    forecast_predictor.predict_wind_forecast = lambda: []
+
+    def failing():
+        raise RuntimeError("modèle indisponible")
+
+    forecast_predictor.predict_hydro_forecast = failing
+
+    result = forecast_predictor.predict_all_forecasts()
+
+    assert result["summary"]["solar_days"] == 1
+    assert result["hydro"] == []
+    assert "modèle indisponible" in result["summary"]["errors"]["hydro"]
+
+
+@patch("src.prediction.forecast_predictor.model_registry")
+@patch("src.prediction.forecast_predictor.ForecastService")
+def test_cache_miss_reads_forecast_inputs_once(mock_service, mock_registry):
+    """Test qu'un miss lit une seule fois les prévisions : la version et le
+    calcul en direct partagent les mêmes lignes."""
+    rows = [{"date": "2024-01-01", "debit_l_s": 10.0}]
+    service = mock_service.return_value
+    service.get_forecast_inputs.return_value = rows
+    service.get_forecast_version.return_value = "d1"
+    service.get_hydro_forecast.return_value = []
+    predictor = ForecastPredictor(cache=ForecastCache(ttl=60, stale_ttl=0))
+
+    predictor.predict_hydro_forecast()
+
+    service.get_forecast_inputs.assert_called_once_with("hydro")
+    service.get_forecast_version.assert_called_once_with("hydro", rows)
+    service.get_hydro_forecast.assert_called_once_with(rows)
@@ -0,0 +1,104 @@
+import time
+import pytest
+from unittest.mock import patch, Mock
+from src.prediction.forecast_service import ForecastService, run_by_producer
+
+
+@pytest.fixture
+def forecast_service():
+    """ForecastService avec un client Supabase simulé."""
+    with patch("src.prediction.forecast_service.create_client") as mock_client:
+        mock_client.return_value = Mock()
+        yield ForecastService()
+
+
+def _slow(value, delay=0.2):
+    def task():
+        time.sleep(delay)
+        return value
+
+    return task
+
+
+def test_run_by_producer_runs_concurrently():
+    """Test que les producteurs sont traités en parallèle."""
+    start = time.perf_counter()
+    results, errors = run_by_producer(
+        {"solar": _slow(1), "wind": _slow(2), "hydro": _slow(3)}, timeout=5
+    )
+    elapsed = time.perf_counter() - start
+
+    assert results == {"solar": 1, "wind": 2, "hydro": 3}
+    assert errors == {}
+    assert elapsed < 0.5
+
+
+def test_run_by_producer_partial_results():
+    """Test les résultats partiels en cas d'erreur ou de délai dépassé."""
+
+    def failing():
+        raise RuntimeError("Supabase indisponible")
+
+    results, errors = run_by_producer(
+        {"solar": _slow([1], 0), "wind": failing, "hydro": _slow([3], 2)},
+        timeout=0.3,
+    )
+
+    assert results == {"solar": [1]}
+    assert "Supabase indisponible" in errors["wind"]
+    assert "Délai" in errors["hydro"]
+
+
+def test_get_all_forecasts_partial(forecast_service):
+    """Test qu'un producteur en échec n'empêche pas les autres."""
+    forecast_service.get_solar_forecast = Mock(return_value=[{"date": "2024-01-01"}])
+    forecast_service.get_wind_forecast = Mock(side_effect=RuntimeError("erreur"))
+    forecast_service.get_hydro_forecast = Mock(return_value=[])
+
+    result = forecast_service.get_all_forecasts()
+
+    assert result == {"solar": [{"date": "2024-01-01"}], "wind": [], "hydro": []}
+
+
+def _version_rows(forecast_service, rows):
+    """Simule la lecture des lignes de prévision utilisée pour la version."""
+    query = forecast_service.supabase.table.return_value.select.return_value
+    query.order.return_value.execute.return_value = Mock(data=rows)
+
+
+def test_forecast_version_changes_with_rewritten_values(forecast_service):
+    """Test que la version change quand des valeurs sont réécrites à dates et
+    nombre de lignes identiques."""
+    rows = [
+        {"date": "2024-01-16", "wind_speed_10m_max": 20.0},
+        {"date": "2024-01-15", "wind_speed_10m_max": 15.0},
+    ]
+    _version_rows(forecast_service, rows)
+    version = forecast_service.get_forecast_version("wind")
+
+    _version_rows(
+        forecast_service, [{**rows[0], "wind_speed_10m_max": 25.0}, rows[1]]
+    )
+    revised = forecast_service.get_forecast_version("wind")
+
+    assert version.startswith("2024-01-16:2:")
+    assert revised.startswith("2024-01-16:2:")
+    assert revised != version
+
+    # Mêmes valeurs relues : même version
+    _version_rows(forecast_service, [dict(row) for row in rows])
+    assert forecast_service.get_forecast_version("wind") == version
+
+
+def test_forecast_probe_reads_single_row(forecast_service):
+    """Test la sonde : dernière date et nombre de lignes sur une seule ligne."""
+    query = forecast_service.supabase.table.return_value.select.return_value
+    query.order.return_value.limit.return_value.execute.return_value = Mock(
+        data=[{"date": "2024-01-16"}], count=16
+    )
+
+    assert forecast_service.get_forecast_probe("solar") == "2024-01-16:16"
+    forecast_service.supabase.table.return_value.select.assert_called_once_with(
+        "date", count="exact"
+    )
+    query.order.return_value.limit.assert_called_once_with(1)
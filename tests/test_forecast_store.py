@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+from src.prediction.forecast_store import (
+    ForecastStore,
+    build_record,
+    materialize_forecasts,
+)
+from src.prediction.forecast_predictor import ForecastPredictor
+
+PREDICTIONS = [{"date": "2024-01-01", "prediction_kwh": 120.5}]
+
+
+def test_store_save_and_get(tmp_path):
+    """Test l'écriture et la relecture du stock de prédictions."""
+    path = str(tmp_path / "predictions.json")
+    ForecastStore(path).save({"solar": build_record(PREDICTIONS, "m1", "d1")})
+
+    record = ForecastStore(path).get("solar")
+
+    assert record["predictions"] == PREDICTIONS
+    assert record["model_version"] == "m1"
+    assert record["input_version"] == "d1"
+
+
+def test_store_save_keeps_other_producers(tmp_path):
+    """Test qu'une matérialisation partielle conserve les autres producteurs."""
+    store = ForecastStore(str(tmp_path / "predictions.json"))
+    store.save({"solar": build_record(PREDICTIONS, "m1", "d1")})
+    store.save({"wind": build_record(PREDICTIONS, "m2", "d2")})
+
+    assert store.get("solar") is not None
+    assert store.get("wind") is not None
+
+
+def test_store_get_fresh(tmp_path):
+    """Test la détection des prédictions périmées."""
+    store = ForecastStore(str(tmp_path / "predictions.json"), max_age=3600)
+    old_record = build_record(PREDICTIONS, "m1", "d1")
+    old_record["materialized_at"] = (datetime.now() - timedelta(hours=2)).isoformat()
+    store.save({"solar": build_record(PREDICTIONS, "m1", "d1"), "wind": old_record})
+
+    assert store.get_fresh("solar", "m1") is not None
+    # Modèle ré-entraîné depuis la matérialisation
+    assert store.get_fresh("solar", "m2") is None
+    # Matérialisation trop ancienne
+    assert store.get_fresh("wind", "m1") is None
+    assert store.get_fresh("hydro") is None
+    assert store.get_fresh("solar", "m1", "d1") is not None
+    assert store.get_fresh("solar", "m1", "d2") is None
+
+
+def test_materialize_forecasts(tmp_path):
+    """Test la matérialisation avec un producteur sans données."""
+    store = ForecastStore(str(tmp_path / "predictions.json"))
+    predictor = Mock()
+    predictor.get_forecast_version.return_value = ("2024-01-16:16", "abc123")
+    predictor._read_probe.return_value = "2024-01-16:16"
+    predictor._compute_solar_forecast.return_value = PREDICTIONS
+    predictor._compute_wind_forecast.return_value = PREDICTIONS
+    predictor._compute_hydro_forecast.return_value = []
+
+    records = materialize_forecasts(predictor, store)
+
+    assert set(records) == {"solar", "wind"}
+    assert store.get("solar")["model_version"] == "abc123"
+    assert store.get("solar")["input_version"] == "2024-01-16:16"
+    assert store.get("solar")["input_probe"] == "2024-01-16:16"
+    assert store.get("hydro") is None
+
+
+@patch("src.prediction.forecast_predictor.ForecastService")
+@patch("src.prediction.forecast_predictor.model_registry")
+def test_forecast_predictor_serves_stored_predictions(
+    mock_registry, mock_service, tmp_path
+):
+    """Test que les prédictions matérialisées évitent le calcul en direct."""
+    mock_registry.get.return_value.version = "m1"
+    mock_service.return_value.get_forecast_probe.return_value = "2024-01-16:16"
+    store = ForecastStore(str(tmp_path / "predictions.json"))
+    store.save({"solar": build_record(PREDICTIONS, "m1", "d1", "2024-01-16:16")})
+
+    predictor = ForecastPredictor(store=store)
+
+    assert predictor.predict_solar_forecast() == PREDICTIONS
+    # Sonde seulement : ni relecture des prévisions ni calcul en direct
+    predictor.forecast_service.get_forecast_inputs.assert_not_called()
+    predictor.forecast_service.get_solar_forecast.assert_not_called()
+
+
+def test_store_get_fresh_checks_input_probe(tmp_path):
+    """Test la validation du stock par la sonde des prévisions."""
+    store = ForecastStore(str(tmp_path / "predictions.json"))
+    store.save({"solar": build_record(PREDICTIONS, "m1", "d1", "2024-01-16:16")})
+
+    assert store.get_fresh("solar", "m1", input_probe="2024-01-16:16") is not None
+    # Nouvelle ingestion : dernière date ou nombre de lignes changé
+    assert store.get_fresh("solar", "m1", input_probe="2024-01-17:17") is None
+
+
+@patch("src.prediction.forecast_predictor.ForecastService")
+@patch("src.prediction.forecast_predictor.model_registry")
+def test_forecast_predictor_recomputes_when_inputs_changed(
+    mock_registry, mock_service, tmp_path
+):
+    """Test le calcul en direct quand les prévisions ont changé depuis la
+    matérialisation (matérialisation en échec après une ingestion)."""
+    mock_registry.get.return_value.version = "m1"
+    mock_service.return_value.get_forecast_probe.return_value = "2024-01-17:17"
+    mock_service.return_value.get_forecast_version.return_value = "d2"
+    mock_service.return_value.get_solar_forecast.return_value = []
+    store = ForecastStore(str(tmp_path / "predictions.json"))
+    store.save({"solar": build_record(PREDICTIONS, "m1", "d1", "2024-01-16:16")})
+
+    predictor = ForecastPredictor(store=store)
+
+    assert predictor.predict_solar_forecast() == []
+    predictor.forecast_service.get_solar_forecast.assert_called_once()
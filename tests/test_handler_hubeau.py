@@ -56,3 +56,30 @@ def test_hubeau_handler_clean_empty():
     handler = HubeauDataHandler("Y321002101", "2024-01-01", "2024-01-31")
     handler.df = pd.DataFrame()
     handler.clean()  # Ne devrait pas lever d'exception
+
+
+@patch("src.data_ingestion.handlers.handler_hubeau.iter_hubeau_data")
+def test_hubeau_handler_stream(mock_iter):
+    """Test le traitement page par page : chaque page est dérivée puis traitée
+    avant le téléchargement de la suivante."""
+    pages = [
+        pd.DataFrame({"date_obs_elab": ["2024-01-01"], "result_obs_elab": [10.5]}),
+        pd.DataFrame({"date_obs_elab": ["2024-01-02"], "result_obs_elab": [11.2]}),
+    ]
+    events = []
+
+    def iter_pages(*args):
+        for index, page in enumerate(pages):
+            events.append(f"page {index}")
+            yield page
+
+    mock_iter.side_effect = iter_pages
+    handler = HubeauDataHandler("Y321002101", "2024-01-01", "2024-01-31")
+
+    df_clean = handler.stream(
+        lambda df_raw, df_clean: events.append(f"envoi {len(df_clean)}")
+    )
+
+    assert events == ["page 0", "envoi 1", "page 1", "envoi 1"]
+    assert df_clean["debit_l_s"].tolist() == [10.5, 11.2]
+    mock_iter.assert_called_once_with("Y321002101", "2024-01-01", "2024-01-31")
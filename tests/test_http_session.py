@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+from requests_cache import CachedSession, NEVER_EXPIRE
+from requests_cache.policy.expiration import get_url_expiration
+from src.config.settings import settings
+from src.data_ingestion.fetchers.http_session import (
+    archive_expire_after,
+    cache_policy,
+    create_session,
+)
+
+
+def test_cache_policy_by_endpoint():
+    """Test la durée de vie du cache selon l'endpoint."""
+    policy = cache_policy()
+
+    assert (
+        get_url_expiration("https://archive-api.open-meteo.com/v1/archive", policy)
+        == settings.http_archive_cache_ttl
+    )
+    assert get_url_expiration("https://api.open-meteo.com/v1/forecast", policy) > 0
+    assert (
+        get_url_expiration(
+            "https://hubeau.eaufrance.fr/api/v2/hydrometrie/obs_elab", policy
+        )
+        > 0
+    )
+
+
+def test_archive_expire_after_by_end_date():
+    """Test qu'une plage d'archive encore révisée expire, pas une plage définitive."""
+    lag = settings.archive_final_lag_days
+    old_end = (date.today() - timedelta(days=lag + 1)).isoformat()
+    recent_end = (date.today() - timedelta(days=lag - 1)).isoformat()
+
+    assert archive_expire_after(old_end) == NEVER_EXPIRE
+    assert archive_expire_after(recent_end) == settings.http_archive_cache_ttl
+    assert archive_expire_after(date.today().isoformat()) != NEVER_EXPIRE
+
+
+def test_create_session_with_cache_and_pool(tmp_path):
+    """Test la session avec cache SQLite, nouvelles tentatives et pool dimensionné."""
+    with (
+        patch(
+            "src.data_ingestion.fetchers.http_session.settings.http_cache_path",
+            str(tmp_path / "http_cache.sqlite"),
+        ),
+        patch("src.data_ingestion.fetchers.http_session.settings.http_pool_size", 4),
+    ):
+        session = create_session(cache=True)
+
+    adapter = session.get_adapter("https://archive-api.open-meteo.com")
+    assert isinstance(session, CachedSession)
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total > 0
+    assert 429 in adapter.max_retries.status_forcelist
+
+
+def test_create_session_without_cache():
+    """Test la session sans cache."""
+    session = create_session(cache=False)
+
+    assert not isinstance(session, CachedSession)
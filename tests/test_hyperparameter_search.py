@@ -0,0 +1,179 @@
+import json
+import multiprocessing
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from src.models import model_trainer
+from src.models.hyperparameter_search import (
+    SearchTimeout,
+    evaluate_config,
+    make_validation_fold,
+    sample_params,
+    successive_halving,
+)
+from src.models.model_config import SEARCH_SPACES
+from src.models.model_trainer import RenewableModelTrainer
+
+
+def _split(n_rows=300):
+    """Jeu synthétique au format de prepare_training_split."""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.uniform(0, 10, (n_rows, 2)), columns=["a", "b"])
+    y = pd.Series(3 * X["a"] + np.sin(X["b"]) + rng.normal(0, 0.1, n_rows))
+    n_train = int(n_rows * 0.8)
+    return {
+        "X_train": X[:n_train],
+        "X_test": X[n_train:],
+        "X_train_scaled": X[:n_train].to_numpy(),
+        "X_test_scaled": X[n_train:].to_numpy(),
+        "y_train": y[:n_train],
+        "y_test": y[n_train:],
+    }
+
+
+def test_sample_params_respects_search_space():
+    """Test que les configurations tirées restent dans l'espace de recherche."""
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        for family, space in SEARCH_SPACES.items():
+            params = sample_params(space, rng)
+            assert set(params) == set(space)
+            for name, spec in space.items():
+                if spec["type"] == "choice":
+                    assert params[name] in spec["values"]
+                else:
+                    assert spec["low"] <= params[name] <= spec["high"]
+
+
+def test_successive_halving_xgboost_uses_early_stopping():
+    """Test le halving successif et le nombre d'arbres fixé par arrêt anticipé."""
+    result = successive_halving(
+        "xgboost",
+        _split(),
+        base_params={"n_estimators": 100, "max_depth": 3},
+        n_configs=9,
+        eta=3,
+        min_fraction=0.33,
+        deadline=time.time() + 300,
+        max_workers=1,
+    )
+
+    assert result["rungs"] == 2
+    # 9 configurations puis le meilleur tiers
+    assert result["trials"] == 9 + 3
+    assert not result["budget_exhausted"]
+    assert result["score"] > 0
+    assert 1 <= result["params"]["n_estimators"] <= 2000
+    assert "early_stopping_rounds" not in result["params"]
+
+
+def test_successive_halving_stops_at_deadline():
+    """Test qu'une échéance dépassée garde la configuration de base."""
+    base_params = {"alpha": 0.01}
+    result = successive_halving(
+        "ridge",
+        _split(),
+        base_params=base_params,
+        n_configs=9,
+        deadline=time.time() - 1,
+        max_workers=1,
+    )
+
+    assert result["budget_exhausted"]
+    assert result["trials"] == 0
+    assert result["params"] == base_params
+
+
+def test_evaluate_config_stops_xgboost_at_deadline():
+    """Test qu'une évaluation XGBoost s'interrompt à l'échéance."""
+    start = time.time()
+    job = {
+        "family": "xgboost",
+        "params": {"max_depth": 3},
+        "fold": make_validation_fold(_split(), "xgboost"),
+        "fraction": 1.0,
+        "threads": 1,
+        "deadline": start + 0.5,
+        "max_estimators": 10**6,
+        "early_stopping_rounds": 10**6,
+    }
+
+    with pytest.raises(SearchTimeout):
+        evaluate_config(job)
+    assert time.time() - start < 5
+
+
+def test_successive_halving_pool_stops_at_deadline():
+    """Test qu'aucune évaluation du pool ne survit à l'échéance."""
+    start = time.time()
+    result = successive_halving(
+        "random_forest",
+        _split(),
+        base_params={"n_estimators": 100_000},
+        space={"min_samples_leaf": {"type": "int", "low": 1, "high": 5}},
+        n_configs=3,
+        deadline=start + 5,
+        max_workers=2,
+    )
+
+    assert result["budget_exhausted"]
+    assert result["trials"] == 0
+    assert time.time() - start < 10
+    assert multiprocessing.active_children() == []
+
+
+@patch("src.models.model_trainer.SupabaseDataLoader")
+def test_train_models_with_search_writes_metadata(mock_loader, tmp_path):
+    """Test que les paramètres retenus sont écrits dans les métadonnées."""
+    split = _split()
+    df = pd.concat([split["X_train"], split["X_test"]]).assign(
+        debit_l_s=lambda d: d["a"],
+        production_kwh=pd.concat([split["y_train"], split["y_test"]]),
+    )
+    mock_loader.return_value.load_training_data.return_value = df
+
+    with patch.object(model_trainer, "MODELS_DIR", str(tmp_path)):
+        trainer = RenewableModelTrainer("hydro")
+        results = trainer.train_models(search=True, time_budget=300)
+
+    metadata = json.loads((tmp_path / "hydro_metadata.json").read_text())
+    best = metadata["model_family"]
+    assert best == min(results, key=lambda family: results[family]["mae"])
+    assert (tmp_path / f"hydro_{best}_model.pkl").exists()
+    assert metadata["params"] == trainer.params[best]
+    assert metadata["search"]["trials"] > 0
+    assert metadata["metrics"]["mae"] == results[best]["mae"]
+
+
+@patch("src.models.hyperparameter_search.successive_halving")
+@patch("src.models.model_trainer.SupabaseDataLoader")
+def test_train_models_budget_starts_after_data_loading(
+    mock_loader, mock_search, tmp_path
+):
+    """Test que le chargement des données n'entame pas le budget de recherche."""
+    split = _split()
+    df = pd.concat([split["X_train"], split["X_test"]]).assign(
+        debit_l_s=lambda d: d["a"],
+        production_kwh=pd.concat([split["y_train"], split["y_test"]]),
+    )
+
+    def slow_load(*args, **kwargs):
+        time.sleep(0.5)
+        return df
+
+    mock_loader.return_value.load_training_data.side_effect = slow_load
+    deadlines = []
+
+    def search(family, split, base_params, deadline):
+        deadlines.append(deadline - time.time())
+        return {"params": base_params, "trials": 0}
+
+    mock_search.side_effect = search
+
+    with patch.object(model_trainer, "MODELS_DIR", str(tmp_path)):
+        RenewableModelTrainer("hydro").train_models(search=True, time_budget=0.6)
+
+    # Chargement de 0,5s : il reste l'essentiel du budget à la 1re recherche
+    assert deadlines[0] > 0.4
@@ -0,0 +1,204 @@
+import json
+import joblib
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime, timedelta
+from sklearn.linear_model import Ridge
+from unittest.mock import patch
+from src.config.settings import settings
+from src.models import model_trainer
+from src.prediction.model_registry import ModelRegistry
+from src.models.model_trainer import (
+    RenewableModelTrainer,
+    merge_ridge_statistics,
+    ridge_statistics,
+    solve_ridge,
+)
+
+
+def _history(start: str, n_days: int, seed: int = 0) -> pd.DataFrame:
+    """Historique hydro synthétique au format de load_training_data."""
+    rng = np.random.default_rng(seed)
+    debit = rng.uniform(100, 1000, n_days)
+    return pd.DataFrame(
+        {
+            "date": pd.date_range(start, periods=n_days, freq="D"),
+            "debit_l_s": debit,
+            "production_kwh": 0.5 * debit + rng.normal(0, 5, n_days),
+        }
+    )
+
+
+@pytest.fixture
+def models_dir(tmp_path):
+    with patch.object(model_trainer, "MODELS_DIR", str(tmp_path)):
+        yield tmp_path
+
+
+def _saved_trainer(mock_loader, family: str) -> RenewableModelTrainer:
+    """Entrainement complet puis sauvegarde de la famille demandée."""
+    mock_loader.return_value.load_training_data.return_value = _history(
+        "2024-01-01", 200
+    )
+    trainer = RenewableModelTrainer("hydro")
+    results = trainer.train_models(search=False)
+    trainer._save_best_model(family, results[family])
+    return trainer
+
+
+def test_solve_ridge_matches_sklearn_on_merged_windows():
+    """Test que Ridge par statistiques suffisantes égale un entrainement complet."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(120, 3))
+    y = X @ [1.0, -2.0, 0.5] + 3 + rng.normal(0, 0.1, 120)
+
+    statistics = merge_ridge_statistics(
+        ridge_statistics(X[:100], y[:100]), ridge_statistics(X[100:], y[100:])
+    )
+    coef, intercept = solve_ridge(statistics, alpha=0.5)
+
+    expected = Ridge(alpha=0.5).fit(X, y)
+    np.testing.assert_allclose(coef, expected.coef_, rtol=1e-8)
+    assert intercept == pytest.approx(expected.intercept_)
+
+
+@pytest.mark.parametrize("family", ["ridge", "xgboost", "random_forest"])
+@patch("src.models.model_trainer.SupabaseDataLoader")
+def test_train_incremental_updates_saved_model(mock_loader, family, models_dir):
+    """Test la mise à jour du modèle sauvegardé sur la seule nouvelle fenêtre."""
+    _saved_trainer(mock_loader, family)
+    model_path = models_dir / f"hydro_{family}_model.pkl"
+    previous = joblib.load(model_path)
+
+    mock_loader.return_value.load_training_data.return_value = pd.concat(
+        [_history("2024-01-01", 200), _history("2024-07-19", 30, seed=1)],
+        ignore_index=True,
+    )
+    report = RenewableModelTrainer("hydro").train_incremental()
+
+    assert report["mode"] == "incremental"
+    assert report["model_family"] == family
+    assert report["rows"] == 30
+    updated = joblib.load(model_path)
+    if family == "xgboost":
+        assert (
+            updated.get_booster().num_boosted_rounds()
+            == previous.get_booster().num_boosted_rounds()
+            + settings.incremental_xgb_rounds
+        )
+    elif family == "random_forest":
+        assert (
+            len(updated.estimators_)
+            == len(previous.estimators_) + settings.incremental_rf_trees
+        )
+    else:
+        assert not np.allclose(updated.coef_, previous.coef_)
+
+    metadata = json.loads((models_dir / "hydro_metadata.json").read_text())
+    assert metadata["training_mode"] == "incremental"
+    assert metadata["incremental_updates"] == 1
+    assert metadata["data_max_date"] == "2024-08-17 00:00:00"
+
+
+@patch("src.models.model_trainer.SupabaseDataLoader")
+def test_train_incremental_ridge_fits_all_rows_seen(mock_loader, models_dir):
+    """Test que Ridge mis à jour égale un Ridge entraîné sur toutes les lignes
+    vues (train, test et nouvelle fenêtre) avec le scaler sauvegardé."""
+    _saved_trainer(mock_loader, "ridge")
+    history = pd.concat(
+        [_history("2024-01-01", 200), _history("2024-07-19", 30, seed=1)],
+        ignore_index=True,
+    )
+    mock_loader.return_value.load_training_data.return_value = history
+
+    RenewableModelTrainer("hydro").train_incremental()
+
+    updated = joblib.load(models_dir / "hydro_ridge_model.pkl")
+    scaler = joblib.load(models_dir / "hydro_scaler.pkl")
+    expected = Ridge(alpha=updated.alpha).fit(
+        scaler.transform(history[["debit_l_s"]]), history["production_kwh"]
+    )
+    np.testing.assert_allclose(updated.coef_, expected.coef_, rtol=1e-6)
+    assert updated.intercept_ == pytest.approx(expected.intercept_)
+
+
+@patch("src.models.model_trainer.SupabaseDataLoader")
+def test_saved_models_publish_manifest(mock_loader, models_dir):
+    """Test que chaque sauvegarde publie un manifeste lisible par le registre."""
+    _saved_trainer(mock_loader, "xgboost")
+    registry = ModelRegistry(models_dir=str(models_dir), check_interval=0)
+    first = registry.get("hydro")
+    assert first.model_file == "hydro_xgboost_model.pkl"
+    assert first.scaler is not None
+
+    mock_loader.return_value.load_training_data.return_value = pd.concat(
+        [_history("2024-01-01", 200), _history("2024-07-19", 30, seed=1)],
+        ignore_index=True,
+    )
+    RenewableModelTrainer("hydro").train_incremental()
+    manifest = models_dir / "hydro_manifest.json"
+    stat = manifest.stat()
+    os.utime(manifest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert registry.get("hydro").version != first.version
+
+
+@patch("src.models.model_trainer.SupabaseDataLoader")
+def test_train_incremental_requires_periodic_full_rebuild(mock_loader, models_dir):
+    """Test la reconstruction complète après TRAINING_FULL_REBUILD_DAYS jours."""
+    _saved_trainer(mock_loader, "xgboost")
+    path = models_dir / "hydro_metadata.json"
+    metadata = json.loads(path.read_text())
+    metadata["last_full_rebuild"] = (
+        datetime.now() - timedelta(days=settings.training_full_rebuild_days + 1)
+    ).isoformat()
+    path.write_text(json.dumps(metadata))
+
+    report = RenewableModelTrainer("hydro").train_incremental(rebuild=False)
+
+    assert report["mode"] == "full_required"
+    assert report["reason"].startswith("dernière reconstruction")
+
+
+@patch("src.models.model_trainer.SupabaseDataLoader")
+def test_train_incremental_full_rebuild_refreshes_tables(mock_loader, models_dir):
+    """Test que la reconstruction complète relit les tables entières."""
+    mock_loader.return_value.load_training_data.return_value = _history(
+        "2024-01-01", 200
+    )
+
+    report = RenewableModelTrainer("hydro").train_incremental()
+
+    assert report["mode"] == "full"
+    mock_loader.return_value.load_training_data.assert_called_once_with(
+        "hydro", full_refresh=True
+    )
+
+
+@patch("src.models.model_trainer.SupabaseDataLoader")
+def test_train_incremental_without_saved_model(mock_loader, models_dir):
+    """Test qu'en l'absence de modèle sauvegardé une reconstruction est demandée."""
+    report = RenewableModelTrainer("hydro").train_incremental(rebuild=False)
+
+    assert report == {"mode": "full_required", "reason": "aucune métadonnée de modèle"}
+    mock_loader.return_value.load_training_data.assert_not_called()
+
+
+@patch("src.models.model_trainer.SupabaseDataLoader")
+def test_train_incremental_skips_small_windows(mock_loader, models_dir):
+    """Test qu'une fenêtre trop courte laisse le modèle inchangé."""
+    _saved_trainer(mock_loader, "random_forest")
+    model_path = models_dir / "hydro_random_forest_model.pkl"
+    mtime = model_path.stat().st_mtime_ns
+
+    mock_loader.return_value.load_training_data.return_value = pd.concat(
+        [_history("2024-01-01", 200), _history("2024-07-19", 2, seed=1)],
+        ignore_index=True,
+    )
+    report = RenewableModelTrainer("hydro").train_incremental()
+
+    assert report["mode"] == "up_to_date"
+    assert report["rows"] == 2
+    assert model_path.stat().st_mtime_ns == mtime
@@ -0,0 +1,46 @@
+import pytest
+from src.monitoring.metrics import MetricsRegistry, stage_duration_seconds, time_stage
+
+
+def test_histogram_render_cumulative_buckets():
+    """Test le rendu Prometheus d'un histogramme (bornes cumulées, somme, nombre)."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram(
+        "test_duration_seconds", "Durée de test", ("route",), buckets=(0.1, 1.0)
+    )
+
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5.0, route="/a")
+
+    text = registry.render()
+    assert "# TYPE test_duration_seconds histogram" in text
+    assert 'test_duration_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'test_duration_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'test_duration_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'test_duration_seconds_count{route="/a"} 3' in text
+
+
+def test_counter_render_and_label_escaping():
+    """Test le compteur par labels et l'échappement des valeurs."""
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Compteur de test", ("route",))
+
+    counter.inc(route='/x"y')
+    counter.inc(route='/x"y')
+
+    assert counter.value(route='/x"y') == 2
+    assert 'test_total{route="/x\\"y"} 2' in registry.render()
+
+
+def test_time_stage_records_on_exception():
+    """Test qu'une étape en erreur est quand même mesurée."""
+    before = stage_duration_seconds.count(stage="test_stage", producer="solar")
+
+    with pytest.raises(ValueError):
+        with time_stage("test_stage", "solar"):
+            raise ValueError("échec")
+
+    assert stage_duration_seconds.count(stage="test_stage", producer="solar") == (
+        before + 1
+    )
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def test_predict_batch_matches_single_predictions(hydro_predictor):
+    """Test que le lot donne les mêmes résultats que les appels unitaires."""
+    rows = [{"debit_l_s": v} for v in [10.0, 20.0, 30.0]]
+
+    predictions, errors = hydro_predictor.predict_batch(rows)
+
+    assert errors == {}
+    expected = [hydro_predictor.predict(row) for row in rows]
+    np.testing.assert_allclose(predictions, expected)
+    np.testing.assert_allclose(predictions, [20.0, 40.0, 60.0], rtol=1e-3)
+
+
+def test_predict_batch_reports_row_errors(hydro_predictor):
+    """Test l'isolation des erreurs de validation par ligne."""
+    rows = [{"debit_l_s": 10.0}, {"debit_l_s": "abc"}, {}, {"debit_l_s": None}]
+
+    predictions, errors = hydro_predictor.predict_batch(rows)
+
+    assert set(errors) == {1, 2, 3}
+    assert "debit_l_s" in errors[1]
+    assert predictions[0] == pytest.approx(20.0, rel=1e-3)
+    assert np.isnan(predictions[1:]).all()
+
+
+def test_predict_frame_columnar(hydro_predictor):
+    """Test la prédiction à partir d'un DataFrame en colonnes."""
+    df = pd.DataFrame({"debit_l_s": [0.0, 50.0], "colonne_ignoree": [1, 2]})
+
+    predictions, errors = hydro_predictor.predict_frame(df)
+
+    assert errors == {}
+    assert len(predictions) == 2
+    assert (predictions >= 0).all()
+
+
+def test_predict_frame_ignores_input_index(hydro_predictor):
+    """Test qu'un index autre que 0..n-1 (dates, filtre) ne crée pas de NaN."""
+    df = pd.DataFrame(
+        {"debit_l_s": [10.0, 20.0]},
+        index=pd.date_range("2024-06-01", periods=2, freq="D"),
+    )
+
+    predictions, errors = hydro_predictor.predict_frame(df)
+
+    assert errors == {}
+    np.testing.assert_allclose(predictions, [20.0, 40.0], rtol=1e-3)
+
+
+def test_predict_batch_empty(hydro_predictor):
+    """Test un lot vide."""
+    predictions, errors = hydro_predictor.predict_batch([])
+
+    assert len(predictions) == 0
+    assert errors == {}
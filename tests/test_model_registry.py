@@ -0,0 +1,130 @@
+import json
+import os
+import pytest
+import joblib
+import numpy as np
+from sklearn.linear_model import Ridge
+from sklearn.preprocessing import StandardScaler
+from src.prediction.model_registry import ModelRegistry, file_sha256
+from src.prediction.model_predictor import ModelPredictor
+
+
+def _save_model(models_dir, alpha=1.0, name="solar_ridge_model.pkl"):
+    """Entraîne et sauvegarde un petit modèle Ridge et son scaler."""
+    X = np.arange(20, dtype=float).reshape(10, 2)
+    y = X.sum(axis=1)
+    scaler = StandardScaler().fit(X)
+    model = Ridge(alpha=alpha).fit(scaler.transform(X), y)
+    joblib.dump(model, os.path.join(models_dir, name))
+    joblib.dump(scaler, os.path.join(models_dir, "solar_scaler.pkl"))
+
+
+def _write_manifest(models_dir, name="solar_ridge_model.pkl"):
+    """Publie la paire modèle/scaler comme le fait l'entrainement."""
+    files = {"model_file": name, "scaler_file": "solar_scaler.pkl"}
+    manifest = {
+        **files,
+        "sha256": {f: file_sha256(os.path.join(models_dir, f)) for f in files.values()},
+    }
+    with open(os.path.join(models_dir, "solar_manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+
+def _bump_mtime(path):
+    """Avance le mtime d'un fichier pour simuler une réécriture."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_registry_loads_once(tmp_path):
+    """Test que le modèle n'est chargé qu'une fois par processus."""
+    _save_model(tmp_path)
+    registry = ModelRegistry(models_dir=str(tmp_path), check_interval=60)
+
+    first = registry.get("solar")
+    second = registry.get("solar")
+
+    assert first is second
+    assert first.scaler is not None
+    assert first.model_file == "solar_ridge_model.pkl"
+
+
+def test_registry_reloads_on_content_change(tmp_path):
+    """Test le rechargement à chaud après un ré-entraînement."""
+    _save_model(tmp_path, alpha=1.0)
+    registry = ModelRegistry(models_dir=str(tmp_path), check_interval=0)
+    first = registry.get("solar")
+
+    _save_model(tmp_path, alpha=5.0)
+    _bump_mtime(tmp_path / "solar_ridge_model.pkl")
+    second = registry.get("solar")
+
+    assert second is not first
+    assert second.version != first.version
+    assert second.model.alpha == 5.0
+
+
+def test_registry_keeps_artifacts_when_content_unchanged(tmp_path):
+    """Test qu'un fichier touché sans changement de contenu n'est pas rechargé."""
+    _save_model(tmp_path)
+    registry = ModelRegistry(models_dir=str(tmp_path), check_interval=0)
+    first = registry.get("solar")
+
+    _bump_mtime(tmp_path / "solar_ridge_model.pkl")
+
+    assert registry.get("solar") is first
+
+
+def test_registry_keeps_previous_version_on_failed_reload(tmp_path):
+    """Test qu'un fichier corrompu n'interrompt pas le service."""
+    _save_model(tmp_path)
+    registry = ModelRegistry(models_dir=str(tmp_path), check_interval=0)
+    first = registry.get("solar")
+
+    (tmp_path / "solar_ridge_model.pkl").write_bytes(b"corrompu")
+
+    assert registry.get("solar") is first
+
+
+def test_registry_missing_model(tmp_path):
+    """Test l'erreur quand aucun modèle n'est sauvegardé."""
+    registry = ModelRegistry(models_dir=str(tmp_path))
+
+    with pytest.raises(FileNotFoundError):
+        registry.get("wind")
+
+    assert registry.status(["wind"])["wind"]["loaded"] is False
+
+
+def test_model_predictor_uses_registry(tmp_path):
+    """Test que ModelPredictor partage les artefacts du registre."""
+    _save_model(tmp_path)
+    registry = ModelRegistry(models_dir=str(tmp_path), check_interval=60)
+
+    predictor_a = ModelPredictor("solar", registry=registry)
+    predictor_b = ModelPredictor("solar", registry=registry)
+
+    assert predictor_a.model is predictor_b.model
+    assert predictor_a.get_model_info()["version"] == registry.get("solar").version
+
+
+def test_registry_waits_for_manifest_before_reloading_pair(tmp_path):
+    """Test qu'une paire réécrite n'est chargée qu'une fois le manifeste publié."""
+    _save_model(tmp_path, alpha=1.0)
+    _write_manifest(tmp_path)
+    registry = ModelRegistry(models_dir=str(tmp_path), check_interval=0)
+    first = registry.get("solar")
+
+    # Nouveaux fichiers écrits, manifeste pas encore publié
+    _save_model(tmp_path, alpha=5.0)
+    _bump_mtime(tmp_path / "solar_scaler.pkl")
+    assert registry.get("solar") is first
+    with pytest.raises(ValueError):
+        ModelRegistry(models_dir=str(tmp_path)).get("solar")
+
+    _write_manifest(tmp_path)
+    _bump_mtime(tmp_path / "solar_manifest.json")
+    second = registry.get("solar")
+
+    assert second.model.alpha == 5.0
+    assert second.version != first.version
@@ -7,9 +7,10 @@ from src.data_ingestion.fetchers.fetch_open_meteo_eolien import (
 )
 
 
-@patch("src.data_ingestion.fetchers.fetch_open_meteo_eolien.requests.get")
-def test_get_wind_forecast_success(mock_get):
+@patch("src.data_ingestion.fetchers.fetch_open_meteo_eolien.get_session")
+def test_get_wind_forecast_success(mock_get_session):
     """Test la récupération des prévisions éoliennes."""
+    mock_get = mock_get_session.return_value.get
     mock_response = Mock()
     mock_response.json.return_value = {
         "daily": {
@@ -27,9 +28,10 @@ def test_get_wind_forecast_success(mock_get):
     assert not df.empty
 
 
-@patch("src.data_ingestion.fetchers.fetch_open_meteo_eolien.requests.get")
-def test_get_wind_history_success(mock_get):
+@patch("src.data_ingestion.fetchers.http_session.get_session")
+def test_get_wind_history_success(mock_get_session):
     """Test la récupération de l'historique éolien."""
+    mock_get = mock_get_session.return_value.get
     mock_response = Mock()
     mock_response.json.return_value = {
         "daily": {
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from src.api.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_concurrent_calls():
+    """Test que les appels simultanés partagent un seul calcul."""
+    single_flight = SingleFlight()
+    executions = 0
+
+    async def compute():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.05)
+        return {"total": 42}
+
+    results = await asyncio.gather(
+        *[single_flight.do("forecast_all", compute) for _ in range(10)]
+    )
+
+    assert executions == 1
+    assert all(result == {"total": 42} for result in results)
+    stats = single_flight.get_stats()
+    assert stats["totals"] == {"requests": 10, "executions": 1, "coalesced": 9}
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_sequential_calls_recompute():
+    """Test qu'un appel après la fin du calcul relance un calcul."""
+    single_flight = SingleFlight()
+
+    async def compute():
+        return 1
+
+    await single_flight.do("status", compute)
+    await single_flight.do("status", compute)
+
+    assert single_flight.get_stats()["by_key"]["status"]["executions"] == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_propagates_errors():
+    """Test que l'erreur du calcul est transmise à tous les appelants."""
+    single_flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("Supabase indisponible")
+
+    results = await asyncio.gather(
+        single_flight.do("all", compute),
+        single_flight.do("all", compute),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_leader_cancellation():
+    """Test que l'annulation du premier appelant n'annule pas le calcul partagé."""
+    single_flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    leader = asyncio.ensure_future(single_flight.do("all", compute))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(single_flight.do("all", compute))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "ok"
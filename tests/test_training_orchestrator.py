@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+from unittest.mock import Mock, patch
+from src.models.model_config import MODEL_CONFIG
+from src.models.training_orchestrator import TrainingOrchestrator, plan_workers
+
+
+def test_plan_workers_respects_cpu_budget():
+    """Test que processus × threads ne dépasse pas le budget de cœurs."""
+    assert plan_workers(9, 8) == (8, 1)
+    assert plan_workers(9, 32) == (9, 3)
+    assert plan_workers(3, 8) == (3, 2)
+    assert plan_workers(9, 8, max_workers=2) == (2, 4)
+    assert plan_workers(0, 4) == (1, 4)
+
+
+def _fake_trainer(producer_type):
+    """Trainer simulé : petit jeu de données synthétique, sauvegarde mockée."""
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.uniform(0, 10, (80, 2)), columns=["a", "b"])
+    y = pd.Series(3 * X["a"] + X["b"])
+    trainer = Mock()
+    trainer.config = {
+        "models": {
+            **MODEL_CONFIG["wind"]["models"],
+            "xgboost": {"n_estimators": 10, "max_depth": 3},
+            "random_forest": {"n_estimators": 10, "max_depth": 5},
+        }
+    }
+    trainer.models = {}
+    trainer.params = {}
+    trainer.search_results = {}
+    trainer.prepare_training_split.return_value = {
+        "X_train": X[:60],
+        "X_test": X[60:],
+        "X_train_scaled": X[:60].to_numpy(),
+        "X_test_scaled": X[60:].to_numpy(),
+        "y_train": y[:60],
+        "y_test": y[60:],
+    }
+    trainer.save_best_model.side_effect = lambda results: min(
+        results, key=lambda family: results[family]["mae"]
+    )
+    return trainer
+
+
+@patch("src.models.training_orchestrator.RenewableModelTrainer")
+def test_orchestrator_runs_jobs_in_process_pool(mock_trainer):
+    """Test l'entrainement parallèle et le rapport par job."""
+    trainers = {"wind": _fake_trainer("wind")}
+    mock_trainer.side_effect = lambda producer: trainers[producer]
+
+    report = TrainingOrchestrator(producers=["wind"], cpu_budget=4).run()
+
+    assert report["workers"] == 3
+    assert report["threads_per_job"] == 1
+    assert {job["family"] for job in report["jobs"]} == {
+        "ridge",
+        "xgboost",
+        "random_forest",
+    }
+    for job in report["jobs"]:
+        assert job["seconds"] >= 0
+        assert job["peak_memory_mb"] > 0
+    # Un processus neuf par job
+    assert len({job["pid"] for job in report["jobs"]}) == 3
+    assert report["best"]["wind"] == "ridge"
+    assert set(trainers["wind"].models) == {"ridge", "xgboost", "random_forest"}
+    assert report["wall_seconds"] > 0